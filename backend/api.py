@@ -8,6 +8,11 @@ from routes.user_routes    import user_routes
 from routes.role_routes    import role_routes
 from routes.participants_routes    import participants_routes
 from routes.auth_routes import auth_routes
+from routes.health_routes import health_routes
+from routes.session_routes import session_routes
+from routes.match_routes import match_routes
+from routes.stream_routes import stream_routes, sock
+from model_registry import registry, WARMUP_ENABLED
 
 app = Flask(__name__)
 
@@ -23,6 +28,18 @@ app.register_blueprint(user_routes)
 app.register_blueprint(role_routes)
 app.register_blueprint(participants_routes)
 app.register_blueprint(auth_routes, url_prefix="/auth")
+app.register_blueprint(health_routes)
+app.register_blueprint(session_routes)
+app.register_blueprint(match_routes)
+
+# WebSocket (flask-sock) para el stream de reconocimiento
+sock.init_app(app)
+app.register_blueprint(stream_routes)
+
+# Cargar y precalentar los modelos antes de aceptar tráfico (también con gunicorn,
+# que importa este módulo en cada worker antes de servir)
+if WARMUP_ENABLED:
+    registry.warm_up()
 
 
 if __name__ == "__main__":
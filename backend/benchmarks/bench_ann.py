@@ -0,0 +1,84 @@
+# backend/benchmarks/bench_ann.py
+#
+# Recall@1 y latencia del índice IVF contra la búsqueda exacta de Gallery.
+# Si no se indica --centroids se usa una galería sintética con estructura de
+# clusters (parecida a los embeddings ArcFace reales).
+#
+# Uso (desde la raíz del repo):
+#   python backend/benchmarks/bench_ann.py --size 200000 --nprobe 1 4 8 16 32
+
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from recognition.gallery import Gallery
+from recognition.ann_index import IVFIndex
+
+
+def synthetic_gallery(n, dim=512, n_clusters=256, spread=0.6, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(n_clusters, dim)).astype(np.float32)
+    x = centers[rng.integers(0, n_clusters, n)] + spread * rng.normal(size=(n, dim)).astype(np.float32)
+    x /= np.linalg.norm(x, axis=1, keepdims=True)
+    return Gallery([str(i) for i in range(n)], x)
+
+
+def noisy_queries(gallery, n_queries, noise=0.05, seed=1):
+    """Consultas = identidades de la galería con ruido (otra foto de la misma persona)."""
+    rng = np.random.default_rng(seed)
+    truth = rng.integers(0, len(gallery), n_queries)
+    q = gallery.matrix[truth] + noise * rng.normal(size=(n_queries, gallery.matrix.shape[1])).astype(np.float32)
+    q /= np.linalg.norm(q, axis=1, keepdims=True)
+    return q
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--centroids", help="centroids.json real en lugar de la galería sintética")
+    parser.add_argument("--store", action="store_true", help="usar el almacén binario de centroides real")
+    parser.add_argument("--size", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--noise", type=float, default=0.05)
+    parser.add_argument("--n-lists", type=int, default=None)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    args = parser.parse_args()
+
+    if args.centroids or args.store:
+        from recognition import face_recognizer
+        face_recognizer.ANN_MIN_SIZE = float("inf")  # solo la matriz, sin índice
+        if args.store:
+            gallery = face_recognizer.load_centroids()
+        else:
+            gallery = face_recognizer.load_centroids(args.centroids, store_dir=None)
+    else:
+        gallery = synthetic_gallery(args.size)
+
+    queries = noisy_queries(gallery, args.queries, noise=args.noise)
+
+    t0 = time.perf_counter()
+    exact_idx, _ = gallery.search(queries, k=1, exact=True)
+    t_exact = (time.perf_counter() - t0) / len(queries)
+
+    t0 = time.perf_counter()
+    index = IVFIndex.build(gallery.matrix, n_lists=args.n_lists)
+    t_build = time.perf_counter() - t0
+
+    print(f"Galería: {len(gallery)} x {gallery.matrix.shape[1]} | listas: {index.n_lists} | "
+          f"construcción: {t_build:.1f} s")
+    print(f"Exacta: {t_exact * 1000:.3f} ms/consulta")
+    print(f"{'nprobe':>7} | {'recall@1':>8} | {'ms/consulta':>11} | {'speedup':>7}")
+
+    for nprobe in args.nprobe:
+        t0 = time.perf_counter()
+        ann_idx, _ = index.search(gallery.matrix, queries, k=1, nprobe=nprobe)
+        t_ann = (time.perf_counter() - t0) / len(queries)
+        recall = float(np.mean(ann_idx[:, 0] == exact_idx[:, 0]))
+        print(f"{nprobe:>7} | {recall:>8.4f} | {t_ann * 1000:>11.3f} | {t_exact / t_ann:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# backend/benchmarks/bench_asistencia.py
+#
+# Latencia de POST /api/asistencia según el tamaño de la clase: el bucle
+# anterior (tres consultas por CI) contra register_attendance (una sola
+# sentencia con unnest). Crea un curso y participantes de prueba dentro de una
+# transacción y al final hace rollback: la base queda como estaba.
+#
+# Necesita una base PostgreSQL real configurada con DB_* (.env) y las tablas
+# creadas (python backend/database/init_db.py).
+#
+# Uso (desde la raíz del repo):
+#   python backend/benchmarks/bench_asistencia.py --sizes 10 50 200 500 --repeat 5
+
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from database.db import get_connection
+from database.attendance import register_attendance
+
+CI_BASE = 900000000
+
+
+def seed(cur, size):
+    """Curso con `size` inscriptos, más un 10% de CIs sin curso y otro 10% inexistentes."""
+    cur.execute("INSERT INTO courses (name) VALUES ('bench asistencia') RETURNING id")
+    course_id = cur.fetchone()[0]
+    extra = max(1, size // 10)
+    cur.execute("""
+        INSERT INTO participants (full_name, ci, occupation)
+        SELECT 'bench ' || g, %s + g, 'bench' FROM generate_series(1, %s) g
+        RETURNING id, ci
+    """, (CI_BASE, size + extra))
+    rows = cur.fetchall()
+    inscriptos = [pid for pid, ci in rows if ci - CI_BASE <= size]
+    cur.execute("""
+        INSERT INTO participant_courses (participant_id, course_id)
+        SELECT unnest(%s::int[]), %s
+    """, (inscriptos, course_id))
+    cis = [str(ci) for _, ci in rows] + [str(CI_BASE * 2 + i) for i in range(extra)]
+    return course_id, cis
+
+
+def por_ci(cur, course_id, fecha, cis):
+    """El endpoint anterior: buscar participante, verificar curso y upsert, por cada CI."""
+    for ci in cis:
+        cur.execute("SELECT id FROM participants WHERE ci = %s", (ci,))
+        user = cur.fetchone()
+        if not user:
+            continue
+        cur.execute(
+            "SELECT 1 FROM participant_courses WHERE participant_id = %s AND course_id = %s",
+            (user[0], course_id)
+        )
+        if not cur.fetchone():
+            continue
+        cur.execute("""
+            INSERT INTO attendances (participant_id, course_id, date, observations)
+            VALUES (%s, %s, %s, %s)
+            ON CONFLICT ON CONSTRAINT unique_attendance_per_day
+            DO UPDATE
+            SET observations = EXCLUDED.observations
+        """, (user[0], course_id, fecha, None))
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 50, 200, 500])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    conn = get_connection()
+    cur = conn.cursor()
+    print(f"{'alumnos':>8}{'por CI ms':>12}{'set ms':>10}{'x':>8}")
+    try:
+        for i, size in enumerate(args.sizes):
+            course_id, cis = seed(cur, size)
+            fecha = f"2000-01-{i + 1:02d}"
+            antes = timed(lambda: por_ci(cur, course_id, fecha, cis), args.repeat)
+            despues = timed(lambda: register_attendance(course_id, fecha, cis, conn=conn), args.repeat)
+            print(f"{size:>8}{antes:>12.1f}{despues:>10.1f}{antes / despues:>8.1f}")
+            cur.execute("DELETE FROM participants WHERE ci > %s AND occupation = 'bench'", (CI_BASE,))
+    finally:
+        conn.rollback()
+        cur.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
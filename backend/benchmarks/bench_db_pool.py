@@ -0,0 +1,110 @@
+# backend/benchmarks/bench_db_pool.py
+#
+# Requests/s de GET /api/courses con una conexión nueva por request (como
+# estaba antes: get_connection() + close en cada ruta) contra el pool de
+# database/db.py. Levanta solo el blueprint de cursos en un servidor werkzeug
+# con hilos y le pega con N clientes concurrentes.
+#
+# Necesita una base PostgreSQL real configurada con DB_* (.env), con las
+# tablas creadas (python backend/database/init_db.py). Cuanto más lejos esté
+# la base (TLS, otra máquina), más pesa la conexión por request.
+#
+# Uso (desde la raíz del repo):
+#   python backend/benchmarks/bench_db_pool.py --clients 16 --seconds 10
+
+import os
+import sys
+import time
+import argparse
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from flask import Flask
+from werkzeug.serving import make_server
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from database import db
+from routes import course_routes as course_module
+
+
+@contextmanager
+def cursor_sin_pool():
+    """Lo que hacían las rutas antes del pool: conectar, usar, commit y cerrar."""
+    conn = db.get_connection()
+    try:
+        cursor = conn.cursor()
+        yield cursor
+        conn.commit()
+        cursor.close()
+    finally:
+        conn.close()
+
+
+def serve(port):
+    app = Flask(__name__)
+    app.register_blueprint(course_module.course_routes)
+    server = make_server("127.0.0.1", port, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run(url, clients, seconds):
+    stop = time.perf_counter() + seconds
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+
+    def client():
+        session = requests.Session()
+        local, fails = [], 0
+        while time.perf_counter() < stop:
+            t0 = time.perf_counter()
+            r = session.get(url)
+            if r.status_code == 200:
+                local.append(time.perf_counter() - t0)
+            else:
+                fails += 1
+        with lock:
+            latencies.extend(local)
+            errors[0] += fails
+
+    with ThreadPoolExecutor(clients) as ex:
+        for _ in range(clients):
+            ex.submit(client)
+
+    latencies.sort()
+    n = len(latencies)
+    p = lambda q: latencies[min(n - 1, int(q * n))] * 1000 if n else float("nan")
+    return n / seconds, p(0.5), p(0.95), errors[0]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--port", type=int, default=5099)
+    args = parser.parse_args()
+
+    server = serve(args.port)
+    url = f"http://127.0.0.1:{args.port}/api/courses"
+    requests.get(url)  # calentamiento
+
+    print(f"GET /api/courses · {args.clients} clientes · {args.seconds:.0f} s · pool máx {db.pool.maxconn}")
+    print(f"{'modo':<10}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'errores':>10}")
+
+    original = course_module.db_cursor
+    for name, cursor_fn in (("directo", cursor_sin_pool), ("pool", original)):
+        course_module.db_cursor = cursor_fn
+        rps, p50, p95, errors = run(url, args.clients, args.seconds)
+        print(f"{name:<10}{rps:>10.1f}{p50:>10.1f}{p95:>10.1f}{errors:>10}")
+    course_module.db_cursor = original
+
+    print(f"🔌 Pool: {db.pool.stats()}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# backend/benchmarks/bench_detect_batch.py
+#
+# Throughput de detect_faces (un predict por imagen) contra
+# detect_faces_batch (un predict por lote, con letterbox) en CPU, para
+# lotes de 1, 4 y 16 imágenes. También verifica, sobre todas las fotos de la
+# carpeta, que las cajas del batch reescaladas a la imagen original coincidan
+# con las de detect_faces: cantidad de cajas de cada camino, cuántas se
+# emparejan (IoU >= 0.5) y la IoU media y mínima de los pares.
+#
+# Uso (desde la raíz del repo):
+#   python backend/benchmarks/bench_detect_batch.py backend/recognition/raw_faces/<ci>
+#   python backend/benchmarks/bench_detect_batch.py fotos/ --sizes 1 4 16 --repeats 3
+#   python backend/benchmarks/bench_detect_batch.py fotos/ --frame 640x480   # como frames de cámara
+
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import cv2
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from detection.yoloface import detect_faces, detect_faces_batch
+from detection.tracker import iou_matrix
+
+
+def load_images(folder, frame=None):
+    """Fotos de la carpeta o, sin carpeta, 16 frames aleatorios de 640x480."""
+    imgs = []
+    if folder:
+        files = sorted(f for f in os.listdir(folder) if f.lower().endswith((".jpg", ".jpeg", ".png")))
+        imgs = [cv2.imread(os.path.join(folder, f)) for f in files]
+        imgs = [i for i in imgs if i is not None]
+    if not imgs:
+        rng = np.random.default_rng(0)
+        return [rng.integers(0, 256, (480, 640, 3), dtype=np.uint8) for _ in range(16)]
+    if frame:
+        imgs = [as_frame(i, *frame) for i in imgs]
+    return imgs
+
+
+def as_frame(img, w, h):
+    """Recorte centrado a la relación w:h y resize a w x h (como un frame de cámara)."""
+    ih, iw = img.shape[:2]
+    if iw * h > ih * w:
+        cw = ih * w // h
+        img = img[:, (iw - cw) // 2:(iw - cw) // 2 + cw]
+    else:
+        ch = iw * h // w
+        img = img[(ih - ch) // 2:(ih - ch) // 2 + ch]
+    return cv2.resize(img, (w, h), interpolation=cv2.INTER_AREA)
+
+
+def agreement(single, batch):
+    """(cajas individual, cajas batch, pares con IoU >= 0.5, IoUs de los pares), emparejando por mayor IoU."""
+    n_single = n_batch = 0
+    ious = []
+    for a, b in zip(single, batch):
+        n_single, n_batch = n_single + len(a), n_batch + len(b)
+        if not a or not b:
+            continue
+        m = iou_matrix(np.array([x[:4] for x in a], float), np.array([x[:4] for x in b], float))
+        while m.max() >= 0.5:
+            i, j = np.unravel_index(m.argmax(), m.shape)
+            ious.append(m[i, j])
+            m[i, :], m[:, j] = 0, 0
+    return n_single, n_batch, ious
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("folder", nargs="?")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--frame", help="llevar cada foto a un frame de WxH (p. ej. 640x480)")
+    args = parser.parse_args()
+
+    imgs = load_images(args.folder, tuple(int(v) for v in args.frame.split("x")) if args.frame else None)
+    detect_faces(imgs[0])
+    detect_faces_batch(imgs[:1])  # warm-up
+
+    # Cajas: todas las fotos, en lotes del tamaño más grande pedido
+    step = max(args.sizes)
+    single = [detect_faces(img) for img in imgs]
+    batch = [b for k in range(0, len(imgs), step) for b in detect_faces_batch(imgs[k:k + step])]
+    n_single, n_batch, ious = agreement(single, batch)
+    print(f"📷 {len(imgs)} imágenes · cajas individual {n_single} · batch {n_batch} · "
+          f"emparejadas {len(ious)} · IoU media {np.mean(ious) if ious else float('nan'):.3f} · "
+          f"mínima {np.min(ious) if ious else float('nan'):.3f}")
+
+    print(f"{'lote':>5} | {'individual img/s':>16} | {'batch img/s':>11} | {'speedup':>7}")
+    for n in args.sizes:
+        lote = [imgs[i % len(imgs)] for i in range(n)]
+        t0 = time.perf_counter()
+        for _ in range(args.repeats):
+            [detect_faces(img) for img in lote]
+        t_single = (time.perf_counter() - t0) / args.repeats
+
+        t0 = time.perf_counter()
+        for _ in range(args.repeats):
+            detect_faces_batch(lote)
+        t_batch = (time.perf_counter() - t0) / args.repeats
+
+        print(f"{n:>5} | {n / t_single:>16.1f} | {n / t_batch:>11.1f} | {t_single / t_batch:>6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
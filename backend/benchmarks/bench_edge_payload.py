@@ -0,0 +1,90 @@
+# backend/benchmarks/bench_edge_payload.py
+#
+# Bytes subidos por minuto de clase: el navegador mandando frames JPEG
+# (polling cada 2 s o stream por WebSocket) contra el agente de borde
+# (main.py --edge) mandando solo embeddings float16 de los tracks que
+# necesitan reconocimiento. Los rostros son cajas fijas con un temblor de
+# pocos píxeles; el tracker real (detection/tracker.py) decide cuándo se sube.
+#
+# Uso (desde la raíz del repo):
+#   python backend/benchmarks/bench_edge_payload.py --students 30 --image aula.jpg
+
+import os
+import sys
+import argparse
+import numpy as np
+import cv2
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import edge_protocol
+from detection.tracker import FaceTracker
+
+
+def synthetic_frame(seed=0):
+    """Frame 640x480 con gradientes, bloques y ruido de sensor (sin foto real a mano)."""
+    rng = np.random.default_rng(seed)
+    yy, xx = np.mgrid[0:480, 0:640]
+    frame = np.stack([(xx / 640 * 180 + 40), (yy / 480 * 160 + 50), ((xx + yy) / 1120 * 200 + 30)], -1)
+    for _ in range(60):
+        x, y = rng.integers(0, 600), rng.integers(0, 440)
+        frame[y:y + rng.integers(20, 120), x:x + rng.integers(20, 160)] = rng.integers(0, 255, 3)
+    frame += rng.normal(0, 6, frame.shape)
+    return np.clip(frame, 0, 255).astype(np.uint8)
+
+
+def edge_bytes(students, minutes, fps, dim, seed=0):
+    rng = np.random.default_rng(seed)
+    cols = int(np.ceil(np.sqrt(students)))
+    base = np.array([(40 + (i % cols) * 90, 40 + (i // cols) * 90, 60, 60) for i in range(students)], float)
+    tracker = FaceTracker()
+    total = uploads = faces = 0
+
+    for f in range(int(minutes * 60 * fps)):
+        now = f / fps
+        boxes = [tuple(b + rng.normal(0, 2, 4) * [1, 1, 0.5, 0.5]) for b in base]
+        tracks = tracker.update(boxes, now)
+        pending = [i for i, t in enumerate(tracks) if t.needs_recognition(now, tracker.reverify_interval)]
+        if not pending:
+            continue
+        embs = rng.normal(size=(len(pending), dim)).astype(np.float32)
+        embs /= np.linalg.norm(embs, axis=1, keepdims=True)
+        payload = edge_protocol.pack(embs, [tracks[i].box for i in pending], [tracks[i].id for i in pending])
+        for i in pending:
+            # Reconocedor perfecto: cada track vota su propio asiento
+            tracks[i].vote(str(i), 90.0, now)
+        total += len(payload)
+        uploads += 1
+        faces += len(pending)
+    return total, uploads, faces
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--students", type=int, default=30)
+    parser.add_argument("--minutes", type=float, default=10)
+    parser.add_argument("--edge-fps", type=float, default=10, help="frames por segundo que procesa el agente")
+    parser.add_argument("--dim", type=int, default=512)
+    parser.add_argument("--image", default=None, help="frame real del aula (640x480) para medir el JPEG")
+    parser.add_argument("--quality", type=int, default=92, help="calidad JPEG (canvas.toBlob usa 0.92)")
+    args = parser.parse_args()
+
+    frame = cv2.imread(args.image) if args.image else synthetic_frame()
+    frame = cv2.resize(frame, (640, 480))
+    jpeg = len(cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, args.quality])[1])
+
+    total, uploads, faces = edge_bytes(args.students, args.minutes, args.edge_fps, args.dim)
+    edge_per_min = total / args.minutes
+
+    print(f"JPEG 640x480 (q={args.quality}): {jpeg / 1024:.1f} KB por frame")
+    print(f"Payload por rostro: {(edge_protocol.META_DTYPE.itemsize + args.dim * 2)} B "
+          f"(+{edge_protocol.HEADER.size} B de cabecera por envío)")
+    print(f"Borde: {uploads} envíos, {faces} rostros en {args.minutes:g} min → {edge_per_min / 1024:.1f} KB/min")
+    for name, fps in (("polling 2 s", 0.5), ("WebSocket 4 fps", 4.0)):
+        browser_per_min = jpeg * fps * 60
+        print(f"Navegador ({name}): {browser_per_min / 1024:.1f} KB/min → "
+              f"{browser_per_min / edge_per_min:.0f}x más que el borde")
+
+
+if __name__ == "__main__":
+    main()
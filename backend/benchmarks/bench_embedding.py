@@ -0,0 +1,72 @@
+# backend/benchmarks/bench_embedding.py
+#
+# Compara rostros/segundo entre el camino anterior (un JPEG temporal y un
+# DeepFace.represent por rostro) y el batch en memoria de face_recognizer.
+#
+# Uso (desde la raíz del repo):
+#   python backend/benchmarks/bench_embedding.py --faces 1 8 32 --repeats 5
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import numpy as np
+import cv2
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from deepface import DeepFace
+from recognition.face_recognizer import embed_crops, get_embedding_model
+
+
+def embed_legacy(face_crops, model_name="ArcFace"):
+    """Camino previo: un archivo temporal y una pasada del modelo por rostro."""
+    embs = []
+    for crop in face_crops:
+        with tempfile.NamedTemporaryFile(suffix=".jpg", delete=False) as tmp:
+            cv2.imwrite(tmp.name, crop)
+            rep = DeepFace.represent(
+                img_path=tmp.name,
+                model_name=model_name,
+                enforce_detection=False,
+                detector_backend="skip"
+            )[0]
+        os.remove(tmp.name)
+        embs.append(rep["embedding"])
+    return np.array(embs, dtype=np.float32)
+
+
+def random_crops(n, size=160, seed=0):
+    rng = np.random.default_rng(seed)
+    return [rng.integers(0, 256, (size, size, 3), dtype=np.uint8) for _ in range(n)]
+
+
+def measure(fn, crops, repeats):
+    fn(crops)  # warm-up (grafo de TensorFlow)
+    t0 = time.perf_counter()
+    for _ in range(repeats):
+        fn(crops)
+    elapsed = (time.perf_counter() - t0) / repeats
+    return elapsed, len(crops) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--faces", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    get_embedding_model()
+
+    print(f"{'rostros':>8} | {'legacy ms':>10} | {'legacy r/s':>10} | {'batch ms':>10} | {'batch r/s':>10} | {'speedup':>7}")
+    for n in args.faces:
+        crops = random_crops(n)
+        t_old, fps_old = measure(embed_legacy, crops, args.repeats)
+        t_new, fps_new = measure(embed_crops, crops, args.repeats)
+        print(f"{n:>8} | {t_old * 1000:>10.1f} | {fps_old:>10.1f} | "
+              f"{t_new * 1000:>10.1f} | {fps_new:>10.1f} | {t_old / t_new:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+# backend/benchmarks/bench_embedding_backends.py
+#
+# Compara los backends de embeddings (recognition/embedding_backends.py):
+# latencia por batch, rostros/segundo y RSS del proceso, más la distancia
+# coseno de sus embeddings contra DeepFace sobre los mismos recortes
+# (tolerancia documentada en embedding_backends.TOLERANCE).
+# Cada backend corre en un subproceso propio para que el RSS no mezcle
+# TensorFlow con ONNX Runtime.
+#
+# La latencia se mide con recortes aleatorios; la tolerancia, con recortes
+# reales (--crops, por defecto los de train_faces.py en recognition/known_faces)
+# y se cae a aleatorios solo si no hay ninguno. Sale con código 1 si algún
+# backend supera la tolerancia.
+#
+# Uso (desde la raíz del repo, con el .onnx ya exportado):
+#   python backend/benchmarks/bench_embedding_backends.py --backends deepface onnx onnx-int8 opencv
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+import numpy as np
+import cv2
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+
+def rss_mb():
+    import psutil
+    return psutil.Process().memory_info().rss / 1e6
+
+
+def random_crops(n, size=160, seed=0):
+    rng = np.random.default_rng(seed)
+    return [rng.integers(0, 256, (size, size, 3), dtype=np.uint8) for _ in range(n)]
+
+
+def real_crops(directory, limit=64):
+    """Hasta `limit` recortes guardados (BGR) bajo directory, en orden estable."""
+    paths = []
+    for root, _, files in os.walk(directory):
+        paths += [os.path.join(root, f) for f in files if f.lower().endswith((".jpg", ".jpeg", ".png"))]
+    crops = [cv2.imread(p) for p in sorted(paths)[:limit]]
+    return [c for c in crops if c is not None]
+
+
+def worker(name, batches, repeats, out_path, crops_dir):
+    """Mide un backend y guarda sus embeddings de referencia en out_path."""
+    if name.endswith("-int8"):
+        os.environ["CHECKFACE_ONNX_INT8"] = "1"
+        name = name[:-len("-int8")]
+    rss_before = rss_mb()
+
+    from recognition import face_recognizer
+    t0 = time.perf_counter()
+    backend = face_recognizer.get_embedding_model("ArcFace", backend=name)
+    load_s = time.perf_counter() - t0
+
+    def embed(crops):
+        batch = face_recognizer.preprocess_crops(crops, backend.input_shape)
+        embs = backend.embed(batch)
+        return embs / (np.linalg.norm(embs, axis=1, keepdims=True) + 1e-10)
+
+    rows = []
+    for n in batches:
+        crops = random_crops(n)
+        embed(crops)  # warm-up
+        t0 = time.perf_counter()
+        for _ in range(repeats):
+            embed(crops)
+        elapsed = (time.perf_counter() - t0) / repeats
+        rows.append({"batch": n, "ms": elapsed * 1000, "faces_s": n / elapsed})
+
+    np.save(out_path, embed(real_crops(crops_dir) or random_crops(32, seed=1)))
+    print(json.dumps({"load_s": load_s, "rss_mb": rss_mb(), "rss_model_mb": rss_mb() - rss_before, "rows": rows}))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backends", nargs="+", default=["deepface", "onnx", "onnx-int8", "opencv"])
+    parser.add_argument("--batches", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--repeats", type=int, default=10)
+    parser.add_argument("--crops", default=os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                        "..", "recognition", "known_faces"))
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--out", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.worker, args.batches, args.repeats, args.out, args.crops)
+        return
+
+    from recognition.embedding_backends import TOLERANCE
+
+    n_real = len(real_crops(args.crops))
+    print(f"Tolerancia medida sobre {f'{n_real} recortes de {args.crops}' if n_real else '32 recortes aleatorios'}")
+
+    results, embs = {}, {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in args.backends:
+            out = os.path.join(tmp, f"{name}.npy")
+            cmd = [sys.executable, os.path.abspath(__file__), "--worker", name, "--out", out,
+                   "--repeats", str(args.repeats), "--crops", args.crops, "--batches", *map(str, args.batches)]
+            proc = subprocess.run(cmd, capture_output=True, text=True)
+            if proc.returncode != 0:
+                print(f"⚠️ {name}: {proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else 'falló'}")
+                continue
+            results[name] = json.loads(proc.stdout.strip().splitlines()[-1])
+            embs[name] = np.load(out)
+
+    print(f"{'backend':>10} | {'carga s':>7} | {'RSS MB':>7} | " +
+          " | ".join(f"{'ms b=' + str(n):>9} | {'rost/s':>7}" for n in args.batches) +
+          f" | {'dist vs deepface':>16}")
+    failed = 0
+    for name, r in results.items():
+        if "deepface" in embs and name != "deepface":
+            dist = float(np.max(1.0 - np.sum(embs[name] * embs["deepface"], axis=1)))
+            tol = TOLERANCE["int8" if name.endswith("-int8") else "float32"]
+            compat = f"{dist:.2e} {'✅' if dist <= tol else '❌'}"
+            failed += dist > tol
+        else:
+            compat = "-"
+        cols = " | ".join(f"{row['ms']:>9.2f} | {row['faces_s']:>7.1f}" for row in r["rows"])
+        print(f"{name:>10} | {r['load_s']:>7.2f} | {r['rss_mb']:>7.0f} | {cols} | {compat:>16}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
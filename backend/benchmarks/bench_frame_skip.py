@@ -0,0 +1,76 @@
+# backend/benchmarks/bench_frame_skip.py
+#
+# YOLO en cada frame contra SkippingDetector (detection/frame_skip.py) sobre
+# un video: FPS del stage de detección, N elegido y calidad de las cajas
+# propagadas (IoU contra la detección completa del mismo frame).
+#
+# Uso (desde la raíz del repo):
+#   python backend/benchmarks/bench_frame_skip.py clase.mp4 --target-fps 15 --frames 600
+
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import cv2
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from detection.yoloface import detect_faces
+from detection.frame_skip import SkippingDetector
+from detection.tracker import iou_matrix
+
+
+def read_frames(path, limit):
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while len(frames) < limit:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("video")
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--target-fps", type=float, default=15)
+    args = parser.parse_args()
+
+    frames = read_frames(args.video, args.frames)
+    if not frames:
+        print("❌ No se pudieron leer frames del video")
+        return
+    detect_faces(frames[0])  # warm-up
+
+    t0 = time.perf_counter()
+    full = [detect_faces(f) for f in frames]
+    t_full = time.perf_counter() - t0
+
+    skipper = SkippingDetector(detect_faces, target_fps=args.target_fps)
+    t0 = time.perf_counter()
+    skipped = [skipper.detect(f) for f in frames]
+    t_skip = time.perf_counter() - t0
+
+    # IoU de cada caja de referencia con la mejor caja propagada (solo frames sin YOLO)
+    ious = []
+    for ref, (boxes, ran) in zip(full, skipped):
+        if ran or not ref:
+            continue
+        m = iou_matrix(np.array(ref, float), np.array(boxes, float).reshape(-1, 4))
+        ious.extend(m.max(axis=1) if m.size else [0.0] * len(ref))
+    ious = np.array(ious) if ious else np.zeros(1)
+
+    n = len(frames)
+    print(f"Frames: {n} | YOLO cada frame: {n / t_full:.1f} FPS | "
+          f"con salto: {n / t_skip:.1f} FPS ({t_full / t_skip:.1f}x)")
+    print(f"SkippingDetector: {skipper.stats()}")
+    print(f"IoU cajas propagadas vs YOLO: media {ious.mean():.3f} | p10 {np.percentile(ious, 10):.3f} | "
+          f"< 0.5: {np.mean(ious < 0.5):.1%}")
+
+
+if __name__ == "__main__":
+    main()
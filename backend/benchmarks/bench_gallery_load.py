@@ -0,0 +1,87 @@
+# backend/benchmarks/bench_gallery_load.py
+#
+# Tiempo de carga de la galería: centroids.json (json.load + un ndarray por
+# persona, como el load_centroids anterior) contra el almacén binario con
+# np.memmap de recognition/centroid_store.py.
+#
+# Uso (desde la raíz del repo):
+#   python backend/benchmarks/bench_gallery_load.py --sizes 8000 100000
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from recognition import centroid_store
+from recognition.gallery import Gallery
+from recognition.helpers import l2_normalize
+
+
+def write_json(path, labels, matrix):
+    """Mismo formato que escribía train_faces.py (indent=2)."""
+    data = {l: {"centroid": v.tolist(), "count": 10, "intra_dist_avg": 0.2}
+            for l, v in zip(labels, matrix)}
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+
+
+def load_json_legacy(path):
+    with open(path, "r") as f:
+        data = json.load(f)
+    return {person: l2_normalize(np.array(info["centroid"], dtype=np.float32))
+            for person, info in data.items()}
+
+
+def load_store(store_dir):
+    labels, matrix, scales, meta = centroid_store.open_store(store_dir)
+    gallery = Gallery(labels, matrix, version=meta["generation"], scales=scales)
+    # Primera búsqueda: fuerza a paginar la matriz (o la toma del page cache)
+    gallery.search(gallery.matrix[:1], k=1)
+    return gallery
+
+
+def timed(fn, *args, repeats=3):
+    best = float("inf")
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[8000, 50000])
+    parser.add_argument("--dim", type=int, default=512)
+    args = parser.parse_args()
+
+    print(f"{'identidades':>11} | {'json MB':>8} | {'json s':>7} | {'npy MB':>7} | {'memmap s':>8} | {'speedup':>7}")
+    for n in args.sizes:
+        rng = np.random.default_rng(0)
+        matrix = rng.normal(size=(n, args.dim)).astype(np.float32)
+        matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+        labels = [str(4000000 + i) for i in range(n)]
+
+        with tempfile.TemporaryDirectory() as tmp:
+            json_path = os.path.join(tmp, "centroids.json")
+            write_json(json_path, labels, matrix)
+            centroid_store.convert_json(json_path, tmp)
+
+            json_mb = os.path.getsize(json_path) / 1e6
+            gen = centroid_store.read_meta(tmp)["generation"]
+            npy_mb = sum(os.path.getsize(os.path.join(tmp, f)) for f in os.listdir(tmp)
+                         if f.startswith(f"centroids.{gen}.")) / 1e6
+
+            t_json = timed(load_json_legacy, json_path)
+            t_store = timed(load_store, tmp)
+
+        print(f"{n:>11} | {json_mb:>8.1f} | {t_json:>7.3f} | {npy_mb:>7.1f} | {t_store:>8.4f} | {t_json / t_store:>6.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+# backend/benchmarks/bench_large_photos.py
+#
+# Carga de fotos grandes para el enrolamiento: cv2.imread a tamaño completo
+# (camino anterior de train_faces.py) contra read_for_detection, que
+# decodifica reducido con IMREAD_REDUCED_COLOR_* (detection/image_io.py).
+# Mide tiempo por imagen y memoria pico (VmHWM de un subproceso por modo),
+# incluyendo el recorte de 160x160 de una caja de rostro.
+#
+# Uso (desde la raíz del repo):
+#   python backend/benchmarks/bench_large_photos.py                 # fotos sintéticas de 12 MP
+#   python backend/benchmarks/bench_large_photos.py backend/recognition/raw_faces/<ci>
+
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import tempfile
+import subprocess
+import numpy as np
+import cv2
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from detection.image_io import read_for_detection, crop_face
+
+
+def synthetic_photos(folder, n, size=(4000, 3000)):
+    """JPEGs de 12 MP con textura suave (comprimen como fotos reales, no como ruido puro)."""
+    rng = np.random.default_rng(0)
+    w, h = size
+    paths = []
+    for i in range(n):
+        small = rng.integers(0, 256, (h // 50, w // 50, 3), dtype=np.uint8)
+        img = cv2.resize(small, (w, h), interpolation=cv2.INTER_CUBIC)
+        img = cv2.add(img, rng.integers(0, 12, img.shape, dtype=np.uint8))
+        path = os.path.join(folder, f"foto_{i}.jpg")
+        cv2.imwrite(path, img, [cv2.IMWRITE_JPEG_QUALITY, 90])
+        paths.append(path)
+    return paths
+
+
+def worker(mode, paths):
+    t0 = time.perf_counter()
+    for path in paths:
+        if mode == "completa":
+            img = cv2.imread(path)
+            h, w = img.shape[:2]
+            # Rostro típico de una foto de enrolamiento: ~1/4 del ancho, centrado
+            x, y, s = w * 3 // 8, h // 3, w // 4
+            cv2.resize(img[y:y+s, x:x+s], (160, 160))
+        else:
+            img, factor = read_for_detection(path)
+            h, w = img.shape[:2]
+            x, y, s = w * 3 // 8, h // 3, w // 4
+            crop_face(path, img, factor, (x, y, s, s), out_size=160)
+    elapsed = (time.perf_counter() - t0) / len(paths)
+    print(json.dumps({"ms": elapsed * 1000, "peak_mb": peak_rss_mb()}))
+
+
+def peak_rss_mb():
+    """
+    Pico de memoria residente de este proceso. En Linux se usa VmHWM:
+    ru_maxrss arrastra el pico del proceso padre a través del fork/exec.
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("folder", nargs="?")
+    parser.add_argument("--n", type=int, default=8, help="fotos sintéticas si no se pasa carpeta")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--paths", nargs="*", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.worker, args.paths)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.folder:
+            paths = [os.path.join(args.folder, f) for f in sorted(os.listdir(args.folder))
+                     if f.lower().endswith((".jpg", ".jpeg", ".png"))]
+        else:
+            paths = synthetic_photos(tmp, args.n)
+
+        print(f"{len(paths)} fotos | {'modo':>9} | {'ms/imagen':>9} | {'pico MB':>7}")
+        for mode in ("completa", "reducida"):
+            proc = subprocess.run([sys.executable, os.path.abspath(__file__), "--worker", mode, "--paths", *paths],
+                                  capture_output=True, text=True, check=True)
+            r = json.loads(proc.stdout.strip().splitlines()[-1])
+            print(f"{'':>{len(str(len(paths))) + 7}}| {mode:>9} | {r['ms']:>9.1f} | {r['peak_mb']:>7.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# backend/benchmarks/bench_microbatch.py
+#
+# Prueba de carga del micro-batching (inference_server.py): C clientes
+# concurrentes, cada uno con R requests de F rostros, contra el camino de
+# una pasada del modelo por request. Reporta requests/s, latencia p50/p95 y
+# tamaño medio de batch. Con --detect cada request también corre YOLO.
+#
+# Uso (desde la raíz del repo):
+#   python backend/benchmarks/bench_microbatch.py --clients 1 4 16 --faces 3
+#   CHECKFACE_EMBEDDING_BACKEND=onnx python backend/benchmarks/bench_microbatch.py
+
+import os
+import sys
+import time
+import argparse
+import threading
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from recognition.face_recognizer import embed_crops
+from inference_server import InferenceServer
+
+
+def random_crops(n, size=160, seed=0):
+    rng = np.random.default_rng(seed)
+    return [rng.integers(0, 256, (size, size, 3), dtype=np.uint8) for _ in range(n)]
+
+
+def run_load(handler, clients, requests, crops, frame):
+    latencies, lock = [], threading.Lock()
+
+    def client():
+        local = []
+        for _ in range(requests):
+            t0 = time.perf_counter()
+            handler(crops, frame)
+            local.append(time.perf_counter() - t0)
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+    lat = np.array(latencies) * 1000
+    return len(lat) / elapsed, np.percentile(lat, 50), np.percentile(lat, 95)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--requests", type=int, default=20, help="requests por cliente")
+    parser.add_argument("--faces", type=int, default=3, help="rostros por request")
+    parser.add_argument("--max-batch", type=int, default=16)
+    parser.add_argument("--max-wait-ms", type=float, default=10)
+    parser.add_argument("--detect", action="store_true", help="incluir YOLO en cada request")
+    args = parser.parse_args()
+
+    crops = random_crops(args.faces)
+    frame = np.random.default_rng(1).integers(0, 256, (480, 640, 3), dtype=np.uint8) if args.detect else None
+    detect_faces = None
+    if args.detect:
+        from detection.yoloface import detect_faces
+
+    def direct(crops, frame):
+        if frame is not None:
+            detect_faces(frame)
+        embed_crops(crops)
+
+    embed_crops(crops)  # warm-up del modelo
+    print(f"{'clientes':>8} | {'camino':>9} | {'req/s':>7} | {'p50 ms':>7} | {'p95 ms':>7} | {'batch medio':>11}")
+    for c in args.clients:
+        rps, p50, p95 = run_load(direct, c, args.requests, crops, frame)
+        print(f"{c:>8} | {'directo':>9} | {rps:>7.1f} | {p50:>7.1f} | {p95:>7.1f} | {'-':>11}")
+
+        server = InferenceServer(args.max_batch, args.max_wait_ms).start()
+
+        def batched(crops, frame):
+            if frame is not None:
+                server.detect(frame)
+            server.embed(crops)
+
+        rps, p50, p95 = run_load(batched, c, args.requests, crops, frame)
+        server.stop()
+        avg = server.stats()["embedder"]["avg_batch_size"]
+        print(f"{c:>8} | {'batch':>9} | {rps:>7.1f} | {p50:>7.1f} | {p95:>7.1f} | {avg:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# backend/benchmarks/bench_prototypes.py
+#
+# Un centroide (robust_mean) contra hasta K prototipos (prototipos_kmeans) por
+# identidad: aciertos bajo el umbral de 0.45, memoria de la galería y latencia
+# de búsqueda por frame. Usa identidades sintéticas con dos "apariencias"
+# (p. ej. con y sin lentes) por persona.
+#
+# Uso (desde la raíz del repo):
+#   python backend/benchmarks/bench_prototypes.py --identities 8000 --k 3
+
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from recognition.gallery import Gallery
+from recognition.helpers import robust_mean, prototipos_kmeans
+
+THRESHOLD = 0.45
+
+
+def unit(x):
+    return x / np.linalg.norm(x, axis=-1, keepdims=True)
+
+
+def synthetic_people(n, dim, photos, mode_shift, noise, rng):
+    """Por persona: base + desplazamiento de apariencia (2 modos) + ruido por foto."""
+    base = unit(rng.normal(size=(n, 1, dim)))
+    modes = mode_shift * unit(rng.normal(size=(n, 2, dim)))
+    which = rng.integers(0, 2, size=(n, photos))
+    enroll = unit(base + np.take_along_axis(modes, which[..., None], axis=1)
+                  + noise * unit(rng.normal(size=(n, photos, dim))))
+    q_mode = rng.integers(0, 2, size=n)
+    queries = unit(base[:, 0] + modes[np.arange(n), q_mode] + noise * unit(rng.normal(size=(n, dim))))
+    return enroll.astype(np.float32), queries.astype(np.float32)
+
+
+def build(enroll, k):
+    labels, rows = [], []
+    for i, embs in enumerate(enroll):
+        protos = robust_mean(embs)[None, :] if k == 1 else prototipos_kmeans(embs, k=k)
+        labels += [str(i)] * len(protos)
+        rows.append(protos)
+    return Gallery(labels, np.concatenate(rows))
+
+
+def evaluate(gallery, queries, frame_size=30, repeats=20):
+    idx, dists = gallery.search(queries, k=1)
+    truth = np.arange(len(queries)).astype(str)
+    accepted = dists[:, 0] <= THRESHOLD
+    correct = float(np.mean(accepted & (gallery.labels[idx[:, 0]] == truth)))
+
+    frame = queries[:frame_size]
+    gallery.search(frame, k=3)
+    t0 = time.perf_counter()
+    for _ in range(repeats):
+        gallery.search(frame, k=3)
+    ms = (time.perf_counter() - t0) / repeats * 1000
+    return correct, float(np.mean(accepted)), ms
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--identities", type=int, default=8000)
+    parser.add_argument("--photos", type=int, default=20)
+    parser.add_argument("--dim", type=int, default=512)
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--mode-shift", type=float, default=2.5)
+    parser.add_argument("--noise", type=float, default=0.5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    enroll, queries = synthetic_people(args.identities, args.dim, args.photos,
+                                       args.mode_shift, args.noise, rng)
+
+    print(f"{'modo':>12} | {'filas':>7} | {'MB':>6} | {'aciertos':>8} | {'aceptados':>9} | {'ms/frame (30)':>13}")
+    for k in (1, args.k):
+        gallery = build(enroll, k)
+        correct, accepted, ms = evaluate(gallery, queries)
+        name = "centroide" if k == 1 else f"{k} prototipos"
+        print(f"{name:>12} | {gallery.matrix.shape[0]:>7} | {gallery.matrix.nbytes / 1e6:>6.1f} | "
+              f"{correct:>8.3f} | {accepted:>9.3f} | {ms:>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# backend/benchmarks/bench_quantization.py
+#
+# Reporte de exactitud de la galería cuantizada (float16 / int8) contra float32:
+# memoria, coincidencia del top-1, decisiones que cambian con el umbral 0.45,
+# error en la distancia y latencia por frame de 30 rostros.
+#
+# Uso (desde la raíz del repo):
+#   python backend/benchmarks/bench_quantization.py --size 50000
+#   python backend/benchmarks/bench_quantization.py --store   # almacén real
+
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from recognition.gallery import Gallery
+from recognition.quantization import MODES
+
+THRESHOLD = 0.45
+
+
+def synthetic(n, dim, queries, noise, seed=0):
+    rng = np.random.default_rng(seed)
+    m = rng.normal(size=(n, dim)).astype(np.float32)
+    m /= np.linalg.norm(m, axis=1, keepdims=True)
+    truth = rng.integers(0, n, queries)
+    q = m[truth] + noise * rng.normal(size=(queries, dim)).astype(np.float32)
+    q /= np.linalg.norm(q, axis=1, keepdims=True)
+    return Gallery([str(i) for i in range(n)], m), q
+
+
+def frame_ms(gallery, frame, repeats=10):
+    gallery.search(frame, k=3)
+    t0 = time.perf_counter()
+    for _ in range(repeats):
+        gallery.search(frame, k=3)
+    return (time.perf_counter() - t0) / repeats * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--store", action="store_true", help="usar el almacén de centroides real")
+    parser.add_argument("--size", type=int, default=50000)
+    parser.add_argument("--dim", type=int, default=512)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--noise", type=float, default=0.065)
+    args = parser.parse_args()
+
+    if args.store:
+        from recognition import face_recognizer
+        face_recognizer.ANN_MIN_SIZE = float("inf")
+        base = face_recognizer.load_centroids().quantize("float32")
+        rng = np.random.default_rng(0)
+        q = base.dequantized()[rng.integers(0, base.matrix.shape[0], args.queries)]
+        q = q + args.noise * rng.normal(size=q.shape).astype(np.float32)
+        q /= np.linalg.norm(q, axis=1, keepdims=True)
+    else:
+        base, q = synthetic(args.size, args.dim, args.queries, args.noise)
+
+    ref_idx, ref_dist = base.search(q, k=1)
+    ref_accept = ref_dist[:, 0] <= THRESHOLD
+    print(f"Galería: {base.matrix.shape[0]} filas x {base.matrix.shape[1]} | consultas: {len(q)} | "
+          f"aceptadas en float32: {ref_accept.mean():.3f}")
+    print(f"{'modo':>8} | {'MB':>7} | {'top-1 =':>8} | {'cambios umbral':>14} | "
+          f"{'|Δdist| medio':>13} | {'|Δdist| máx':>11} | {'ms/frame':>8}")
+
+    for mode in MODES:
+        g = base.quantize(mode)
+        idx, dist = g.search(q, k=1)
+        same = float(np.mean(idx[:, 0] == ref_idx[:, 0]))
+        flips = int(np.sum((dist[:, 0] <= THRESHOLD) != ref_accept))
+        delta = np.abs(dist[:, 0] - ref_dist[:, 0])
+        print(f"{mode:>8} | {g.nbytes / 1e6:>7.1f} | {same:>8.4f} | {flips:>14} | "
+              f"{delta.mean():>13.2e} | {delta.max():>11.2e} | {frame_ms(g, q[:30]):>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# backend/benchmarks/bench_tracker.py
+#
+# Simulación de una clase para el tracker (detection/tracker.py): S alumnos
+# sentados con cajas que tiemblan unos píxeles, detecciones perdidas al azar
+# y un reconocedor ruidoso. Compara llamadas a ArcFace por minuto con y sin
+# tracking, y mide cuántas detecciones quedan con la identidad correcta.
+#
+# Uso (desde la raíz del repo):
+#   python backend/benchmarks/bench_tracker.py --fps 0.5 10 --minutes 10
+
+import os
+import sys
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from detection.tracker import FaceTracker, UNKNOWN
+
+
+def simulate(students, minutes, fps, jitter, miss_rate, accuracy, seed=0):
+    rng = np.random.default_rng(seed)
+    # Grilla de asientos en un frame de 640x480, rostros de ~60 px
+    cols = int(np.ceil(np.sqrt(students)))
+    base = np.array([(40 + (i % cols) * 90, 40 + (i // cols) * 90, 60, 60) for i in range(students)], float)
+    drift = np.zeros_like(base)
+
+    tracker = FaceTracker()
+    frames = int(minutes * 60 * fps)
+    detections = correct = 0
+    for f in range(frames):
+        now = f / fps
+        # Pequeños movimientos acumulados (por segundo, no por frame), sin salir del asiento
+        drift[:, :2] = np.clip(drift[:, :2] + rng.normal(0, jitter / 2 / np.sqrt(fps), (students, 2)), -15, 15)
+        visible = np.flatnonzero(rng.random(students) >= miss_rate)
+        boxes = [tuple(base[i] + drift[i] + rng.normal(0, jitter, 4) * [1, 1, 0.5, 0.5]) for i in visible]
+
+        tracks = tracker.update(boxes, now)
+        for i, track in zip(visible, tracks):
+            if track.needs_recognition(now, tracker.reverify_interval):
+                # Reconocedor ruidoso: acierta con probabilidad `accuracy`, si no da desconocido u otro alumno
+                if rng.random() < accuracy:
+                    name = str(i)
+                else:
+                    name = UNKNOWN if rng.random() < 0.5 else str(rng.integers(students))
+                track.vote(name, 70.0 if name != UNKNOWN else 0.0, now)
+                tracker.recognitions += 1
+            detections += 1
+            correct += track.identity[0] == str(i)
+
+    return detections, tracker.recognitions, correct, tracker._next_id - 1
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--students", type=int, default=30)
+    parser.add_argument("--minutes", type=float, default=10)
+    parser.add_argument("--fps", type=float, nargs="+", default=[0.5, 10], help="0.5 = navegador cada 2 s")
+    parser.add_argument("--jitter", type=float, default=3.0, help="temblor de las cajas en px")
+    parser.add_argument("--miss-rate", type=float, default=0.05, help="detecciones perdidas")
+    parser.add_argument("--accuracy", type=float, default=0.95, help="aciertos del reconocedor por rostro")
+    args = parser.parse_args()
+
+    print(f"{'fps':>5} | {'detecciones/min':>15} | {'ArcFace/min':>11} | {'reducción':>9} | "
+          f"{'tracks':>6} | {'identidad correcta':>18}")
+    for fps in args.fps:
+        dets, recs, correct, tracks = simulate(args.students, args.minutes, fps, args.jitter,
+                                               args.miss_rate, args.accuracy)
+        print(f"{fps:>5} | {dets / args.minutes:>15.0f} | {recs / args.minutes:>11.1f} | "
+              f"{dets / max(recs, 1):>8.1f}x | {tracks:>6} | {correct / dets:>18.3f}")
+
+
+if __name__ == "__main__":
+    main()
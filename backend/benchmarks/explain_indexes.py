@@ -0,0 +1,173 @@
+# backend/benchmarks/explain_indexes.py
+#
+# Verifica con EXPLAIN que las consultas calientes usan los índices de las
+# migraciones (database/migrations/) con ~1M asistencias. Crea init.sql y las
+# migraciones en un esquema temporal, carga datos sintéticos, hace ANALYZE y
+# revisa el plan de cada consulta. Todo corre en una transacción que termina
+# en rollback: la base real no se toca.
+#
+# Las consultas replican los filtros de las rutas (attendance_routes,
+# participants_routes, course_schedules_routes, database/attendance.py).
+# Como referencia también se muestra el plan del filtro anterior con
+# DATE(a.date): como attendances.date ya es DATE, PostgreSQL descarta la
+# conversión y también usa el índice. El rango sobre la columna no depende
+# de eso (seguiría usando el índice si la columna pasara a timestamp).
+#
+# Necesita una base PostgreSQL real configurada con DB_* (.env).
+#
+# Uso (desde la raíz del repo):
+#   python backend/benchmarks/explain_indexes.py --rows 1000000
+# Sale con código 1 si alguna consulta no usa ninguno de sus índices esperados.
+
+import os
+import sys
+import json
+import argparse
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from database.db import get_connection
+from database.migrate import discover
+
+SCHEMA = "checkface_explain"
+INDEX_SCANS = {"Index Scan", "Index Only Scan", "Bitmap Index Scan"}
+START = date(2024, 1, 1)
+
+# (descripción, sql, parámetros, índices aceptados o None si es solo referencia).
+# Cuando dos índices cubren la misma consulta el planner elige según las
+# estadísticas, y cualquiera de los dos evita el Seq Scan.
+def checks(days, ci, participant_id, course_id):
+    desde = START + timedelta(days=days - 7)
+    hasta = START + timedelta(days=days - 1)
+    return [
+        ("participants.ci (alta, asistencia)",
+         "SELECT id FROM participants WHERE ci = %s", (ci,),
+         {"idx_participants_ci"}),
+        ("inscripción (participante, curso)",
+         "SELECT 1 FROM participant_courses WHERE participant_id = %s AND course_id = %s",
+         (participant_id, course_id),
+         # (course_id, participant_id) resuelve la misma igualdad sobre ambas columnas
+         {"uq_participant_courses_participant_course", "idx_participant_courses_course"}),
+        # course_schedules tiene pocas filas (un par por curso): ahí un Seq Scan
+        # es el plan correcto y solo se muestra como referencia
+        ("horarios de un curso",
+         "SELECT id, day, schedule FROM course_schedules WHERE course_id = %s", (course_id,),
+         None),
+        ("registrados de un curso en un día",
+         """SELECT p.id, p.ci, p.full_name
+            FROM attendances a JOIN participants p ON a.participant_id = p.id
+            WHERE a.course_id = %s AND a.date = %s::date""", (course_id, hasta),
+         # El INCLUDE de idx_attendances_date permite filtrar el curso dentro del índice
+         {"idx_attendances_course_date", "idx_attendances_date"}),
+        ("resumen diario (7 días)",
+         """WITH dates AS (
+              SELECT generate_series(%s::date, %s::date, interval '1 day')::date AS day
+            )
+            SELECT d.day, COUNT(a.id) FROM dates d
+            LEFT JOIN attendances a
+                   ON a.date = d.day
+                  AND a.date >= %s::date AND a.date < %s::date + 1
+            GROUP BY d.day""", (desde, hasta, desde, hasta),
+         {"idx_attendances_date"}),
+        ("porcentajes: asistencias en rango",
+         """SELECT a.participant_id, a.course_id, COUNT(*)
+            FROM attendances a
+            WHERE a.date >= %s::date AND a.date < %s::date + 1
+            GROUP BY a.participant_id, a.course_id""", (desde, hasta),
+         {"idx_attendances_date"}),
+        ("porcentajes con DATE(a.date) (antes)",
+         """SELECT a.participant_id, a.course_id, COUNT(*)
+            FROM attendances a
+            WHERE DATE(a.date) BETWEEN %s AND %s
+            GROUP BY a.participant_id, a.course_id""", (desde, hasta),
+         None),
+    ]
+
+
+def build(cur, rows, days):
+    cur.execute(f"CREATE SCHEMA {SCHEMA}")
+    cur.execute(f"SET LOCAL search_path TO {SCHEMA}")
+
+    with open(os.path.join(os.path.dirname(__file__), "..", "database", "init.sql"), encoding="utf-8") as f:
+        init_sql = "\n".join(l for l in f.read().splitlines() if not l.upper().startswith("SET SEARCH_PATH"))
+    cur.execute(init_sql)
+
+    participants = max(1, rows // days)
+    courses = max(1, participants // 100)
+    cur.execute("INSERT INTO courses (name) SELECT 'curso ' || g FROM generate_series(1, %s) g", (courses,))
+    cur.execute("""
+        INSERT INTO course_schedules (course_id, day, schedule)
+        SELECT c.id, d, '08:00 - 10:00'
+        FROM courses c, unnest(ARRAY['Monday', 'Thursday']) d
+    """)
+    cur.execute("""
+        INSERT INTO participants (full_name, ci, occupation)
+        SELECT 'participante ' || g, 1000000 + g, 'student' FROM generate_series(1, %s) g
+    """, (participants,))
+    cur.execute("""
+        INSERT INTO participant_courses (participant_id, course_id)
+        SELECT p.id, (p.id %% %s) + 1 FROM participants p
+    """, (courses,))
+    cur.execute("""
+        INSERT INTO attendances (participant_id, course_id, date)
+        SELECT pc.participant_id, pc.course_id, %s::date + d
+        FROM participant_courses pc, generate_series(0, %s - 1) d
+    """, (START, days))
+
+    # Migraciones en orden, igual que database/migrate.py pero sin registrar
+    for version, name, sql, _ in discover():
+        cur.execute(sql)
+
+    cur.execute("ANALYZE")
+    cur.execute("SELECT count(*) FROM attendances")
+    return participants, courses, cur.fetchone()[0]
+
+
+def scans(plan):
+    """[(tipo de nodo, índice)] de todos los nodos del plan."""
+    out = [(plan["Node Type"], plan.get("Index Name"))]
+    for child in plan.get("Plans", []):
+        out.extend(scans(child))
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--days", type=int, default=200)
+    args = parser.parse_args()
+
+    conn = get_connection()
+    cur = conn.cursor()
+    failed = 0
+    try:
+        participants, courses, total = build(cur, args.rows, args.days)
+        print(f"📊 {total} asistencias · {participants} participantes · {courses} cursos")
+
+        for name, sql, params, expected in checks(args.days, 1000000 + participants // 2, participants // 2, 1):
+            cur.execute("EXPLAIN (FORMAT JSON) " + sql, params)
+            raw = cur.fetchone()[0]
+            plan = (json.loads(raw) if isinstance(raw, str) else raw)[0]["Plan"]
+            nodes = scans(plan)
+            used = sorted({idx for kind, idx in nodes if kind in INDEX_SCANS and idx})
+            detail = ", ".join(used) or ", ".join(sorted({k for k, _ in nodes if "Scan" in k}))
+
+            if expected is None:
+                mark = "ℹ️"
+            elif expected & set(used):
+                mark = "✅"
+            else:
+                mark = "❌"
+                failed += 1
+            print(f"{mark} {name:<40} {detail}")
+    finally:
+        conn.rollback()
+        cur.close()
+        conn.close()
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
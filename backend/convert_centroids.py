@@ -0,0 +1,19 @@
+# backend/convert_centroids.py
+#
+# Conversión única de centroids.json al almacén binario (recognition/centroid_store.py).
+# Ejemplo (desde la raíz del repo):
+#   python backend/convert_centroids.py backend/recognition/embeddings/centroids.json --dtype int8
+
+import argparse
+from recognition.centroid_store import convert_json
+from recognition.quantization import MODES
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convierte centroids.json al almacén binario")
+    parser.add_argument("json_path")
+    parser.add_argument("store_dir", nargs="?", help="por defecto, la carpeta del JSON")
+    parser.add_argument("--dtype", choices=MODES, default=None,
+                        help="formato de la matriz (por defecto CHECKFACE_GALLERY_DTYPE)")
+    args = parser.parse_args()
+    convert_json(args.json_path, args.store_dir, args.dtype)
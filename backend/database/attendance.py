@@ -0,0 +1,186 @@
+# backend/database/attendance.py
+#
+# Registro de asistencias en bloque: una sola sentencia para N alumnos en vez
+# de tres consultas por alumno.
+
+from .db import db_cursor
+
+# Solo se insertan los CIs inscriptos al curso; el ON CONFLICT hace el upsert
+# idempotente contra unique_attendance_per_day. (xmax = 0) distingue las filas
+# recién insertadas de las que ya existían.
+_UPSERT_BY_CI = """
+WITH elegibles AS (
+    SELECT DISTINCT p.id, p.ci, p.full_name
+    FROM participants p
+    JOIN participant_courses pc
+      ON pc.participant_id = p.id AND pc.course_id = %(course_id)s
+    WHERE p.ci = ANY(%(cis)s::int[])
+),
+upserted AS (
+    INSERT INTO attendances (participant_id, course_id, date, observations)
+    SELECT id, %(course_id)s, %(date)s, %(observations)s FROM elegibles
+    ON CONFLICT ON CONSTRAINT unique_attendance_per_day
+    DO UPDATE
+    SET observations = COALESCE(EXCLUDED.observations, attendances.observations)
+    RETURNING participant_id, (xmax = 0) AS inserted
+)
+SELECT e.ci, e.full_name, u.inserted
+FROM elegibles e
+JOIN upserted u ON u.participant_id = e.id
+"""
+
+
+def _fetch(sql, params, conn=None):
+    """Ejecuta y trae las filas: en la transacción de conn, o en una propia del pool."""
+    if conn is not None:
+        with conn.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+    with db_cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+
+def upsert_attendance_by_ci(course_id, date, cis, observations=None, conn=None):
+    """
+    Registra la asistencia de varios CIs a un curso en una fecha con un solo upsert.
+    Los CIs no inscriptos al curso (o inexistentes) se ignoran.
+    Si no se pasa conn, usa una del pool y hace commit.
+    Retorna [{"ci", "full_name", "inserted"}] de los registrados.
+    """
+    cis = sorted({int(ci) for ci in cis})
+    if not cis:
+        return []
+
+    rows = _fetch(_UPSERT_BY_CI, {
+        "course_id": course_id,
+        "date": date,
+        "observations": observations,
+        "cis": cis,
+    }, conn)
+
+    return [{"ci": str(r[0]), "full_name": r[1], "inserted": bool(r[2])} for r in rows]
+
+
+# Eventos (ci, curso, fecha) de varios cursos y días a la vez, vía unnest:
+# una sola sentencia sin importar cuántos eventos traiga el lote.
+_BULK_UPSERT = """
+WITH ev (ci, course_id, date) AS (
+    SELECT * FROM unnest(%(cis)s::int[], %(course_ids)s::int[], %(dates)s::date[])
+),
+elegibles AS (
+    SELECT DISTINCT p.id AS participant_id, ev.course_id, ev.date
+    FROM ev
+    JOIN participants p ON p.ci = ev.ci
+    JOIN participant_courses pc
+      ON pc.participant_id = p.id AND pc.course_id = ev.course_id
+)
+INSERT INTO attendances (participant_id, course_id, date, observations)
+SELECT participant_id, course_id, date, %(observations)s FROM elegibles
+ON CONFLICT ON CONSTRAINT unique_attendance_per_day
+DO UPDATE
+SET observations = COALESCE(EXCLUDED.observations, attendances.observations)
+RETURNING (xmax = 0) AS inserted
+"""
+
+
+def bulk_upsert_events(events, observations=None, conn=None):
+    """
+    events: iterable de (ci, course_id, date). Los duplicados se colapsan antes
+    de ir a la base y los CIs inexistentes o no inscriptos se ignoran.
+    Retorna {"received", "unique", "inserted", "existing", "ignored"}.
+    """
+    events = list(events)
+    unique = sorted({(int(ci), int(course_id), str(date)) for ci, course_id, date in events})
+    stats = {"received": len(events), "unique": len(unique), "inserted": 0, "existing": 0, "ignored": 0}
+    if not unique:
+        return stats
+
+    cis, course_ids, dates = (list(col) for col in zip(*unique))
+    rows = _fetch(_BULK_UPSERT, {
+        "cis": cis,
+        "course_ids": course_ids,
+        "dates": dates,
+        "observations": observations,
+    }, conn)
+
+    stats["inserted"] = sum(1 for r in rows if r[0])
+    stats["existing"] = len(rows) - stats["inserted"]
+    stats["ignored"] = max(0, len(unique) - len(rows))
+    return stats
+
+
+# POST /api/asistencia: clasifica cada CI (registrado / no encontrado / fuera
+# del curso) y registra a los inscriptos en una sola sentencia. WITH ORDINALITY
+# conserva el orden (y los repetidos) de la lista que mandó el cliente; el
+# INSERT del CTE se ejecuta aunque nadie lea su resultado.
+_REGISTER = """
+WITH ev AS (
+    SELECT * FROM unnest(%(cis)s::int[]) WITH ORDINALITY AS t(ci, ord)
+),
+clasificados AS (
+    SELECT ev.ord, m.participant_id,
+           CASE
+               WHEN m.participant_id IS NOT NULL THEN 'registrado'
+               WHEN EXISTS (SELECT 1 FROM participants p WHERE p.ci = ev.ci) THEN 'fuera_curso'
+               ELSE 'no_encontrado'
+           END AS estado
+    FROM ev
+    LEFT JOIN LATERAL (
+        SELECT p.id AS participant_id
+        FROM participants p
+        JOIN participant_courses pc
+          ON pc.participant_id = p.id AND pc.course_id = %(course_id)s
+        WHERE p.ci = ev.ci
+        ORDER BY p.id
+        LIMIT 1
+    ) m ON true
+),
+upserted AS (
+    INSERT INTO attendances (participant_id, course_id, date, observations)
+    SELECT DISTINCT participant_id, %(course_id)s, %(date)s::date, %(observations)s
+    FROM clasificados
+    WHERE participant_id IS NOT NULL
+    ON CONFLICT ON CONSTRAINT unique_attendance_per_day
+    DO UPDATE
+    SET observations = EXCLUDED.observations
+)
+SELECT ord, estado FROM clasificados ORDER BY ord
+"""
+
+
+def register_attendance(course_id, date, cis, observations=None, conn=None):
+    """
+    Registra la asistencia de una lista de CIs a un curso en una fecha.
+    Cantidad constante de consultas sin importar el tamaño de la clase.
+    Retorna {"registrados", "no_encontrados", "fuera_curso"} con los CIs tal
+    como vinieron, en el orden recibido. Un CI no numérico cuenta como no encontrado.
+    """
+    result = {"registrados": [], "no_encontrados": [], "fuera_curso": []}
+    numericos = []
+    for ci in cis:
+        try:
+            numericos.append((ci, int(ci)))
+        except (TypeError, ValueError):
+            numericos.append((ci, None))
+
+    validos = [(ci, n) for ci, n in numericos if n is not None]
+    estados = {}
+    if validos:
+        rows = _fetch(_REGISTER, {
+            "course_id": int(course_id),
+            "date": date,
+            "observations": observations,
+            "cis": [n for _, n in validos],
+        }, conn)
+        estados = {ord_ - 1: estado for ord_, estado in rows}
+
+    listas = {"registrado": "registrados", "fuera_curso": "fuera_curso", "no_encontrado": "no_encontrados"}
+    i = 0
+    for ci, n in numericos:
+        if n is None:
+            result["no_encontrados"].append(ci)
+            continue
+        result[listas[estados.get(i, "no_encontrado")]].append(ci)
+        i += 1
+    return result
@@ -1,14 +1,187 @@
 import os
+import time
+import threading
+from contextlib import contextmanager
 import psycopg2
+from psycopg2 import pool as pg_pool
 from dotenv import load_dotenv
 
 load_dotenv()
 
-def get_connection():
-    return psycopg2.connect(
+# Conexiones por proceso (con gunicorn, por worker): mínimo abiertas y máximo simultáneo
+POOL_MIN = int(os.getenv("CHECKFACE_DB_POOL_MIN", "1"))
+POOL_MAX = int(os.getenv("CHECKFACE_DB_POOL_MAX", "10"))
+# Segundos que se espera una conexión libre antes de fallar
+POOL_TIMEOUT = float(os.getenv("CHECKFACE_DB_POOL_TIMEOUT", "10"))
+# Una conexión ociosa por más de esto se verifica con SELECT 1 antes de entregarla
+POOL_CHECK_IDLE = float(os.getenv("CHECKFACE_DB_POOL_CHECK_IDLE", "30"))
+# Las conexiones se reciclan (cierran) al devolverse después de esta antigüedad
+POOL_MAX_AGE = float(os.getenv("CHECKFACE_DB_POOL_MAX_AGE", "1800"))
+
+
+def _connect_params():
+    return dict(
         dbname=os.getenv("DB_NAME"),
         user=os.getenv("DB_USER"),
         password=os.getenv("DB_PASSWORD"),
         host=os.getenv("DB_HOST"),
         port=os.getenv("DB_PORT")
-    )
\ No newline at end of file
+    )
+
+
+def get_connection():
+    """Conexión nueva, fuera del pool (scripts como init_db.py)."""
+    return psycopg2.connect(**_connect_params())
+
+
+class _IdlePool(pg_pool.ThreadedConnectionPool):
+    """
+    ThreadedConnectionPool abre `minconn` al crearse pero, al devolverlas,
+    cierra todas las que pasen de `minconn`: con carga concurrente se
+    reconecta en cada ráfaga. Acá se guardan ociosas hasta `maxconn`.
+    """
+
+    def __init__(self, minconn, maxconn, *args, **kwargs):
+        super().__init__(minconn, maxconn, *args, **kwargs)
+        self.minconn = maxconn
+
+
+class ConnectionPool:
+    """
+    Pool de conexiones thread-safe sobre psycopg2.ThreadedConnectionPool:
+    - si están todas ocupadas, espera hasta `timeout` en vez de fallar al instante;
+    - verifica con SELECT 1 las conexiones ociosas hace más de `check_idle` s;
+    - descarta las rotas y recicla las más viejas que `max_age` s.
+    Se crea perezosamente en cada proceso: tras el fork de gunicorn cada
+    worker abre sus propias conexiones.
+    """
+
+    def __init__(self, minconn=POOL_MIN, maxconn=POOL_MAX, timeout=POOL_TIMEOUT,
+                 check_idle=POOL_CHECK_IDLE, max_age=POOL_MAX_AGE, **params):
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.check_idle = check_idle
+        self.max_age = max_age
+        self.params = params or _connect_params()
+        self._lock = threading.Lock()
+        self._pool = None
+        self._pid = None
+        self._slots = None
+        self._born = {}       # id(conn) -> momento en que se abrió
+        self._released = {}   # id(conn) -> último momento en que se devolvió
+        self.discarded = 0
+
+    def _get_pool(self):
+        pid = os.getpid()
+        if self._pool is None or self._pid != pid:
+            with self._lock:
+                if self._pool is None or self._pid != pid:
+                    # Las conexiones heredadas del proceso padre no se tocan (son de él)
+                    self._pool = _IdlePool(self.minconn, self.maxconn, **self.params)
+                    self._pid = pid
+                    self._slots = threading.BoundedSemaphore(self.maxconn)
+                    self._born, self._released = {}, {}
+        return self._pool
+
+    def _healthy(self, conn, now):
+        if conn.closed:
+            return False
+        if now - self._released.get(id(conn), now) < self.check_idle:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def getconn(self):
+        pool = self._get_pool()
+        if not self._slots.acquire(timeout=self.timeout):
+            raise pg_pool.PoolError(f"Sin conexiones libres tras {self.timeout} s (máximo {self.maxconn})")
+        try:
+            for _ in range(self.maxconn + 1):
+                conn = pool.getconn()
+                now = time.monotonic()
+                self._born.setdefault(id(conn), now)
+                if self._healthy(conn, now):
+                    return conn
+                self._discard(pool, conn)
+            raise pg_pool.PoolError("No se pudo obtener una conexión sana")
+        except Exception:
+            self._slots.release()
+            raise
+
+    def putconn(self, conn, broken=False):
+        pool = self._get_pool()
+        try:
+            now = time.monotonic()
+            if broken or conn.closed or now - self._born.get(id(conn), now) > self.max_age:
+                self._discard(pool, conn)
+            else:
+                self._released[id(conn)] = now
+                pool.putconn(conn)
+        finally:
+            self._slots.release()
+
+    def _discard(self, pool, conn):
+        self._born.pop(id(conn), None)
+        self._released.pop(id(conn), None)
+        self.discarded += 1
+        pool.putconn(conn, close=True)
+
+    def closeall(self):
+        with self._lock:
+            if self._pool is not None and self._pid == os.getpid():
+                self._pool.closeall()
+            self._pool = None
+
+    def stats(self):
+        pool = self._pool
+        return {
+            "max": self.maxconn,
+            "open": len(pool._used) + len(pool._pool) if pool else 0,
+            "in_use": len(pool._used) if pool else 0,
+            "discarded": self.discarded,
+        }
+
+
+pool = ConnectionPool()
+
+
+@contextmanager
+def db_connection():
+    """
+    Conexión del pool: commit al salir sin error, rollback si hay excepción,
+    y siempre se devuelve al pool (descartándola si quedó rota).
+        with db_connection() as conn:
+            ...
+    """
+    conn = pool.getconn()
+    broken = False
+    try:
+        yield conn
+        conn.commit()
+    except Exception as e:
+        broken = isinstance(e, (psycopg2.OperationalError, psycopg2.InterfaceError)) or conn.closed
+        if not conn.closed:
+            try:
+                conn.rollback()
+            except psycopg2.Error:
+                broken = True
+        raise
+    finally:
+        pool.putconn(conn, broken=broken)
+
+
+@contextmanager
+def db_cursor():
+    """Como db_connection, pero entrega directamente un cursor (el caso de casi todas las rutas)."""
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            yield cursor
+        finally:
+            cursor.close()
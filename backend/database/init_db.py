@@ -2,6 +2,7 @@ import os
 import psycopg2
 from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
 from .db import get_connection
+from .migrate import migrate
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -57,6 +58,14 @@ def ejecutar_init_sql():
         print("❌ Error al ejecutar init.sql:", e)
 
 
+def aplicar_migraciones():
+    try:
+        migrate()
+    except Exception as e:
+        print("❌ Error al aplicar migraciones:", e)
+
+
 if __name__ == "__main__":
     crear_base_si_no_existe()
-    ejecutar_init_sql()
\ No newline at end of file
+    ejecutar_init_sql()
+    aplicar_migraciones()
\ No newline at end of file
@@ -0,0 +1,133 @@
+# backend/database/migrate.py
+#
+# Migraciones versionadas del esquema. Cada archivo migrations/NNNN_nombre.sql
+# se aplica una sola vez, en orden, dentro de su propia transacción, y queda
+# registrado en schema_migrations. Un advisory lock evita que dos procesos
+# (p. ej. dos workers de gunicorn) las apliquen a la vez.
+#
+# Uso (desde backend/):
+#   python -m database.migrate            # aplica las pendientes
+#   python -m database.migrate --status   # lista aplicadas y pendientes
+
+import os
+import re
+import sys
+import hashlib
+import argparse
+from .db import get_connection
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+
+# Clave arbitraria del advisory lock de las migraciones
+LOCK_KEY = 0x43464D47
+
+_FILENAME = re.compile(r"^(\d{4})_([\w-]+)\.sql$")
+
+_CREATE_TABLE = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version    VARCHAR(10) PRIMARY KEY,
+    name       VARCHAR(120) NOT NULL,
+    checksum   CHAR(64) NOT NULL,
+    applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+)
+"""
+
+
+def discover(directory=MIGRATIONS_DIR):
+    """Migraciones del directorio ordenadas por versión: [(version, name, sql, checksum)]."""
+    found = []
+    for filename in sorted(os.listdir(directory)):
+        m = _FILENAME.match(filename)
+        if not m:
+            continue
+        with open(os.path.join(directory, filename), "r", encoding="utf-8") as f:
+            sql = f.read()
+        found.append((m.group(1), m.group(2), sql, hashlib.sha256(sql.encode("utf-8")).hexdigest()))
+
+    versions = [v for v, *_ in found]
+    if len(versions) != len(set(versions)):
+        raise ValueError(f"Versiones de migración repetidas en {directory}")
+    return found
+
+
+def _applied(cur):
+    cur.execute("SELECT version, checksum FROM schema_migrations")
+    return dict(cur.fetchall())
+
+
+def migrate(conn=None, directory=MIGRATIONS_DIR, verbose=True):
+    """
+    Aplica las migraciones pendientes y retorna las versiones aplicadas.
+    Si una falla se hace rollback de esa migración y se corta (las anteriores quedan).
+    """
+    own = conn is None
+    conn = conn or get_connection()
+    applied_now = []
+    try:
+        with conn.cursor() as cur:
+            cur.execute(_CREATE_TABLE)
+            conn.commit()
+
+            cur.execute("SELECT pg_advisory_lock(%s)", (LOCK_KEY,))
+            try:
+                applied = _applied(cur)
+                for version, name, sql, checksum in discover(directory):
+                    if version in applied:
+                        if applied[version] != checksum and verbose:
+                            print(f"⚠️ La migración {version}_{name} cambió después de aplicarse (se ignora)")
+                        continue
+                    try:
+                        cur.execute(sql)
+                        cur.execute(
+                            "INSERT INTO schema_migrations (version, name, checksum) VALUES (%s, %s, %s)",
+                            (version, name, checksum)
+                        )
+                        conn.commit()
+                    except Exception:
+                        conn.rollback()
+                        print(f"❌ Falló la migración {version}_{name}")
+                        raise
+                    applied_now.append(version)
+                    if verbose:
+                        print(f"✅ Migración {version}_{name} aplicada")
+            finally:
+                cur.execute("SELECT pg_advisory_unlock(%s)", (LOCK_KEY,))
+                conn.commit()
+
+        if verbose and not applied_now:
+            print("ℹ️ El esquema ya está al día.")
+        return applied_now
+    finally:
+        if own:
+            conn.close()
+
+
+def status(conn=None, directory=MIGRATIONS_DIR):
+    """[(version, name, aplicada)] de todas las migraciones del directorio."""
+    own = conn is None
+    conn = conn or get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT to_regclass('schema_migrations') IS NOT NULL")
+            applied = _applied(cur) if cur.fetchone()[0] else {}
+        conn.rollback()
+        return [(version, name, version in applied) for version, name, _, _ in discover(directory)]
+    finally:
+        if own:
+            conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migraciones del esquema de CheckFace")
+    parser.add_argument("--status", action="store_true", help="lista migraciones aplicadas y pendientes")
+    args = parser.parse_args()
+
+    try:
+        if args.status:
+            for version, name, done in status():
+                print(f"{'✅' if done else '⏳'} {version}_{name}")
+        else:
+            migrate()
+    except Exception as e:
+        print("❌ Error al aplicar migraciones:", e)
+        sys.exit(1)
@@ -0,0 +1,28 @@
+-- Índices de las búsquedas más frecuentes, que init.sql no crea.
+-- Todo es idempotente: se puede correr sobre una base que ya los tenga.
+
+-- participants.ci: alta de participantes, POST /api/asistencia y el bulk de las aulas
+CREATE INDEX IF NOT EXISTS idx_participants_ci ON participants (ci);
+
+-- participant_courses: una inscripción por (participante, curso).
+-- Antes de crear el índice único se eliminan las inscripciones repetidas
+-- (se conserva la de menor id).
+DELETE FROM participant_courses pc
+USING participant_courses dup
+WHERE dup.participant_id = pc.participant_id
+  AND dup.course_id = pc.course_id
+  AND dup.id < pc.id;
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_participant_courses_participant_course
+    ON participant_courses (participant_id, course_id);
+
+-- Lado del curso: galería por curso, filtros por course_id en los reportes
+CREATE INDEX IF NOT EXISTS idx_participant_courses_course
+    ON participant_courses (course_id, participant_id);
+
+-- course_schedules: horarios de un curso y /api/current_course (por día)
+CREATE INDEX IF NOT EXISTS idx_course_schedules_course_day
+    ON course_schedules (course_id, day);
+
+CREATE INDEX IF NOT EXISTS idx_course_schedules_day
+    ON course_schedules (day);
@@ -0,0 +1,13 @@
+-- Índices de attendances por fecha. unique_attendance_per_day
+-- (participant_id, course_id, date) no sirve para filtrar solo por fecha.
+-- Las consultas filtran con rangos sobre la columna (a.date >= desde AND
+-- a.date < hasta + 1), sin DATE(a.date), para que el planner pueda usarlos.
+
+-- Resumen diario y porcentajes: rango de fechas; el INCLUDE permite contar
+-- por (participante, curso) con un index-only scan
+CREATE INDEX IF NOT EXISTS idx_attendances_date
+    ON attendances (date) INCLUDE (participant_id, course_id);
+
+-- Registrados de un curso en un día y reportes filtrados por curso
+CREATE INDEX IF NOT EXISTS idx_attendances_course_date
+    ON attendances (course_id, date);
@@ -0,0 +1,36 @@
+-- Estado de las sesiones de reconocimiento (recognition_sessions.py) en la
+-- base y no en la memoria de un proceso: con varios workers de gunicorn el
+-- alta, los frames (HTTP, WebSocket o /api/match) y el cierre de una misma
+-- sesión pueden caer en procesos distintos, y los votos tienen que sumarse
+-- en un solo lugar.
+
+CREATE TABLE IF NOT EXISTS recognition_sessions (
+    id             VARCHAR(32) PRIMARY KEY,
+    course_id      INT NOT NULL,
+    date           DATE NOT NULL,
+    min_votes      INT NOT NULL,
+    min_similarity REAL NOT NULL,
+    frames         INT NOT NULL DEFAULT 0,
+    writes         INT NOT NULL DEFAULT 0,
+    last_error     TEXT,
+    closed         BOOLEAN NOT NULL DEFAULT FALSE,
+    created_at     TIMESTAMPTZ NOT NULL DEFAULT now(),
+    last_activity  TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+-- Sesiones abiertas por antigüedad (cierre de las abandonadas)
+CREATE INDEX IF NOT EXISTS idx_recognition_sessions_open
+    ON recognition_sessions (last_activity) WHERE NOT closed;
+
+-- Votos por CI. status: voting (no llegó al umbral), pending (llegó y falta
+-- escribir la asistencia), committed (escrita) o rejected (no inscripto)
+CREATE TABLE IF NOT EXISTS recognition_session_votes (
+    session_id VARCHAR(32) NOT NULL REFERENCES recognition_sessions(id) ON DELETE CASCADE,
+    ci         INT NOT NULL,
+    votes      INT NOT NULL DEFAULT 0,
+    similarity DOUBLE PRECISION NOT NULL DEFAULT 0,  -- suma de las similitudes de esos votos
+    status     VARCHAR(10) NOT NULL DEFAULT 'voting',
+    full_name  VARCHAR(120),
+    inserted   BOOLEAN,
+    PRIMARY KEY (session_id, ci)
+);
@@ -0,0 +1,160 @@
+# backend/detection/frame_skip.py
+
+import os
+import math
+import time
+import numpy as np
+import cv2
+
+# FPS objetivo del stage de detección; con él y la latencia medida de YOLO se ajusta N
+TARGET_FPS = float(os.getenv("CHECKFACE_DETECT_TARGET_FPS", "15"))
+# Límites de N (frames entre detecciones completas)
+MIN_INTERVAL = int(os.getenv("CHECKFACE_DETECT_MIN_INTERVAL", "1"))
+MAX_INTERVAL = int(os.getenv("CHECKFACE_DETECT_MAX_INTERVAL", "15"))
+# Diferencia media (0-1) contra el último frame detectado que fuerza a correr YOLO
+SCENE_CHANGE_THRESHOLD = float(os.getenv("CHECKFACE_SCENE_CHANGE", "0.12"))
+
+# Ancho de la miniatura usada para el score de cambio de escena y el flujo óptico
+_SMALL_WIDTH = 320
+_LK_PARAMS = dict(winSize=(15, 15), maxLevel=2,
+                  criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 10, 0.03))
+
+
+class SkippingDetector:
+    """
+    Corre YOLO solo cada N frames (o cuando cambia la escena) y entre medio
+    propaga las cajas con flujo óptico Lucas-Kanade sobre una miniatura en
+    escala de grises, que cuesta una fracción de una pasada de YOLO.
+
+    N se ajusta solo: con la latencia media de YOLO (det) y de la
+    propagación (prop), el costo amortizado por frame (det + (N-1)·prop) / N
+    debe entrar en el presupuesto 1 / target_fps.
+    """
+
+    def __init__(self, detect_fn=None, target_fps=TARGET_FPS, min_interval=MIN_INTERVAL,
+                 max_interval=MAX_INTERVAL, scene_threshold=SCENE_CHANGE_THRESHOLD):
+        if detect_fn is None:
+            from detection.yoloface import detect_faces
+            detect_fn = detect_faces
+        self.detect_fn = detect_fn
+        self.target_fps = target_fps
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.scene_threshold = scene_threshold
+
+        self.interval = min_interval
+        self.det_ms = None    # media móvil exponencial de la latencia de YOLO
+        self.prop_ms = None   # ídem para la propagación
+        self._boxes = []
+        self._prev_small = None     # miniatura del frame anterior (para el flujo)
+        self._key_small = None      # miniatura del último frame detectado (para el score de escena)
+        self._since_detect = 0
+        self._force = True
+        self.detections = 0
+        self.propagations = 0
+
+    # -----------------------------
+    # API
+    # -----------------------------
+    def detect(self, frame):
+        """Retorna (cajas (x, y, w, h), True si corrió YOLO en este frame)."""
+        small, scale = self._small(frame)
+
+        if self._force or self._since_detect + 1 >= self.interval or \
+                self.scene_change(small) >= self.scene_threshold:
+            t0 = time.perf_counter()
+            self._boxes = [tuple(int(v) for v in b) for b in self.detect_fn(frame)]
+            self.det_ms = self._ema(self.det_ms, (time.perf_counter() - t0) * 1000)
+            self._key_small = small
+            self._since_detect = 0
+            self._force = False
+            self.detections += 1
+            self._adapt()
+        else:
+            t0 = time.perf_counter()
+            self._boxes = self._propagate(self._prev_small, small, scale, frame.shape)
+            self.prop_ms = self._ema(self.prop_ms, (time.perf_counter() - t0) * 1000)
+            self._since_detect += 1
+            self.propagations += 1
+
+        self._prev_small = small
+        return list(self._boxes), self._since_detect == 0
+
+    def scene_change(self, small) -> float:
+        """Diferencia absoluta media (0-1) contra el último frame en que corrió YOLO."""
+        if self._key_small is None or self._key_small.shape != small.shape:
+            return 1.0
+        return float(cv2.absdiff(small, self._key_small).mean()) / 255.0
+
+    def stats(self):
+        return {
+            "interval": self.interval,
+            "det_ms": round(self.det_ms or 0.0, 2),
+            "prop_ms": round(self.prop_ms or 0.0, 2),
+            "detections": self.detections,
+            "propagations": self.propagations,
+        }
+
+    # -----------------------------
+    # Internos
+    # -----------------------------
+    @staticmethod
+    def _ema(prev, value, alpha=0.2):
+        return value if prev is None else (1 - alpha) * prev + alpha * value
+
+    @staticmethod
+    def _small(frame):
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        scale = min(1.0, _SMALL_WIDTH / gray.shape[1])
+        if scale < 1.0:
+            gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        return gray, scale
+
+    def _adapt(self):
+        budget = 1000.0 / self.target_fps
+        prop = self.prop_ms or 0.0
+        if self.det_ms <= budget:
+            n = self.min_interval
+        elif prop >= budget:
+            n = self.max_interval
+        else:
+            # (det + (n-1)·prop) / n <= budget  →  n >= (det - prop) / (budget - prop)
+            n = math.ceil((self.det_ms - prop) / (budget - prop))
+        self.interval = int(min(max(n, self.min_interval), self.max_interval))
+
+    def _propagate(self, prev, cur, scale, shape):
+        """Desplaza y escala cada caja según la mediana del flujo de sus puntos."""
+        if prev is None or prev.shape != cur.shape or not self._boxes:
+            return self._boxes
+
+        out = []
+        for (x, y, w, h) in self._boxes:
+            sx, sy, sw, sh = (int(round(v * scale)) for v in (x, y, w, h))
+            mask = np.zeros_like(prev)
+            mask[max(sy, 0):sy + sh, max(sx, 0):sx + sw] = 255
+            pts = cv2.goodFeaturesToTrack(prev, maxCorners=30, qualityLevel=0.01, minDistance=3, mask=mask)
+            if pts is None or len(pts) < 3:
+                out.append((x, y, w, h))
+                continue
+
+            nxt, status, _ = cv2.calcOpticalFlowPyrLK(prev, cur, pts, None, **_LK_PARAMS)
+            ok = status.reshape(-1) == 1
+            if ok.sum() < 3:
+                # Se perdió el rostro: la caja queda y el próximo frame corre YOLO
+                self._force = True
+                out.append((x, y, w, h))
+                continue
+
+            p0, p1 = pts.reshape(-1, 2)[ok], nxt.reshape(-1, 2)[ok]
+            dx, dy = np.median(p1 - p0, axis=0) / scale
+            # Escala: razón de dispersión de los puntos alrededor de su mediana
+            s0 = np.median(np.linalg.norm(p0 - np.median(p0, axis=0), axis=1))
+            s1 = np.median(np.linalg.norm(p1 - np.median(p1, axis=0), axis=1))
+            k = float(np.clip(s1 / s0, 0.8, 1.25)) if s0 > 1e-3 else 1.0
+
+            cx, cy = x + w / 2 + dx, y + h / 2 + dy
+            nw, nh = w * k, h * k
+            nx = int(np.clip(cx - nw / 2, 0, shape[1] - 1))
+            ny = int(np.clip(cy - nh / 2, 0, shape[0] - 1))
+            out.append((nx, ny, int(nw), int(nh)))
+        return out
@@ -0,0 +1,68 @@
+# backend/detection/image_io.py
+
+import os
+import cv2
+from PIL import Image
+
+# YOLO lleva todo a 640 px de lado mayor: decodificar más grande no le agrega detalle
+DETECT_MIN_SIDE = int(os.getenv("CHECKFACE_DETECT_MIN_SIDE", "640"))
+
+# Factor de reducción → flag de decodificación reducida de OpenCV (JPEG la aplica al decodificar)
+_REDUCED_FLAGS = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+
+
+def image_size(path):
+    """(ancho, alto) leyendo solo el encabezado, sin decodificar la imagen."""
+    with Image.open(path) as im:
+        return im.size
+
+
+def reduction_factor(size, min_side=DETECT_MIN_SIDE):
+    """Mayor factor (1, 2, 4 u 8) que deja el lado mayor en al menos min_side px."""
+    longest = max(size)
+    factor = 1
+    for f in (2, 4, 8):
+        if longest / f >= min_side:
+            factor = f
+    return factor
+
+
+def read_for_detection(path, min_side=DETECT_MIN_SIDE):
+    """
+    Decodifica la imagen ya reducida (IMREAD_REDUCED_COLOR_2/4/8) para
+    detectar: una foto de 12 MP se decodifica a ~1000 px en vez de 4000.
+    Retorna (imagen BGR o None, factor); las cajas detectadas se pasan a la
+    imagen original multiplicando por factor.
+    """
+    try:
+        factor = reduction_factor(image_size(path), min_side)
+    except OSError:
+        factor = 1
+    img = cv2.imread(path, _REDUCED_FLAGS[factor])
+    return img, factor
+
+
+def crop_face(path, small, factor, box, out_size=160):
+    """
+    Recorte out_size x out_size del rostro detectado en la imagen reducida.
+    Si en la imagen reducida el rostro ya tiene al menos out_size px, se
+    recorta de ahí; si no, se decodifica la original y se recorta a
+    resolución completa (solo en ese caso).
+    """
+    x, y, w, h = (int(v) for v in box[:4])
+    if min(w, h) >= out_size or factor == 1:
+        crop = small[y:y+h, x:x+w]
+    else:
+        full = cv2.imread(path)
+        if full is None:
+            return None
+        fx, fy, fw, fh = x * factor, y * factor, w * factor, h * factor
+        crop = full[fy:fy+fh, fx:fx+fw]
+    if crop.size == 0:
+        return None
+    return cv2.resize(crop, (out_size, out_size), interpolation=cv2.INTER_AREA)
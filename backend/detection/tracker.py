@@ -0,0 +1,218 @@
+# backend/detection/tracker.py
+
+import os
+import time
+import threading
+import numpy as np
+
+# Parámetros del tracker (configurables por entorno)
+IOU_THRESHOLD = float(os.getenv("CHECKFACE_TRACK_IOU", "0.3"))
+# Segundos sin detección antes de descartar un track (> intervalo de captura del navegador)
+MAX_AGE = float(os.getenv("CHECKFACE_TRACK_MAX_AGE", "5"))
+# Cada cuántos segundos se vuelve a verificar la identidad de un track ya estable
+REVERIFY_INTERVAL = float(os.getenv("CHECKFACE_TRACK_REVERIFY", "30"))
+# Votos y proporción mínimos para dar por estable la identidad de un track
+MIN_VOTES = int(os.getenv("CHECKFACE_TRACK_MIN_VOTES", "2"))
+MIN_CONFIDENCE = float(os.getenv("CHECKFACE_TRACK_MIN_CONFIDENCE", "0.6"))
+
+UNKNOWN = "Desconocido"
+
+
+def iou_matrix(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """IoU entre cajas (x, y, w, h): a (n, 4), b (m, 4) → (n, m)."""
+    if len(a) == 0 or len(b) == 0:
+        return np.zeros((len(a), len(b)), dtype=np.float32)
+    ax2, ay2 = a[:, 0] + a[:, 2], a[:, 1] + a[:, 3]
+    bx2, by2 = b[:, 0] + b[:, 2], b[:, 1] + b[:, 3]
+    iw = np.clip(np.minimum(ax2[:, None], bx2[None]) - np.maximum(a[:, None, 0], b[None, :, 0]), 0, None)
+    ih = np.clip(np.minimum(ay2[:, None], by2[None]) - np.maximum(a[:, None, 1], b[None, :, 1]), 0, None)
+    inter = iw * ih
+    union = (a[:, 2] * a[:, 3])[:, None] + (b[:, 2] * b[:, 3])[None] - inter
+    return inter / np.maximum(union, 1e-6)
+
+
+class KalmanBox:
+    """
+    Filtro de Kalman de velocidad constante sobre (cx, cy, w, h).
+    Estado: [cx, cy, w, h, vx, vy, vw, vh]; dt en segundos (los frames del
+    navegador llegan cada ~2 s y los de main.py cada pocos ms).
+    """
+
+    def __init__(self, box):
+        x, y, w, h = box
+        self.x = np.array([x + w / 2, y + h / 2, w, h, 0, 0, 0, 0], dtype=np.float64)
+        self.P = np.diag([10, 10, 10, 10, 1e3, 1e3, 1e3, 1e3]).astype(np.float64)
+        self.R = np.diag([4, 4, 9, 9]).astype(np.float64)
+        self.H = np.eye(4, 8)
+
+    def predict(self, dt):
+        F = np.eye(8)
+        F[:4, 4:] = np.eye(4) * dt
+        # Ruido de proceso proporcional al tiempo transcurrido
+        Q = np.diag([1, 1, 1, 1, 10, 10, 10, 10]) * max(dt, 1e-3)
+        self.x = F @ self.x
+        self.x[2:4] = np.maximum(self.x[2:4], 1.0)
+        self.P = F @ self.P @ F.T + Q
+
+    def update(self, box):
+        x, y, w, h = box
+        z = np.array([x + w / 2, y + h / 2, w, h], dtype=np.float64)
+        S = self.H @ self.P @ self.H.T + self.R
+        K = self.P @ self.H.T @ np.linalg.inv(S)
+        self.x = self.x + K @ (z - self.H @ self.x)
+        self.P = (np.eye(8) - K @ self.H) @ self.P
+
+    @property
+    def box(self):
+        cx, cy, w, h = self.x[:4]
+        return (cx - w / 2, cy - h / 2, w, h)
+
+
+class Track:
+    """Un rostro seguido entre frames, con los votos de identidad acumulados."""
+
+    def __init__(self, track_id, box, now):
+        self.id = track_id
+        self.kf = KalmanBox(box)
+        self.box = tuple(int(v) for v in box)  # última caja detectada
+        self.created_at = now
+        self.last_seen = now
+        self.hits = 1
+        self.votes = {}         # identidad -> cantidad de votos
+        self.similarity = {}    # identidad -> suma de similitudes de esos votos
+        self.recognitions = 0
+        self.last_recognized = None
+        self.last_result = {}   # último resultado de reconocimiento (min_dist, top_k, ...)
+
+    def vote(self, identity, similarity, now):
+        self.votes[identity] = self.votes.get(identity, 0) + 1
+        self.similarity[identity] = self.similarity.get(identity, 0.0) + float(similarity)
+        self.recognitions += 1
+        self.last_recognized = now
+
+    @property
+    def identity(self):
+        """(identidad, confianza, similitud media): la más votada; a igual votos, la más similar."""
+        if not self.votes:
+            return UNKNOWN, 0.0, 0.0
+        best = max(self.votes, key=lambda k: (self.votes[k], self.similarity[k]))
+        confidence = self.votes[best] / sum(self.votes.values())
+        return best, confidence, self.similarity[best] / self.votes[best]
+
+    @property
+    def settled(self):
+        """Identidad estable (incluido un desconocido estable): basta con re-verificar cada tanto."""
+        _, confidence, _ = self.identity
+        return self.recognitions >= MIN_VOTES and confidence >= MIN_CONFIDENCE
+
+    def needs_recognition(self, now, reverify_interval=REVERIFY_INTERVAL):
+        """Track nuevo, identidad aún no estable, o venció el intervalo de re-verificación."""
+        if self.last_recognized is None or not self.settled:
+            return True
+        return now - self.last_recognized >= reverify_interval
+
+
+class FaceTracker:
+    """
+    Tracker multi-objeto estilo SORT: predicción con Kalman y asociación
+    greedy por IoU entre las cajas predichas y las detecciones del frame.
+    Así cada persona se reconoce al aparecer y luego solo cada
+    `reverify_interval` segundos, en vez de en cada frame.
+    """
+
+    def __init__(self, iou_threshold=IOU_THRESHOLD, max_age=MAX_AGE, reverify_interval=REVERIFY_INTERVAL):
+        self.iou_threshold = iou_threshold
+        self.max_age = max_age
+        self.reverify_interval = reverify_interval
+        self.tracks = []
+        self._next_id = 1
+        self._last_update = None
+        # Un tracker por stream: serializa las requests concurrentes del mismo cliente
+        self.lock = threading.Lock()
+        self.detections = 0
+        self.recognitions = 0
+        # Caché de embeddings propia del stream (recognition/embedding_cache.py):
+        # la crea recognize_tracked al primer reconocimiento, nunca se comparte
+        self.embedding_cache = None
+
+    def update(self, boxes, now=None):
+        """
+        boxes: detecciones (x, y, w, h) del frame.
+        Retorna la lista de tracks alineada con boxes (uno por detección).
+        """
+        now = time.monotonic() if now is None else now
+        dt = 0.0 if self._last_update is None else now - self._last_update
+        self._last_update = now
+
+        # Los tracks vencidos salen antes de asociar: una persona que aparece
+        # en el mismo lugar después de max_age es un track nuevo, no hereda
+        # la identidad del anterior
+        self.tracks = [t for t in self.tracks if now - t.last_seen <= self.max_age]
+        for t in self.tracks:
+            t.kf.predict(dt)
+
+        dets = np.array(boxes, dtype=np.float64).reshape(-1, 4)
+        preds = np.array([t.kf.box for t in self.tracks], dtype=np.float64).reshape(-1, 4)
+        ious = iou_matrix(preds, dets)
+
+        assigned = [None] * len(dets)
+        used = set()
+        # Greedy: primero los pares con mayor IoU
+        for ti, di in zip(*np.unravel_index(np.argsort(-ious, axis=None), ious.shape)):
+            if ious[ti, di] < self.iou_threshold:
+                break
+            if ti in used or assigned[di] is not None:
+                continue
+            used.add(ti)
+            track = self.tracks[ti]
+            track.kf.update(dets[di])
+            track.box = tuple(int(v) for v in boxes[di])
+            track.last_seen = now
+            track.hits += 1
+            assigned[di] = track
+
+        for di, track in enumerate(assigned):
+            if track is None:
+                track = Track(self._next_id, boxes[di], now)
+                self._next_id += 1
+                self.tracks.append(track)
+                assigned[di] = track
+
+        self.detections += len(dets)
+        return assigned
+
+    def stats(self):
+        return {
+            "tracks": len(self.tracks),
+            "detections": self.detections,
+            "recognitions": self.recognitions,
+            "recognitions_per_detection": round(self.recognitions / self.detections, 4) if self.detections else 0.0,
+        }
+
+
+class TrackerPool:
+    """Un FaceTracker por stream (cámara/pestaña del navegador); los inactivos expiran."""
+
+    def __init__(self, ttl=60.0, **tracker_kwargs):
+        self.ttl = ttl
+        self.tracker_kwargs = tracker_kwargs
+        self._trackers = {}  # clave -> (tracker, último uso)
+        self._lock = threading.Lock()
+
+    def get(self, key) -> FaceTracker:
+        now = time.monotonic()
+        with self._lock:
+            for k in [k for k, (_, used) in self._trackers.items() if now - used > self.ttl]:
+                del self._trackers[k]
+            tracker = self._trackers.get(key, (None, None))[0] or FaceTracker(**self.tracker_kwargs)
+            self._trackers[key] = (tracker, now)
+            return tracker
+
+    def active(self):
+        """Trackers vigentes (snapshot, para estadísticas)."""
+        with self._lock:
+            return [tracker for tracker, _ in self._trackers.values()]
+
+    def __len__(self):
+        with self._lock:
+            return len(self._trackers)
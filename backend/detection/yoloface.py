@@ -1,3 +1,6 @@
+import os
+import numpy as np
+import cv2
 from ultralytics import YOLO
 
 # Cargar modelo una sola vez
@@ -14,3 +17,82 @@ def detect_faces(frame):
         boxes.append((x1, y1, w, h))
 
     return boxes
+
+def warmup(shape=(480, 640, 3), runs=2):
+    """Inferencias sobre un frame negro para que la primera request real no pague la inicialización."""
+    frame = np.zeros(shape, dtype=np.uint8)
+    for _ in range(runs):
+        model.predict(source=frame, conf=0.5, verbose=False)
+
+# Lado mayor al que se lleva cada frame del batch (el tamaño de entrada de YOLOv8)
+BATCH_IMGSZ = 640
+# Múltiplo al que YOLOv8 lleva el alto y el ancho de la entrada
+STRIDE = 32
+# Frames por llamada a YOLO en procesamiento offline (enrolamiento, videos).
+# En CPU el batch no acelera la inferencia (benchmarks/bench_detect_batch.py:
+# igual que detect_faces hasta 4-8 frames y ~20% más lento con 16), solo
+# ahorra llamadas; en GPU conviene subirlo
+BATCH_SIZE = int(os.getenv("CHECKFACE_DETECT_BATCH", "4"))
+
+def batch_shape(frames, size=BATCH_IMGSZ, stride=STRIDE):
+    """
+    (alto, ancho) común del lote: el rectángulo múltiplo de stride más chico
+    que contiene a cada frame escalado a lado mayor size. Con frames del mismo
+    tamaño es el mismo rectángulo que arma YOLO en un predict individual, así
+    que el batch no procesa relleno de más (un cuadrado de 640 para frames de
+    640x480 es un 33% más de cómputo).
+    """
+    th = tw = 0
+    for frame in frames:
+        h, w = frame.shape[:2]
+        r = min(size / h, size / w)
+        th = max(th, -(-int(round(h * r)) // stride) * stride)
+        tw = max(tw, -(-int(round(w * r)) // stride) * stride)
+    return th, tw
+
+def letterbox(frame, size=BATCH_IMGSZ, shape=None):
+    """
+    Redimensiona a lado mayor size manteniendo la relación de aspecto y
+    rellena (gris 114, centrado) hasta shape = (alto, ancho), por defecto
+    size x size. Mismo resize que el LetterBox de ultralytics (INTER_LINEAR)
+    para que las cajas coincidan con las de detect_faces.
+    Retorna (img, escala, pad_x, pad_y).
+    """
+    h, w = frame.shape[:2]
+    th, tw = shape or (size, size)
+    r = min(size / h, size / w)
+    nw, nh = int(round(w * r)), int(round(h * r))
+    resized = cv2.resize(frame, (nw, nh), interpolation=cv2.INTER_LINEAR) if (nw, nh) != (w, h) else frame
+    pad_x, pad_y = (tw - nw) // 2, (th - nh) // 2
+    out = np.full((th, tw, 3), 114, dtype=np.uint8)
+    out[pad_y:pad_y + nh, pad_x:pad_x + nw] = resized
+    return out, r, pad_x, pad_y
+
+def detect_faces_batch(frames, conf=0.5, imgsz=BATCH_IMGSZ):
+    """
+    Detecta rostros en varios frames (de cualquier tamaño) con una sola
+    llamada al modelo: cada frame se lleva con letterbox al rectángulo común
+    del lote (batch_shape) y las cajas se reescalan a la imagen original.
+    Retorna, por frame, una lista de (x, y, w, h, confianza).
+    """
+    if not frames:
+        return []
+
+    shape = batch_shape(frames, imgsz)
+    boxed = [letterbox(f, imgsz, shape) for f in frames]
+    results = model.predict(source=[b[0] for b in boxed], conf=conf, imgsz=imgsz,
+                            batch=len(boxed), verbose=False)
+
+    out = []
+    for frame, (_, r, pad_x, pad_y), res in zip(frames, boxed, results):
+        h, w = frame.shape[:2]
+        boxes = []
+        if len(res.boxes):
+            xyxy = res.boxes.xyxy.cpu().numpy()
+            confs = res.boxes.conf.cpu().numpy()
+            xyxy[:, [0, 2]] = np.clip((xyxy[:, [0, 2]] - pad_x) / r, 0, w)
+            xyxy[:, [1, 3]] = np.clip((xyxy[:, [1, 3]] - pad_y) / r, 0, h)
+            for (x1, y1, x2, y2), c in zip(xyxy.astype(int), confs):
+                boxes.append((int(x1), int(y1), int(x2 - x1), int(y2 - y1), float(c)))
+        out.append(boxes)
+    return out
@@ -0,0 +1,149 @@
+# backend/edge_agent.py
+
+import os
+import threading
+import requests
+from recognition import quality
+from recognition.quality import QUALITY_ENABLED
+from recognition.face_recognizer import embed_crops, rejected_result, match_embeddings, result_from_match
+import edge_protocol
+
+# Backend central al que el agente manda los embeddings
+EDGE_SERVER = os.getenv("CHECKFACE_EDGE_SERVER", "http://127.0.0.1:5000")
+# Timeout de cada POST a /api/match (s)
+EDGE_TIMEOUT = float(os.getenv("CHECKFACE_EDGE_TIMEOUT", "5"))
+
+
+class EdgeAgent:
+    """
+    Modo borde de main.py: YOLO y ArcFace corren en la máquina del aula y al
+    servidor solo viajan los embeddings (float16) de los tracks que
+    necesitan reconocimiento, con su caja y puntajes de calidad. El servidor
+    solo busca en la galería y lleva la asistencia (sesión de reconocimiento).
+
+    `recognize` tiene la firma de recognize_fn de recognize_tracked.
+    fallback_gallery: galería local con la que se sigue reconociendo si el
+    servidor no responde (la asistencia queda en el diario, ver edge_journal.py).
+    """
+
+    def __init__(self, server=EDGE_SERVER, course_id=None, model_name="ArcFace", min_votes=None,
+                 timeout=EDGE_TIMEOUT, quality_gate=QUALITY_ENABLED, fallback_gallery=None):
+        self.server = server.rstrip("/")
+        self.course_id = course_id
+        self.model_name = model_name
+        self.min_votes = min_votes
+        self.timeout = timeout
+        self.quality_gate = quality_gate
+        self.fallback_gallery = fallback_gallery
+        self.http = requests.Session()
+        self.session_id = None
+        self._lock = threading.Lock()
+        self.uploads = 0
+        self.faces_sent = 0
+        self.bytes_sent = 0
+        self.errors = 0
+        self.offline_matches = 0
+        self.committed = []
+
+    # -----------------------------
+    # Sesión en el servidor
+    # -----------------------------
+    def start(self):
+        """Resuelve el curso activo (si no se indicó) y abre la sesión de reconocimiento."""
+        if not self.course_id:
+            res = self.http.get(f"{self.server}/api/current_course", timeout=self.timeout)
+            res.raise_for_status()
+            self.course_id = (res.json() or {}).get("course_id")
+            if not self.course_id:
+                raise RuntimeError("No hay curso activo para esta hora y fecha")
+
+        body = {"course_id": self.course_id}
+        if self.min_votes:
+            body["min_votes"] = self.min_votes
+        res = self.http.post(f"{self.server}/api/sessions", json=body, timeout=self.timeout)
+        res.raise_for_status()
+        self.session_id = res.json()["session_id"]
+        print(f"🛰️ Sesión {self.session_id} abierta en {self.server} (curso {self.course_id})")
+        return self
+
+    def close(self):
+        if not self.session_id:
+            return None
+        try:
+            res = self.http.delete(f"{self.server}/api/sessions/{self.session_id}", timeout=self.timeout)
+            res.raise_for_status()
+            return res.json()
+        except requests.RequestException as e:
+            print("⚠️ No se pudo cerrar la sesión:", e)
+            return None
+
+    # -----------------------------
+    # Reconocimiento (recognize_fn)
+    # -----------------------------
+    def recognize(self, crops, boxes, track_ids):
+        results = [None] * len(crops)
+        keep = list(range(len(crops)))
+        report = None
+
+        if self.quality_gate and crops:
+            report = quality.assess(crops, sizes=[min(w, h) for (_, _, w, h) in boxes])
+            keep = [i for i in keep if report["ok"][i]]
+            for i, reasons in enumerate(report["reasons"]):
+                if reasons:
+                    results[i] = rejected_result(reasons)
+        if not keep:
+            return results
+
+        embs = embed_crops([crops[i] for i in keep], model_name=self.model_name)
+        sub_report = {k: v[keep] for k, v in report.items() if k != "reasons"} if report else None
+        payload = edge_protocol.pack(embs, [boxes[i] for i in keep], [track_ids[i] for i in keep],
+                                     sub_report, course_id=self.course_id)
+
+        try:
+            res = self.http.post(
+                f"{self.server}/api/match",
+                data=payload,
+                params={"session_id": self.session_id} if self.session_id else None,
+                headers={"Content-Type": edge_protocol.CONTENT_TYPE},
+                timeout=self.timeout,
+            )
+            res.raise_for_status()
+            data = res.json()
+        except (requests.RequestException, ValueError) as e:
+            with self._lock:
+                self.errors += 1
+            print("⚠️ Error al consultar /api/match:", e)
+            # Con galería local se sigue reconociendo; si no, los tracks quedan sin voto y se reintentan
+            if self.fallback_gallery is not None and len(self.fallback_gallery):
+                for i, m in zip(keep, match_embeddings(embs, self.fallback_gallery)):
+                    results[i] = {**result_from_match(m), "offline": True}
+                with self._lock:
+                    self.offline_matches += len(keep)
+            else:
+                for i in keep:
+                    results[i] = rejected_result(["offline"])
+            return results
+
+        with self._lock:
+            self.uploads += 1
+            self.faces_sent += len(keep)
+            self.bytes_sent += len(payload)
+            self.committed.extend(data.get("committed", []))
+        for c in data.get("committed", []):
+            print(f"✅ Asistencia registrada: CI {c['ci']} {c.get('full_name') or ''}")
+
+        for i, r in zip(keep, data["results"]):
+            results[i] = r
+        return results
+
+    def stats(self):
+        with self._lock:
+            return {
+                "uploads": self.uploads,
+                "faces_sent": self.faces_sent,
+                "bytes_sent": self.bytes_sent,
+                "bytes_per_face": round(self.bytes_sent / self.faces_sent) if self.faces_sent else 0,
+                "errors": self.errors,
+                "offline_matches": self.offline_matches,
+                "committed": len(self.committed),
+            }
@@ -0,0 +1,207 @@
+# backend/edge_journal.py
+#
+# Diario local de reconocimientos del aula: cada identidad estable se anota
+# en un SQLite de solo agregado (no depende de la red) y un hilo aparte lo
+# replica al backend en lotes grandes cuando hay conexión. El ingreso en el
+# servidor es un upsert contra unique_attendance_per_day, así que reenviar
+# un lote (p. ej. si se cortó la respuesta) no duplica asistencias.
+
+import os
+import time
+import sqlite3
+import threading
+import requests
+from datetime import date as _date
+from detection.tracker import MIN_VOTES, MIN_CONFIDENCE
+
+JOURNAL_PATH = os.getenv("CHECKFACE_JOURNAL",
+                         os.path.join(os.path.dirname(os.path.abspath(__file__)), "edge_journal.sqlite3"))
+# Eventos por POST a /api/asistencia/bulk
+SYNC_BATCH_SIZE = int(os.getenv("CHECKFACE_JOURNAL_BATCH", "5000"))
+# Segundos entre intentos de sincronización; con errores se duplica hasta SYNC_MAX_BACKOFF
+SYNC_INTERVAL = float(os.getenv("CHECKFACE_JOURNAL_SYNC_INTERVAL", "10"))
+SYNC_MAX_BACKOFF = float(os.getenv("CHECKFACE_JOURNAL_MAX_BACKOFF", "300"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts REAL NOT NULL,
+    course_id INTEGER NOT NULL,
+    ci INTEGER NOT NULL,
+    date TEXT NOT NULL,
+    similarity REAL,
+    track_id INTEGER
+);
+-- Hasta qué evento ya se replicó (los eventos nunca se modifican)
+CREATE TABLE IF NOT EXISTS sync_state (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    last_id INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO sync_state (id, last_id) VALUES (1, 0);
+"""
+
+
+class RecognitionJournal:
+    """SQLite de solo agregado (WAL, una conexión compartida entre hilos con lock)."""
+
+    def __init__(self, path=JOURNAL_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # NORMAL con WAL: un corte de luz puede perder la última transacción, no corromper el archivo
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def append(self, events):
+        """events: dicts con course_id, ci, date (YYYY-MM-DD) y opcionalmente similarity, track_id, ts."""
+        rows = [(e.get("ts", time.time()), int(e["course_id"]), int(e["ci"]), e["date"],
+                 e.get("similarity"), e.get("track_id")) for e in events]
+        if not rows:
+            return 0
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO events (ts, course_id, ci, date, similarity, track_id) VALUES (?, ?, ?, ?, ?, ?)",
+                rows)
+        return len(rows)
+
+    def pending(self, limit=SYNC_BATCH_SIZE):
+        """Próximo lote sin replicar: (último id del lote, [eventos])."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, course_id, ci, date FROM events "
+                "WHERE id > (SELECT last_id FROM sync_state) ORDER BY id LIMIT ?", (limit,)).fetchall()
+        if not rows:
+            return None, []
+        return rows[-1][0], [{"course_id": r[1], "ci": r[2], "date": r[3]} for r in rows]
+
+    def mark_synced(self, last_id):
+        with self._lock:
+            self._conn.execute("UPDATE sync_state SET last_id = MAX(last_id, ?) WHERE id = 1", (last_id,))
+
+    def stats(self):
+        with self._lock:
+            total, = self._conn.execute("SELECT COUNT(*) FROM events").fetchone()
+            last_id, = self._conn.execute("SELECT last_id FROM sync_state").fetchone()
+            pending, = self._conn.execute("SELECT COUNT(*) FROM events WHERE id > ?", (last_id,)).fetchone()
+        return {"events": total, "pending": pending}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class AttendanceRecorder:
+    """
+    Anota en el diario los CIs cuya identidad de track ya es estable (mismos
+    umbrales que detection/tracker.py), una vez por CI y por día.
+    """
+
+    def __init__(self, journal: RecognitionJournal, course_id, syncer=None):
+        self.journal = journal
+        self.course_id = int(course_id)
+        self.syncer = syncer
+        self._seen = set()
+
+    def record(self, results):
+        today = _date.today().isoformat()
+        events = []
+        for r in results:
+            ci = str(r.get("name", ""))
+            if not (r.get("match") and ci.isdigit()):
+                continue
+            if r.get("votes", 0) < MIN_VOTES or r.get("track_confidence", 0.0) < MIN_CONFIDENCE:
+                continue
+            if (ci, today) in self._seen:
+                continue
+            self._seen.add((ci, today))
+            events.append({"course_id": self.course_id, "ci": ci, "date": today,
+                           "similarity": r.get("similarity"), "track_id": r.get("track_id")})
+
+        if events:
+            self.journal.append(events)
+            print(f"📝 Diario: {', '.join(e['ci'] for e in events)}")
+            if self.syncer:
+                self.syncer.notify()
+        return events
+
+
+class JournalSyncer:
+    """Hilo que replica el diario a /api/asistencia/bulk, con reintentos y backoff exponencial."""
+
+    def __init__(self, journal: RecognitionJournal, server, batch_size=SYNC_BATCH_SIZE,
+                 interval=SYNC_INTERVAL, max_backoff=SYNC_MAX_BACKOFF, timeout=30):
+        self.journal = journal
+        self.url = server.rstrip("/") + "/api/asistencia/bulk"
+        self.batch_size = batch_size
+        self.interval = interval
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.http = requests.Session()
+        self.synced = 0
+        self.batches = 0
+        self.errors = 0
+        self.last_error = None
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="journal-sync", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, flush=True):
+        """Detiene el hilo; con flush intenta una última sincronización."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout=self.timeout)
+        if flush:
+            try:
+                self.sync_once()
+            except Exception as e:
+                print("⚠️ Quedaron eventos sin sincronizar:", e)
+
+    def notify(self):
+        """Pide una sincronización inmediata (p. ej. tras anotar eventos)."""
+        self._wake.set()
+
+    def sync_once(self):
+        """Replica todo lo pendiente en lotes. Retorna los eventos enviados; lanza si falla un lote."""
+        sent = 0
+        while True:
+            last_id, events = self.journal.pending(self.batch_size)
+            if not events:
+                return sent
+            res = self.http.post(self.url, json={"events": events}, timeout=self.timeout)
+            res.raise_for_status()
+            # Solo se avanza el cursor con el lote confirmado: si falla, se reenvía (idempotente)
+            self.journal.mark_synced(last_id)
+            sent += len(events)
+            self.synced += len(events)
+            self.batches += 1
+
+    def _run(self):
+        delay = self.interval
+        while not self._stop.is_set():
+            try:
+                if self.sync_once():
+                    print(f"🔄 Diario sincronizado: {self.synced} eventos en {self.batches} lotes")
+                self.last_error = None
+                delay = self.interval
+            except requests.RequestException as e:
+                self.errors += 1
+                self.last_error = str(e)
+                delay = min(delay * 2, self.max_backoff)
+            self._wake.wait(delay)
+            self._wake.clear()
+
+    def stats(self):
+        return {
+            "synced": self.synced,
+            "batches": self.batches,
+            "errors": self.errors,
+            "last_error": self.last_error,
+            **self.journal.stats(),
+        }
@@ -0,0 +1,72 @@
+# backend/edge_protocol.py
+#
+# Formato binario con el que el agente de borde (main.py --edge) manda
+# embeddings a /api/match en lugar de frames JPEG:
+#
+#   cabecera  "<4sBBHHI": magic b"CFE1", versión, flags, n, dim, course_id
+#   metadatos n registros META_DTYPE (track, caja y puntajes de calidad)
+#   vectores  n × dim float16 (little-endian), normalizados L2
+#
+# Un rostro ocupa ~1 KB (512 × 2 bytes + 20 de metadatos) contra decenas
+# de KB de un frame JPEG de 640x480.
+
+import struct
+import numpy as np
+
+MAGIC = b"CFE1"
+VERSION = 1
+CONTENT_TYPE = "application/x-checkface-embeddings"
+
+HEADER = struct.Struct("<4sBBHHI")
+META_DTYPE = np.dtype([
+    ("track_id", "<u4"),
+    ("box", "<i2", (4,)),       # x, y, w, h en px del frame
+    ("size", "<f2"),            # lado menor de la caja
+    ("sharpness", "<f2"),
+    ("brightness", "<f2"),
+    ("yaw", "<f2"),
+])
+
+
+def pack(embs, boxes, track_ids=None, report=None, course_id=0) -> bytes:
+    """
+    embs: (n, dim) embeddings normalizados; boxes: (x, y, w, h) de cada uno.
+    report: salida de recognition.quality.assess para esos rostros (opcional).
+    """
+    embs = np.asarray(embs, dtype=np.float32).reshape(len(boxes), -1)
+    n, dim = embs.shape
+
+    meta = np.zeros(n, dtype=META_DTYPE)
+    if n:
+        meta["track_id"] = track_ids if track_ids is not None else 0
+        meta["box"] = np.clip(np.asarray(boxes, dtype=np.int64), -32768, 32767)
+        if report is not None:
+            for field in ("size", "sharpness", "brightness", "yaw"):
+                if field in report:
+                    # float16 satura en 65504 (varianza del Laplaciano de recortes muy nítidos)
+                    meta[field] = np.clip(report[field], 0, 65504)
+
+    header = HEADER.pack(MAGIC, VERSION, 0, n, dim, int(course_id or 0))
+    return header + meta.tobytes() + embs.astype("<f2").tobytes()
+
+
+def unpack(data: bytes) -> dict:
+    """
+    Retorna {"course_id", "embs" (n, dim) float32 renormalizados, "meta"}.
+    Lanza ValueError si el payload está truncado o no es de este formato.
+    """
+    if len(data) < HEADER.size:
+        raise ValueError("Payload inválido: cabecera incompleta")
+    magic, version, _flags, n, dim, course_id = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Payload inválido: formato o versión desconocidos")
+
+    meta_end = HEADER.size + n * META_DTYPE.itemsize
+    if len(data) != meta_end + n * dim * 2:
+        raise ValueError("Payload inválido: tamaño inconsistente")
+
+    meta = np.frombuffer(data, dtype=META_DTYPE, count=n, offset=HEADER.size)
+    embs = np.frombuffer(data, dtype="<f2", count=n * dim, offset=meta_end).astype(np.float32).reshape(n, dim)
+    # float16 pierde ~1e-3 de norma: se renormaliza antes de comparar con la galería
+    embs /= np.linalg.norm(embs, axis=1, keepdims=True) + 1e-10
+    return {"course_id": course_id, "embs": embs, "meta": meta}
@@ -0,0 +1,44 @@
+# backend/export_arcface_onnx.py
+#
+# Exporta el ArcFace de DeepFace a ONNX para los backends 'onnx' y 'opencv'
+# (recognition/embedding_backends.py) y opcionalmente genera la variante INT8.
+# Requiere, solo para exportar: pip install tf2onnx onnxruntime
+# Ejemplo (desde la raíz del repo):
+#   python backend/export_arcface_onnx.py --int8
+
+import os
+import argparse
+from recognition.embedding_backends import ONNX_MODEL_PATH, ONNX_INT8_MODEL_PATH, quantize_int8
+
+
+def exportar(path=ONNX_MODEL_PATH, opset=13):
+    import tensorflow as tf
+    import tf2onnx
+    from deepface import DeepFace
+
+    client = DeepFace.build_model("ArcFace")
+    h, w = client.input_shape
+    # Batch dinámico, NHWC en [0, 1]: el mismo tensor que arma preprocess_crops
+    spec = (tf.TensorSpec((None, h, w, 3), tf.float32, name="input"),)
+
+    @tf.function(input_signature=spec)
+    def forward(x):
+        return client.model(x, training=False)
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tf2onnx.convert.from_function(forward, input_signature=spec, opset=opset, output_path=path)
+    print(f"✅ ArcFace exportado a {path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Exporta ArcFace (DeepFace) a ONNX")
+    parser.add_argument("--output", default=ONNX_MODEL_PATH)
+    parser.add_argument("--opset", type=int, default=13)
+    parser.add_argument("--int8", action="store_true", help="generar también la variante INT8 dinámica")
+    args = parser.parse_args()
+
+    exportar(args.output, args.opset)
+    if args.int8:
+        dst = ONNX_INT8_MODEL_PATH if args.output == ONNX_MODEL_PATH else args.output.replace(".onnx", ".int8.onnx")
+        quantize_int8(args.output, dst)
+        print(f"✅ Variante INT8 en {dst}")
@@ -0,0 +1,241 @@
+# backend/inference_server.py
+
+import os
+import time
+import queue
+import threading
+from concurrent.futures import Future
+import numpy as np
+
+# Límites del micro-batching (configurables por entorno). MAX_BATCH cuenta
+# unidades de trabajo del modelo: frames en el detector, recortes en ArcFace
+MAX_BATCH = int(os.getenv("CHECKFACE_BATCH_MAX_SIZE", "16"))
+MAX_WAIT_MS = float(os.getenv("CHECKFACE_BATCH_MAX_WAIT_MS", "10"))
+# Tiempo máximo que una request espera su resultado
+RESULT_TIMEOUT = float(os.getenv("CHECKFACE_BATCH_TIMEOUT", "30"))
+# Opt-in: CHECKFACE_MICROBATCH=1. Solo conviene con workers con hilos
+# (gthread) y varias requests concurrentes por proceso; con workers sync cada
+# request pagaría la espera del batch y el salto de hilo sin agrupar nada.
+MICROBATCH_ENABLED = os.getenv("CHECKFACE_MICROBATCH", "0") == "1"
+
+
+class MicroBatcher:
+    """
+    Cola compartida con un hilo dedicado que agrupa pedidos en batches.
+
+    submit(item) retorna un Future. El hilo toma el primer pedido disponible
+    y sigue juntando pedidos mientras la suma de size_fn(item) no supere
+    max_batch y no pasen max_wait_ms desde el primero; luego llama una sola
+    vez a fn(items), que debe retornar un resultado por item, y resuelve
+    cada Future. Un pedido que solo ya supera max_batch va en un batch propio.
+
+    El hilo se crea perezosamente en el primer submit de cada proceso: tras
+    el fork de gunicorn cada worker levanta el suyo (los hilos no sobreviven
+    al fork, y crearlos al importar el módulo con --preload los dejaría en
+    el proceso maestro).
+    """
+
+    def __init__(self, fn, name, max_batch=MAX_BATCH, max_wait_ms=MAX_WAIT_MS, size_fn=None):
+        self.fn = fn
+        self.name = name
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self.size_fn = size_fn or (lambda item: 1)
+        self._lock = threading.Lock()
+        self._pid = None
+        self._queue = None
+        self._carry = None   # pedido que no entró en el batch anterior
+        self._stop = threading.Event()
+        self._thread = None
+        self._stats_lock = threading.Lock()
+        self._reset_stats()
+
+    def _reset_stats(self):
+        self.batches = 0
+        self.items = 0
+        self.units = 0
+        self.max_depth = 0
+        self.wait_s = 0.0   # espera acumulada en cola (de cada item)
+        self.run_s = 0.0    # tiempo acumulado dentro de fn
+        self.errors = 0
+
+    def start(self):
+        pid = os.getpid()
+        if self._pid != pid or self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._pid != pid:
+                    # La cola y las estadísticas heredadas son del proceso padre
+                    self._queue = queue.Queue()
+                    self._carry = None
+                    self._thread = None
+                    self._pid = pid
+                    with self._stats_lock:
+                        self._reset_stats()
+                if self._thread is None or not self._thread.is_alive():
+                    self._stop.clear()
+                    self._thread = threading.Thread(target=self._loop, name=f"microbatch-{self.name}", daemon=True)
+                    self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+
+    def submit(self, item) -> Future:
+        self.start()
+        future = Future()
+        self._queue.put((item, future, time.perf_counter()))
+        depth = self._queue.qsize()
+        if depth > self.max_depth:
+            self.max_depth = depth
+        return future
+
+    def __call__(self, item, timeout=RESULT_TIMEOUT):
+        return self.submit(item).result(timeout=timeout)
+
+    def _collect(self):
+        if self._carry is not None:
+            first, self._carry = self._carry, None
+        else:
+            try:
+                first = self._queue.get(timeout=0.2)
+            except queue.Empty:
+                return []
+        batch = [first]
+        units = self.size_fn(first[0])
+        deadline = time.perf_counter() + self.max_wait
+        while units < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                entry = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            size = self.size_fn(entry[0])
+            if units + size > self.max_batch:
+                # No entra: abre el próximo batch
+                self._carry = entry
+                break
+            batch.append(entry)
+            units += size
+        return batch
+
+    def _loop(self):
+        while not self._stop.is_set():
+            batch = self._collect()
+            if not batch:
+                continue
+
+            items = [item for item, _, _ in batch]
+            started = time.perf_counter()
+            try:
+                results = self.fn(items)
+                for (_, future, _), res in zip(batch, results):
+                    future.set_result(res)
+            except Exception as e:
+                print(f"❌ Error en el batch de {self.name}: {e}")
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                with self._stats_lock:
+                    self.errors += 1
+            finished = time.perf_counter()
+
+            with self._stats_lock:
+                self.batches += 1
+                self.items += len(batch)
+                self.units += sum(self.size_fn(item) for item in items)
+                self.wait_s += sum(started - t for _, _, t in batch)
+                self.run_s += finished - started
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                "running": self._pid == os.getpid() and self._thread is not None and self._thread.is_alive(),
+                "queue_depth": self._queue.qsize() if self._pid == os.getpid() else 0,
+                "max_queue_depth": self.max_depth,
+                "batches": self.batches,
+                "items": self.items,
+                "units": self.units,
+                # En unidades (frames o recortes), no en requests
+                "avg_batch_size": round(self.units / self.batches, 2) if self.batches else 0.0,
+                "avg_wait_ms": round(self.wait_s / self.items * 1000, 2) if self.items else 0.0,
+                "avg_batch_ms": round(self.run_s / self.batches * 1000, 2) if self.batches else 0.0,
+                "errors": self.errors,
+                "max_batch": self.max_batch,
+                "max_wait_ms": self.max_wait * 1000,
+            }
+
+
+class InferenceServer:
+    """
+    Detección (YOLO) y embeddings (ArcFace) compartidos entre todas las
+    requests del proceso: cada handler envía su frame o sus recortes y un
+    único hilo por modelo los corre en batch. Con gunicorn conviene usar
+    workers con hilos (--worker-class gthread) para que haya requests
+    concurrentes que agrupar dentro de cada proceso.
+    Los hilos arrancan con la primera request de cada worker; start() solo
+    hace falta para levantarlos antes (p. ej. en un benchmark).
+    """
+
+    def __init__(self, max_batch=MAX_BATCH, max_wait_ms=MAX_WAIT_MS, model_name="ArcFace"):
+        self.model_name = model_name
+        self.max_batch = max_batch
+        self.detector = MicroBatcher(self._detect_batch, "detector", max_batch, max_wait_ms)
+        # Cada pedido del embedder es la lista de recortes de una request: pesa len(recortes)
+        self.embedder = MicroBatcher(self._embed_batch, "embedder", max_batch, max_wait_ms, size_fn=len)
+
+    def start(self):
+        self.detector.start()
+        self.embedder.start()
+        return self
+
+    def stop(self):
+        self.detector.stop()
+        self.embedder.stop()
+
+    # -----------------------------
+    # Funciones de batch (corren en el hilo de cada MicroBatcher)
+    # -----------------------------
+    @staticmethod
+    def _detect_batch(frames):
+        from detection.yoloface import detect_faces_batch
+        # Los handlers usan (x, y, w, h), igual que detect_faces
+        return [[b[:4] for b in boxes] for boxes in detect_faces_batch(frames)]
+
+    def _embed_batch(self, crop_lists):
+        """
+        Cada item es la lista de recortes de una request: se aplana, se embebe
+        en pasadas de a lo sumo max_batch recortes y se reparte.
+        """
+        from recognition.face_recognizer import embed_crops
+        flat = [crop for crops in crop_lists for crop in crops]
+        embs = np.concatenate([embed_crops(flat[i:i + self.max_batch], model_name=self.model_name)
+                               for i in range(0, len(flat), self.max_batch)])
+        out, start = [], 0
+        for crops in crop_lists:
+            out.append(embs[start:start + len(crops)])
+            start += len(crops)
+        return out
+
+    # -----------------------------
+    # API para los handlers
+    # -----------------------------
+    def detect(self, frame):
+        return self.detector(frame)
+
+    def embed(self, face_crops, model_name="ArcFace"):
+        """
+        Misma firma que face_recognizer.embed_crops. El batcher corre solo
+        self.model_name: otro modelo se embebe directo, sin agrupar.
+        """
+        if model_name != self.model_name:
+            from recognition.face_recognizer import embed_crops
+            return embed_crops(face_crops, model_name=model_name)
+        if len(face_crops) == 0:
+            return np.empty((0, 0), dtype=np.float32)
+        return self.embedder(list(face_crops))
+
+    def stats(self):
+        return {"detector": self.detector.stats(), "embedder": self.embedder.stats()}
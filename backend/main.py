@@ -1,50 +1,252 @@
-from detection.yoloface import detect_faces
-from recognition.face_recognizer import load_centroids, recognize_face
+import os
+import time
+import argparse
+import threading
 import cv2
+import requests
+from detection.yoloface import detect_faces
+from recognition.face_recognizer import load_centroids, recognize_tracked
+from detection.tracker import FaceTracker, MIN_VOTES as TRACK_MIN_VOTES
+from detection.frame_skip import SkippingDetector
+from pipeline import LatestSlot, DropOldestQueue, StageStats
+from edge_agent import EdgeAgent, EDGE_SERVER
+from edge_journal import RecognitionJournal, JournalSyncer, AttendanceRecorder
+
+# Frames detectados esperando reconocimiento (se descartan los más viejos)
+RECOGNITION_QUEUE_SIZE = int(os.getenv("CHECKFACE_PIPELINE_QUEUE", "2"))
+# YOLO cada N frames (N adaptativo) con flujo óptico entre medio; CHECKFACE_FRAME_SKIP=0 lo desactiva
+FRAME_SKIP = os.getenv("CHECKFACE_FRAME_SKIP", "1") != "0"
+# Cada cuántos segundos se imprimen las métricas por stage
+STATS_INTERVAL = 5.0
+
+WINDOW_NAME = "CheckFace - Reconocimiento en tiempo real"
+
+
+def abrir_camara():
+    cap = cv2.VideoCapture(0)
+    if not cap.isOpened():
+        print("⚠️ Cámara externa no disponible. Probando con cámara integrada...")
+        cap = cv2.VideoCapture(1)
+    if not cap.isOpened():
+        return None
+    # Buffer mínimo: el hilo de captura ya se queda solo con el último frame
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+    return cap
+
 
-# Cargar centroides
-centroids = load_centroids()
+# -----------------------------
+# Stages (cada uno en su hilo)
+# -----------------------------
+def captura(cap, frames: LatestSlot, stats: StageStats, stop: threading.Event):
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        ret, frame = cap.read()
+        if not ret:
+            print("⚠️ Error al capturar frame.")
+            stop.set()
+            break
+        frames.put((frame, t0))
+        stats.tick(time.perf_counter() - t0)
 
-print("🚀 Iniciando CheckFace: detección + reconocimiento en tiempo real...")
 
-cap = cv2.VideoCapture(0)
-if not cap.isOpened():
-    print("⚠️ Cámara externa no disponible. Probando con cámara integrada...")
-    cap = cv2.VideoCapture(1)
+def deteccion(frames: LatestSlot, detected: DropOldestQueue, stats: StageStats, stop: threading.Event,
+              skipper: SkippingDetector = None):
+    seq = 0
+    while not stop.is_set():
+        seq, item = frames.get(seq, timeout=0.5)
+        if item is None:
+            continue
+        frame, t_captura = item
 
-if not cap.isOpened():
-    print("❌ No se pudo abrir ninguna cámara.")
-    exit()
+        t0 = time.perf_counter()
+        boxes = skipper.detect(frame)[0] if skipper else detect_faces(frame)
+        stats.tick(time.perf_counter() - t0)
+        detected.put((frame, boxes, t_captura))
 
-while True:
-    ret, frame = cap.read()
-    if not ret:
-        print("⚠️ Error al capturar frame.")
-        break
 
-    boxes = detect_faces(frame)
+def reconocimiento(centroids, tracker: FaceTracker, detected: DropOldestQueue, annotations: LatestSlot,
+                   stats: StageStats, e2e: StageStats, stop: threading.Event, recognize_fn=None, recorder=None):
+    while not stop.is_set():
+        item = detected.get(timeout=0.5)
+        if item is None:
+            continue
+        frame, boxes, t_captura = item
 
-    for (x, y, w, h) in boxes:
-        # Recortar rostro detectado
-        face_crop = frame[y:y+h, x:x+w]
-        face_crop = cv2.resize(face_crop, (160, 160))
+        t0 = time.perf_counter()
+        # Tracking: ArcFace solo para rostros nuevos, inestables o a re-verificar
+        # En modo borde recognize_fn embebe localmente y resuelve la identidad en el servidor
+        results = recognize_tracked(frame, boxes, tracker, centroids, recognize_fn=recognize_fn)
+        now = time.perf_counter()
+        stats.tick(now - t0)
+        e2e.tick(now - t_captura)
 
-        # Reconocer
-        identity, min_dist, similarity = recognize_face(face_crop, centroids)
+        # Diario local: las identidades estables quedan anotadas aunque no haya red
+        if recorder:
+            recorder.record(results)
 
-        label = f"{identity} ({similarity:.1f}%)"
-        print(f"🔎 Detectado: {label}")
+        for res in results:
+            if res["recognized"]:
+                print(f"🔎 Track {res['track_id']}: {res['name']} ({res['similarity']:.1f}%, {res['votes']} votos)")
+        annotations.put([(tuple(r["box"]), r) for r in results])
 
-        # Dibujar en pantalla
+
+# -----------------------------
+# Display (hilo principal: cv2.imshow debe correr acá)
+# -----------------------------
+def dibujar(frame, annotations, all_stats):
+    for (x, y, w, h), res in annotations:
+        label = f"#{res['track_id']} {res['name']} ({res['similarity']:.1f}%)"
         cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
         cv2.putText(frame, label, (x, y - 10),
                     cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2)
 
-    cv2.imshow("CheckFace - Reconocimiento en tiempo real", frame)
+    for i, stats in enumerate(all_stats):
+        cv2.putText(frame, str(stats), (10, 20 + 18 * i),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.45, (0, 255, 255), 1)
+
+
+def reportar(stats, detected, tracker, skipper, agent=None, syncer=None):
+    print("📊 " + " | ".join(str(s) for s in stats.values()) +
+          f" | descartados: {detected.dropped}")
+    print(f"👥 Tracking: {tracker.stats()}")
+    if skipper:
+        print(f"⏭️ Detección: {skipper.stats()}")
+    if agent:
+        print(f"🛰️ Borde: {agent.stats()}")
+    if syncer:
+        print(f"📝 Diario: {syncer.stats()}")
+
+
+def curso_activo(server):
+    """course_id del curso activo según el backend, o None si no responde."""
+    try:
+        res = requests.get(f"{server.rstrip('/')}/api/current_course", timeout=5)
+        res.raise_for_status()
+        return (res.json() or {}).get("course_id")
+    except (requests.RequestException, ValueError):
+        return None
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="CheckFace: detección + reconocimiento en tiempo real")
+    parser.add_argument("--edge", action="store_true",
+                        help="agente de borde sin ventana: manda embeddings a /api/match en vez de frames")
+    parser.add_argument("--server", default=None, help="backend central (default: CHECKFACE_EDGE_SERVER)")
+    parser.add_argument("--course-id", default=None, help="curso de la sesión (default: el curso activo)")
+    parser.add_argument("--journal", action="store_true",
+                        help="anota la asistencia en un diario local y lo sincroniza con /api/asistencia/bulk")
+    return parser.parse_args(argv)
 
-    if cv2.waitKey(1) & 0xFF == ord("q"):
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    server = args.server or EDGE_SERVER
+    # Con diario, la galería local permite seguir reconociendo sin conexión
+    centroids = load_centroids() if (not args.edge or args.journal) else None
+
+    agent = None
+    if args.edge:
+        # La sesión registra la asistencia con los mismos votos con que se estabiliza un track
+        agent = EdgeAgent(server, args.course_id, min_votes=TRACK_MIN_VOTES, fallback_gallery=centroids)
+        try:
+            agent.start()
+        except Exception as e:
+            if not (args.journal and args.course_id):
+                print("❌ No se pudo abrir la sesión en el servidor:", e)
+                return
+            # Sin servidor: se reconoce con la galería local y la asistencia queda en el diario
+            print("⚠️ Servidor no disponible, se sigue sin sesión:", e)
+        # En modo borde el reconocimiento lo resuelve el agente
+        centroids = None
+
+    recorder = syncer = None
+    if args.journal:
+        course_id = agent.course_id if agent and agent.course_id else args.course_id
+        if not course_id:
+            course_id = curso_activo(server)
+        if not course_id:
+            print("❌ Indicá --course-id: no se pudo obtener el curso activo del servidor.")
+            if agent:
+                agent.close()
+            return
+        journal = RecognitionJournal()
+        syncer = JournalSyncer(journal, server).start()
+        recorder = AttendanceRecorder(journal, course_id, syncer)
+        print(f"📝 Diario local en {journal.path}: {journal.stats()}")
+
+    print("🚀 Iniciando CheckFace: detección + reconocimiento en tiempo real...")
+
+    cap = abrir_camara()
+    if cap is None:
+        print("❌ No se pudo abrir ninguna cámara.")
+        if agent:
+            agent.close()
+        if syncer:
+            syncer.stop()
+        return
+
+    stop = threading.Event()
+    frames, annotations = LatestSlot(), LatestSlot()
+    detected = DropOldestQueue(RECOGNITION_QUEUE_SIZE)
+    tracker = FaceTracker()
+    skipper = SkippingDetector(detect_faces) if FRAME_SKIP else None
+    stats = {name: StageStats(name) for name in ("captura", "deteccion", "reconocimiento", "extremo a extremo", "display")}
+
+    hilos = [
+        threading.Thread(target=captura, args=(cap, frames, stats["captura"], stop), daemon=True),
+        threading.Thread(target=deteccion, args=(frames, detected, stats["deteccion"], stop, skipper), daemon=True),
+        threading.Thread(target=reconocimiento, args=(centroids, tracker, detected, annotations, stats["reconocimiento"],
+                                                      stats["extremo a extremo"], stop,
+                                                      agent.recognize if agent else None, recorder), daemon=True),
+    ]
+    for h in hilos:
+        h.start()
+
+    seq, ultimo_reporte = 0, time.perf_counter()
+    try:
+        if agent:
+            # Sin ventana: solo métricas periódicas hasta Ctrl+C
+            del stats["display"]
+            while not stop.wait(STATS_INTERVAL):
+                reportar(stats, detected, tracker, skipper, agent, syncer)
+            return
+
+        while not stop.is_set():
+            seq, item = frames.get(seq, timeout=0.5)
+            if item is None:
+                continue
+            t0 = time.perf_counter()
+            frame = item[0].copy()
+            dibujar(frame, annotations.peek()[1] or [], stats.values())
+            cv2.imshow(WINDOW_NAME, frame)
+            stats["display"].tick(time.perf_counter() - t0)
+
+            if time.perf_counter() - ultimo_reporte >= STATS_INTERVAL:
+                ultimo_reporte = time.perf_counter()
+                reportar(stats, detected, tracker, skipper, syncer=syncer)
+
+            if cv2.waitKey(1) & 0xFF == ord("q"):
+                print("👋 Cerrando CheckFace...")
+                break
+    except KeyboardInterrupt:
         print("👋 Cerrando CheckFace...")
-        break
+    finally:
+        stop.set()
+        for h in hilos:
+            h.join(timeout=1.0)
+        cap.release()
+        if agent:
+            resumen = agent.close()
+            if resumen:
+                print(f"📋 Sesión cerrada: {len(resumen['registrados'])} asistencias registradas")
+        else:
+            cv2.destroyAllWindows()
+        if syncer:
+            # Último intento de replicar lo anotado; lo que falte sale en la próxima ejecución
+            syncer.stop()
+            print(f"📝 Diario: {syncer.stats()}")
+
 
-cap.release()
-cv2.destroyAllWindows()
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# backend/model_registry.py
+
+import os
+import time
+import threading
+import numpy as np
+
+# Forma de los frames de la webcam (CameraCaptura.js) y tamaños de batch a precalentar
+WARMUP_FRAME_SHAPE = (480, 640, 3)
+WARMUP_BATCH_SIZES = (1, 4)
+# CHECKFACE_WARMUP=0 desactiva el precalentamiento (scripts, desarrollo)
+WARMUP_ENABLED = os.getenv("CHECKFACE_WARMUP", "1") != "0"
+
+
+class ModelRegistry:
+    """
+    Carga y precalienta los modelos (YOLO y ArcFace) antes de aceptar tráfico.
+
+    Para cada modelo guarda si está listo, cuánto tardó en cargar y en
+    precalentarse y el error si falló. El endpoint /api/health/ready usa
+    `ready` para que el balanceador solo mande requests a workers calientes.
+    """
+
+    def __init__(self, embedding_model="ArcFace"):
+        self.embedding_model = embedding_model
+        self._lock = threading.Lock()
+        self._status = {
+            "yolo": {"ready": False, "load_s": None, "warmup_s": None, "error": None},
+            "arcface": {"ready": False, "load_s": None, "warmup_s": None, "error": None},
+        }
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def ready(self) -> bool:
+        return all(s["ready"] for s in self._status.values())
+
+    def status(self) -> dict:
+        # Sin lock: se puede consultar mientras warm_up() sigue en curso
+        total = (self.finished_at - self.started_at) if self.finished_at else None
+        return {
+            "ready": self.ready,
+            "warmup_total_s": round(total, 3) if total is not None else None,
+            "models": {name: dict(s) for name, s in self._status.items()},
+        }
+
+    def warm_up(self) -> bool:
+        """Carga y precalienta ambos modelos (bloqueante). Retorna True si quedaron listos."""
+        with self._lock:
+            self.started_at, self.finished_at = time.perf_counter(), None
+            self._run("yolo", self._load_yolo, self._warm_yolo)
+            self._run("arcface", self._load_arcface, self._warm_arcface)
+            self.finished_at = time.perf_counter()
+
+        if self.ready:
+            print(f"✅ Modelos listos en {self.finished_at - self.started_at:.2f}s")
+        return self.ready
+
+    def _run(self, name, load, warm):
+        status = self._status[name]
+        try:
+            t0 = time.perf_counter()
+            model = load()
+            status["load_s"] = round(time.perf_counter() - t0, 3)
+
+            t0 = time.perf_counter()
+            warm(model)
+            status["warmup_s"] = round(time.perf_counter() - t0, 3)
+
+            status["ready"], status["error"] = True, None
+        except Exception as e:
+            status["ready"], status["error"] = False, str(e)
+            print(f"❌ Error al precalentar {name}: {e}")
+
+    # -----------------------------
+    # YOLO (detection/yoloface.py carga el modelo al importarse)
+    # -----------------------------
+    def _load_yolo(self):
+        from detection import yoloface
+        return yoloface
+
+    def _warm_yolo(self, yoloface):
+        yoloface.warmup(WARMUP_FRAME_SHAPE)
+
+    # -----------------------------
+    # ArcFace (backend de CHECKFACE_EMBEDDING_BACKEND): construir y correr los batches usuales
+    # -----------------------------
+    def _load_arcface(self):
+        from recognition.face_recognizer import get_embedding_model
+        return get_embedding_model(self.embedding_model)
+
+    def _warm_arcface(self, client):
+        from recognition.face_recognizer import embed_crops
+        h, w = client.input_shape
+        for n in WARMUP_BATCH_SIZES:
+            # embed_crops sin caché: los recortes negros no deben quedar en la caché de embeddings
+            embed_crops([np.zeros((h, w, 3), dtype=np.uint8)] * n, model_name=self.embedding_model)
+
+
+# Instancia compartida por api.py y routes/health_routes.py
+registry = ModelRegistry()
@@ -0,0 +1,101 @@
+# backend/pipeline.py
+#
+# Piezas del pipeline en tiempo real de main.py: captura, detección y
+# reconocimiento corren en hilos separados, conectados por colas acotadas.
+
+import time
+import threading
+from collections import deque
+
+
+class LatestSlot:
+    """
+    Guarda solo el último elemento publicado (p. ej. el último frame de la
+    cámara). get() espera uno más nuevo que el que ya vio el consumidor, así
+    ningún stage procesa frames viejos acumulados en el buffer.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._item = None
+        self._seq = 0
+
+    def put(self, item):
+        with self._cond:
+            self._item = item
+            self._seq += 1
+            self._cond.notify_all()
+
+    def get(self, last_seq=0, timeout=None):
+        """Retorna (seq, item) con seq > last_seq, o (last_seq, None) si venció el timeout."""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._seq > last_seq, timeout=timeout):
+                return last_seq, None
+            return self._seq, self._item
+
+    def peek(self):
+        with self._cond:
+            return self._seq, self._item
+
+
+class DropOldestQueue:
+    """Cola acotada: si está llena, put() descarta el elemento más viejo en vez de bloquear."""
+
+    def __init__(self, maxsize=2):
+        self._items = deque(maxlen=maxsize)
+        self._cond = threading.Condition()
+        self.dropped = 0
+
+    def put(self, item):
+        with self._cond:
+            if len(self._items) == self._items.maxlen:
+                self.dropped += 1
+            self._items.append(item)
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        with self._cond:
+            if not self._cond.wait_for(lambda: len(self._items) > 0, timeout=timeout):
+                return None
+            return self._items.popleft()
+
+    def __len__(self):
+        with self._cond:
+            return len(self._items)
+
+
+class StageStats:
+    """FPS y latencia de un stage sobre una ventana deslizante de `window` segundos."""
+
+    def __init__(self, name, window=5.0):
+        self.name = name
+        self.window = window
+        self._events = deque()  # (instante, latencia en s)
+        self._lock = threading.Lock()
+        self.total = 0
+
+    def tick(self, latency):
+        now = time.perf_counter()
+        with self._lock:
+            self._events.append((now, latency))
+            self.total += 1
+            while self._events and now - self._events[0][0] > self.window:
+                self._events.popleft()
+
+    def snapshot(self):
+        now = time.perf_counter()
+        with self._lock:
+            events = [e for e in self._events if now - e[0] <= self.window]
+        if not events:
+            return {"fps": 0.0, "avg_ms": 0.0, "max_ms": 0.0}
+        span = max(now - events[0][0], 1e-6)
+        lat = [l for _, l in events]
+        return {
+            "fps": len(events) / span,
+            "avg_ms": sum(lat) / len(lat) * 1000,
+            "max_ms": max(lat) * 1000,
+        }
+
+    def __str__(self):
+        s = self.snapshot()
+        return f"{self.name}: {s['fps']:5.1f} FPS, {s['avg_ms']:6.1f} ms (máx {s['max_ms']:.0f})"
@@ -0,0 +1,134 @@
+# backend/recognition/ann_index.py
+
+import os
+import hashlib
+import numpy as np
+
+
+def gallery_fingerprint(labels, matrix: np.ndarray) -> str:
+    """Huella de la galería para saber si un índice persistido sigue vigente."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update("\n".join(map(str, labels)).encode("utf-8"))
+    h.update(np.ascontiguousarray(matrix, dtype=np.float32).tobytes())
+    return h.hexdigest()
+
+
+def _spherical_kmeans(x: np.ndarray, n_lists: int, n_iter: int, rng) -> np.ndarray:
+    """k-means sobre vectores normalizados (similitud coseno)."""
+    centroids = x[rng.choice(x.shape[0], n_lists, replace=False)].copy()
+    for _ in range(n_iter):
+        assign = _nearest_list(x, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, x)
+        counts = np.bincount(assign, minlength=n_lists)
+
+        # Listas vacías → se re-siembran con puntos al azar
+        empty = counts == 0
+        if empty.any():
+            sums[empty] = x[rng.choice(x.shape[0], int(empty.sum()), replace=False)]
+
+        centroids = sums / (np.linalg.norm(sums, axis=1, keepdims=True) + 1e-10)
+    return centroids.astype(np.float32)
+
+
+def _nearest_list(x: np.ndarray, centroids: np.ndarray, chunk=8192) -> np.ndarray:
+    assign = np.empty(x.shape[0], dtype=np.int64)
+    for start in range(0, x.shape[0], chunk):
+        assign[start:start + chunk] = np.argmax(x[start:start + chunk] @ centroids.T, axis=1)
+    return assign
+
+
+class IVFIndex:
+    """
+    Índice IVF (inverted file) en NumPy puro para galerías muy grandes.
+
+    Los vectores se reparten en n_lists listas con k-means esférico. Cada
+    consulta se compara con los centroides de las listas y solo se busca
+    exhaustivamente dentro de las nprobe listas más cercanas: más nprobe
+    → más recall y más latencia (nprobe = n_lists equivale a búsqueda exacta).
+    """
+
+    def __init__(self, centroids, ids, offsets, fingerprint="", nprobe=8):
+        self.centroids = np.ascontiguousarray(centroids, dtype=np.float32)
+        self.ids = np.asarray(ids, dtype=np.int64)          # filas de la galería ordenadas por lista
+        self.offsets = np.asarray(offsets, dtype=np.int64)  # lista l = ids[offsets[l]:offsets[l+1]]
+        self.fingerprint = fingerprint
+        self.nprobe = nprobe
+
+    @property
+    def n_lists(self):
+        return self.centroids.shape[0]
+
+    @classmethod
+    def build(cls, matrix: np.ndarray, n_lists=None, n_iter=10, nprobe=8,
+              fingerprint="", seed=0, max_train=None):
+        matrix = np.asarray(matrix, dtype=np.float32)
+        n = matrix.shape[0]
+        if n == 0:
+            raise ValueError("No se puede construir un índice sobre una galería vacía")
+
+        # Heurística usual: ~4·sqrt(n) listas
+        n_lists = min(n, n_lists or max(1, int(4 * np.sqrt(n))))
+        rng = np.random.default_rng(seed)
+
+        # Entrenar k-means sobre una muestra y asignar luego toda la galería
+        max_train = max_train or 64 * n_lists
+        train = matrix if n <= max_train else matrix[rng.choice(n, max_train, replace=False)]
+        centroids = _spherical_kmeans(train, n_lists, n_iter, rng)
+
+        assign = _nearest_list(matrix, centroids)
+        ids = np.argsort(assign, kind="stable")
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(assign, minlength=n_lists))])
+        return cls(centroids, ids, offsets, fingerprint=fingerprint, nprobe=nprobe)
+
+    def search(self, matrix: np.ndarray, queries: np.ndarray, k=1, nprobe=None, scales=None):
+        """
+        matrix: matriz de la galería sobre la que se construyó el índice
+        (float32, float16 o int8 con `scales` por fila).
+        Retorna (indices, distancias) (q, k) como Gallery.search; si las
+        listas visitadas tienen menos de k candidatos se rellena con -1 / inf.
+        """
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        nprobe = min(nprobe or self.nprobe, self.n_lists)
+
+        out_idx = np.full((queries.shape[0], k), -1, dtype=np.int64)
+        out_dist = np.full((queries.shape[0], k), np.inf, dtype=np.float32)
+
+        coarse = queries @ self.centroids.T
+        if nprobe < self.n_lists:
+            probes = np.argpartition(-coarse, nprobe - 1, axis=1)[:, :nprobe]
+        else:
+            probes = np.broadcast_to(np.arange(self.n_lists), coarse.shape)
+
+        for qi, q in enumerate(queries):
+            rows = np.concatenate([self.ids[self.offsets[l]:self.offsets[l + 1]] for l in probes[qi]])
+            if rows.size == 0:
+                continue
+            sims = matrix[rows].astype(np.float32, copy=False) @ q
+            if scales is not None:
+                sims *= scales[rows]
+            d = 1.0 - sims
+            kk = min(k, rows.size)
+            top = np.argpartition(d, kk - 1)[:kk] if kk < rows.size else np.arange(rows.size)
+            top = top[np.argsort(d[top])]
+            out_idx[qi, :kk] = rows[top]
+            out_dist[qi, :kk] = d[top]
+
+        return out_idx, out_dist
+
+    # -----------------------------
+    # Persistencia (junto a centroids.json)
+    # -----------------------------
+    def save(self, path):
+        """Escribe a un temporal propio del proceso y lo publica con os.replace (como centroid_store)."""
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            np.savez(f, centroids=self.centroids, ids=self.ids, offsets=self.offsets,
+                     fingerprint=np.array(self.fingerprint))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path, nprobe=8):
+        with np.load(path, allow_pickle=False) as data:
+            return cls(data["centroids"], data["ids"], data["offsets"],
+                       fingerprint=str(data["fingerprint"]), nprobe=nprobe)
@@ -0,0 +1,244 @@
+# backend/recognition/centroid_store.py
+#
+# Almacén binario de centroides (reemplaza a centroids.json):
+#   centroids.<gen>.npy         matriz (filas, dim) normalizada; una o más filas
+#                               consecutivas (prototipos) por identidad
+#   centroids.<gen>.labels.npy  etiqueta (CI) de cada fila
+#   centroids.<gen>.scales.npy  escala por fila (solo en modo int8)
+#   centroids.meta.json         generación vigente, dtype + metadata por identidad
+#
+# La matriz puede guardarse en float32, float16 o int8 (CHECKFACE_GALLERY_DTYPE,
+# ver recognition/quantization.py); la búsqueda trabaja directo sobre ese formato.
+#
+# Cada escritura crea una generación nueva y recién al final reemplaza
+# centroids.meta.json (os.replace), así un lector siempre ve una generación
+# completa. Los workers abren la matriz con np.memmap: varios procesos de
+# gunicorn comparten una sola copia en el page cache.
+#
+# Las escrituras (leer el almacén, mezclar y publicar) toman un flock exclusivo
+# sobre <store_dir>/.lock: dos enrolamientos simultáneos se serializan y el
+# segundo parte de la generación que publicó el primero, en lugar de escribir
+# los mismos centroids.<gen>.*.npy y pisar sus identidades.
+#
+# Conversión única desde el JSON anterior: backend/convert_centroids.py
+
+import os
+import json
+import glob
+import fcntl
+from contextlib import contextmanager
+import numpy as np
+from recognition.quantization import quantize, dequantize
+
+STORE_DIR = os.path.join(os.path.dirname(__file__), "embeddings")
+META_NAME = "centroids.meta.json"
+LOCK_NAME = ".lock"
+LEGACY_JSON_NAME = "centroids.json"
+
+# Formato de la matriz al crear un almacén nuevo (float32, float16 o int8)
+GALLERY_DTYPE = os.getenv("CHECKFACE_GALLERY_DTYPE", "float32")
+
+
+def meta_path(store_dir=STORE_DIR):
+    return os.path.join(store_dir, META_NAME)
+
+
+def _matrix_path(store_dir, gen):
+    return os.path.join(store_dir, f"centroids.{gen}.npy")
+
+
+def _labels_path(store_dir, gen):
+    return os.path.join(store_dir, f"centroids.{gen}.labels.npy")
+
+
+def _scales_path(store_dir, gen):
+    return os.path.join(store_dir, f"centroids.{gen}.scales.npy")
+
+
+@contextmanager
+def file_lock(lock_path):
+    """flock exclusivo sobre lock_path (se crea si no existe), entre procesos."""
+    os.makedirs(os.path.dirname(lock_path) or ".", exist_ok=True)
+    with open(lock_path, "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def store_lock(store_dir=STORE_DIR):
+    """Lock exclusivo entre procesos para leer-modificar-escribir el almacén."""
+    return file_lock(os.path.join(store_dir, LOCK_NAME))
+
+
+def store_exists(store_dir=STORE_DIR):
+    return os.path.exists(meta_path(store_dir))
+
+
+def read_meta(store_dir=STORE_DIR):
+    with open(meta_path(store_dir), "r") as f:
+        return json.load(f)
+
+
+# -----------------------------
+# Lectura
+# -----------------------------
+def open_store(store_dir=STORE_DIR, mmap=True):
+    """
+    Retorna (labels, matrix, scales, meta). Con mmap=True la matriz es de solo
+    lectura y se pagina bajo demanda desde el archivo. scales es None salvo en int8.
+    """
+    meta = read_meta(store_dir)
+    gen = meta["generation"]
+    mode = "r" if mmap else None
+    matrix = np.load(_matrix_path(store_dir, gen), mmap_mode=mode, allow_pickle=False)
+    labels = np.load(_labels_path(store_dir, gen), mmap_mode=mode, allow_pickle=False)
+    scales = None
+    if meta.get("dtype") == "int8":
+        scales = np.load(_scales_path(store_dir, gen), allow_pickle=False)
+    return labels, matrix, scales, meta
+
+
+# -----------------------------
+# Escritura
+# -----------------------------
+def write_store(labels, matrix, identities: dict, store_dir=STORE_DIR, keep=2, dtype=None):
+    """
+    Escribe una generación nueva y la publica. identities: {ci: {count, intra_dist_avg, ...}}.
+    matrix es float32; se guarda en `dtype` (por defecto el del almacén actual o GALLERY_DTYPE).
+    Conserva las últimas `keep` generaciones (los workers pueden tener la anterior mapeada).
+    """
+    with store_lock(store_dir):
+        return _write_store(labels, matrix, identities, store_dir, keep, dtype)
+
+
+def _write_store(labels, matrix, identities, store_dir, keep=2, dtype=None):
+    """write_store sin tomar el lock (quien llama ya lo tiene)."""
+    matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+    labels = np.asarray(labels, dtype=str)
+    if matrix.ndim != 2 or matrix.shape[0] != len(labels):
+        raise ValueError("Matriz de centroides y etiquetas con formas incompatibles")
+
+    # Con el lock tomado, nadie más puede publicar esta generación
+    previous = read_meta(store_dir) if store_exists(store_dir) else None
+    gen = previous["generation"] + 1 if previous else 1
+    dtype = dtype or (previous or {}).get("dtype") or GALLERY_DTYPE
+    qmatrix, scales = quantize(matrix, dtype)
+
+    files = [(_matrix_path(store_dir, gen), qmatrix), (_labels_path(store_dir, gen), labels)]
+    if scales is not None:
+        files.append((_scales_path(store_dir, gen), scales))
+
+    for path, arr in files:
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            np.save(f, arr, allow_pickle=False)
+        os.replace(tmp, path)
+
+    meta = {
+        "generation": gen,
+        "count": int(matrix.shape[0]),
+        "dim": int(matrix.shape[1]) if matrix.shape[0] else 0,
+        "dtype": dtype,
+        "identities": identities,
+    }
+    tmp = meta_path(store_dir) + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(meta, f)
+    os.replace(tmp, meta_path(store_dir))
+
+    _cleanup(store_dir, gen - keep + 1)
+    return gen
+
+
+def _cleanup(store_dir, min_gen):
+    for path in glob.glob(os.path.join(store_dir, "centroids.*.npy")):
+        try:
+            gen = int(os.path.basename(path).split(".")[1])
+        except ValueError:
+            continue
+        if gen < min_gen:
+            os.remove(path)
+
+
+def _current(store_dir):
+    """(labels, matrix float32, identities) del almacén vigente, del centroids.json anterior o vacío."""
+    if store_exists(store_dir):
+        labels, matrix, scales, meta = open_store(store_dir, mmap=True)
+        return np.asarray(labels, dtype=str), dequantize(matrix, scales), meta["identities"]
+    legacy = os.path.join(store_dir, LEGACY_JSON_NAME)
+    if os.path.exists(legacy):
+        # Primera escritura tras la migración: se parte del centroids.json existente
+        labels, matrix, identities = _read_legacy_json(legacy)
+        return np.asarray(labels, dtype=str), matrix, identities
+    return np.array([], dtype=str), None, {}
+
+
+def upsert_identity(ci, centroids, info: dict, store_dir=STORE_DIR):
+    """
+    Reemplaza los prototipos de una identidad (un vector (dim,) o varios (k, dim))
+    y publica una generación nueva. Las filas de cada identidad quedan consecutivas.
+    """
+    generation, _ = upsert_identities({ci: (centroids, info)}, store_dir)
+    return generation
+
+
+def upsert_identities(entries: dict, store_dir=STORE_DIR):
+    """
+    Reemplaza los prototipos de varias identidades en una sola generación nueva.
+    entries: {ci: (vectores (dim,) o (k, dim), info)}.
+    Las identidades del almacén que no están en entries se conservan tal cual.
+    Retorna (generación, [identidades conservadas sin cambios]).
+    """
+    with store_lock(store_dir):
+        return _upsert_identities(entries, store_dir)
+
+
+def _upsert_identities(entries, store_dir):
+    labels, matrix, identities = _current(store_dir)
+
+    updates = {}
+    for ci, (vecs, info) in entries.items():
+        vecs = np.atleast_2d(np.asarray(vecs, dtype=np.float32))
+        updates[str(ci)] = (vecs / (np.linalg.norm(vecs, axis=1, keepdims=True) + 1e-10), info)
+
+    keep = ~np.isin(labels, list(updates))
+    rows, row_labels = [], [labels[keep]]
+    if matrix is not None and keep.any():
+        rows.append(np.asarray(matrix, dtype=np.float32)[keep])
+
+    for ci, (vecs, info) in updates.items():
+        if rows and vecs.shape[1] != rows[0].shape[1]:
+            raise ValueError(f"Dimensión de {ci} ({vecs.shape[1]}) distinta a la del almacén ({rows[0].shape[1]})")
+        rows.append(vecs)
+        row_labels.append(np.array([ci] * len(vecs), dtype=str))
+        identities[ci] = dict(info, prototypes=len(vecs))
+
+    matrix = np.concatenate(rows) if rows else np.empty((0, 0), dtype=np.float32)
+    kept = sorted(set(labels[keep].tolist()))
+    return _write_store(np.concatenate(row_labels), matrix, identities, store_dir), kept
+
+
+# -----------------------------
+# Conversión desde centroids.json
+# -----------------------------
+def _read_legacy_json(json_path):
+    with open(json_path, "r") as f:
+        data = json.load(f)
+    labels = [str(k) for k in data.keys()]
+    matrix = np.array([data[k]["centroid"] for k in data.keys()], dtype=np.float32).reshape(len(labels), -1)
+    if len(labels):
+        matrix /= np.linalg.norm(matrix, axis=1, keepdims=True) + 1e-10
+    identities = {str(k): {f: v for f, v in info.items() if f != "centroid"} for k, info in data.items()}
+    return labels, matrix, identities
+
+
+def convert_json(json_path, store_dir=None, dtype=None):
+    """Convierte un centroids.json existente al almacén binario (en la misma carpeta por defecto)."""
+    store_dir = store_dir or os.path.dirname(os.path.abspath(json_path))
+    labels, matrix, identities = _read_legacy_json(json_path)
+    gen = write_store(labels, matrix, identities, store_dir, dtype=dtype)
+    print(f"✅ {len(labels)} centroides convertidos → {store_dir} (generación {gen})")
+    return gen
+
@@ -0,0 +1,58 @@
+# backend/recognition/course_galleries.py
+
+import os
+import time
+import threading
+from database.db import db_cursor
+from recognition.gallery import Gallery
+
+# Tiempo máximo que vive una sub-galería en caché. La invalidación explícita
+# solo alcanza al proceso que modificó las inscripciones; el TTL acota cuánto
+# tarda el resto de los workers de gunicorn en ver el cambio.
+COURSE_GALLERY_TTL = float(os.getenv("CHECKFACE_COURSE_GALLERY_TTL", "300"))
+
+# course_id -> (galería global de origen, sub-galería, instante de creación)
+_cache = {}
+_lock = threading.Lock()
+
+
+def fetch_course_cis(course_id):
+    """CIs de los participantes inscriptos en el curso (tabla participant_courses)."""
+    with db_cursor() as cur:
+        cur.execute("""
+            SELECT p.ci
+            FROM participant_courses pc
+            JOIN participants p ON p.id = pc.participant_id
+            WHERE pc.course_id = %s
+        """, (course_id,))
+        rows = cur.fetchall()
+    return [str(r[0]) for r in rows]
+
+
+def get_course_gallery(gallery: Gallery, course_id) -> Gallery:
+    """
+    Sub-galería del curso, construida desde las inscripciones y cacheada.
+    Se reconstruye si expiró o si la galería global fue reemplazada.
+    """
+    course_id = int(course_id)
+    now = time.monotonic()
+
+    with _lock:
+        entry = _cache.get(course_id)
+        if entry and entry[0] is gallery and now - entry[2] < COURSE_GALLERY_TTL:
+            return entry[1]
+
+    sub = gallery.subset(fetch_course_cis(course_id))
+
+    with _lock:
+        _cache[course_id] = (gallery, sub, now)
+    return sub
+
+
+def invalidate_course_gallery(course_id=None):
+    """Descarta la sub-galería de un curso (o todas si course_id es None)."""
+    with _lock:
+        if course_id is None:
+            _cache.clear()
+        else:
+            _cache.pop(int(course_id), None)
@@ -0,0 +1,152 @@
+# backend/recognition/embedding_backends.py
+#
+# Backends de embeddings intercambiables (CHECKFACE_EMBEDDING_BACKEND):
+#   deepface  ArcFace de DeepFace sobre TensorFlow/Keras (referencia)
+#   onnx      ArcFace exportado a ONNX, ejecutado con ONNX Runtime en CPU
+#   opencv    el mismo .onnx ejecutado con cv2.dnn (solo usa el paquete onnx
+#             para leer la forma de entrada del grafo)
+#
+# Los tres reciben el mismo batch de preprocess_crops (NHWC en [0, 1], con el
+# orden de canales y el resize con relleno de DeepFace.represent), así que los
+# embeddings son comparables con los centroides entrenados con DeepFace.
+# Tolerancia documentada (distancia coseno contra DeepFace sobre el mismo
+# recorte, verificada con benchmarks/bench_embedding_backends.py sobre
+# recortes reales):
+#   float32  <= 0.01   (medido ~1e-7, solo difiere el orden de las sumas)
+#   int8     <= 0.05   (medido ~1e-3; cuantización dinámica de pesos, muy por
+#                       debajo del margen entre MATCH_THRESHOLD=0.45 y
+#                       distancias típicas)
+#
+# El .onnx se genera una vez con backend/export_arcface_onnx.py.
+
+import os
+import numpy as np
+import cv2
+
+MODELS_DIR = os.path.join(os.path.dirname(__file__), "models")
+ONNX_MODEL_PATH = os.getenv("CHECKFACE_ONNX_MODEL", os.path.join(MODELS_DIR, "arcface.onnx"))
+ONNX_INT8_MODEL_PATH = os.path.join(MODELS_DIR, "arcface.int8.onnx")
+
+BACKEND = os.getenv("CHECKFACE_EMBEDDING_BACKEND", "deepface")
+# CHECKFACE_ONNX_INT8=1 usa la variante cuantizada (onnx y opencv)
+USE_INT8 = os.getenv("CHECKFACE_ONNX_INT8", "0") == "1"
+# Hilos de ONNX Runtime (0 = lo decide el runtime)
+ONNX_THREADS = int(os.getenv("CHECKFACE_ONNX_THREADS", "0"))
+
+BACKENDS = ("deepface", "onnx", "opencv")
+TOLERANCE = {"float32": 0.01, "int8": 0.05}
+
+
+def input_layout(shape):
+    """
+    (input_shape, channels_first) a partir de la forma de entrada del modelo:
+    tf2onnx conserva NHWC (n, 112, 112, 3); otros exports usan NCHW (n, 3, 112, 112).
+    """
+    shape = tuple(shape)
+    if len(shape) != 4 or 3 not in (shape[1], shape[3]):
+        raise ValueError(f"Entrada del modelo no soportada: {shape} (se espera NHWC o NCHW con 3 canales)")
+    channels_first = shape[1] == 3
+    size = shape[2:4] if channels_first else shape[1:3]
+    if not all(isinstance(d, int) and d > 0 for d in size):
+        raise ValueError(f"El modelo no declara un tamaño de entrada fijo: {shape}")
+    return tuple(size), channels_first
+
+
+def onnx_input_shape(model_path):
+    """Forma de la primera entrada del .onnx, con las dimensiones dinámicas como None."""
+    try:
+        import onnx
+    except ImportError as e:
+        raise RuntimeError("Leer la entrada del .onnx requiere el paquete onnx (pip install onnx)") from e
+    model = onnx.load(model_path, load_external_data=False)
+    initializers = {t.name for t in model.graph.initializer}
+    inp = next(i for i in model.graph.input if i.name not in initializers)
+    return tuple(d.dim_value if d.HasField("dim_value") else None for d in inp.type.tensor_type.shape.dim)
+
+
+class DeepFaceBackend:
+    """ArcFace de DeepFace (TensorFlow se importa recién al construir el backend)."""
+
+    name = "deepface"
+
+    def __init__(self, model_name="ArcFace"):
+        from deepface import DeepFace
+        self.model_name = model_name
+        self.client = DeepFace.build_model(model_name)
+        self.input_shape = tuple(self.client.input_shape)
+
+    def embed(self, batch: np.ndarray) -> np.ndarray:
+        # Copia: el tensor de TensorFlow convertido es de solo lectura y embed_crops normaliza in-place
+        return np.array(self.client.model(batch, training=False), dtype=np.float32)
+
+
+class OnnxBackend:
+    """ArcFace exportado a ONNX sobre ONNX Runtime (CPUExecutionProvider)."""
+
+    name = "onnx"
+
+    def __init__(self, model_path=None, threads=ONNX_THREADS):
+        try:
+            import onnxruntime as ort
+        except ImportError as e:
+            raise RuntimeError("El backend 'onnx' requiere onnxruntime (pip install onnxruntime)") from e
+
+        self.model_path = model_path or (ONNX_INT8_MODEL_PATH if USE_INT8 else ONNX_MODEL_PATH)
+        if not os.path.exists(self.model_path):
+            raise FileNotFoundError(f"No existe {self.model_path}. Ejecutá export_arcface_onnx.py")
+
+        opts = ort.SessionOptions()
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            opts.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(self.model_path, opts, providers=["CPUExecutionProvider"])
+
+        inp = self.session.get_inputs()[0]
+        self.input_name = inp.name
+        self.input_shape, self.channels_first = input_layout(inp.shape)
+
+    def embed(self, batch: np.ndarray) -> np.ndarray:
+        if self.channels_first:
+            batch = batch.transpose(0, 3, 1, 2)
+        out = self.session.run(None, {self.input_name: np.ascontiguousarray(batch, dtype=np.float32)})[0]
+        return np.asarray(out, dtype=np.float32)
+
+
+class OpenCVBackend:
+    """El mismo ArcFace .onnx ejecutado con cv2.dnn."""
+
+    name = "opencv"
+
+    def __init__(self, model_path=None):
+        self.model_path = model_path or (ONNX_INT8_MODEL_PATH if USE_INT8 else ONNX_MODEL_PATH)
+        if not os.path.exists(self.model_path):
+            raise FileNotFoundError(f"No existe {self.model_path}. Ejecutá export_arcface_onnx.py")
+        # cv2.dnn no expone la forma de entrada: se lee del grafo, igual que en OnnxBackend
+        self.input_shape, self.channels_first = input_layout(onnx_input_shape(self.model_path))
+        self.net = cv2.dnn.readNetFromONNX(self.model_path)
+        self.net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+
+    def embed(self, batch: np.ndarray) -> np.ndarray:
+        if self.channels_first:
+            batch = batch.transpose(0, 3, 1, 2)
+        self.net.setInput(np.ascontiguousarray(batch, dtype=np.float32))
+        return np.asarray(self.net.forward(), dtype=np.float32).reshape(batch.shape[0], -1)
+
+
+def create_backend(name=BACKEND, model_name="ArcFace", **kwargs):
+    if name == "deepface":
+        return DeepFaceBackend(model_name)
+    if model_name != "ArcFace":
+        raise ValueError(f"El backend '{name}' solo implementa ArcFace")
+    if name == "onnx":
+        return OnnxBackend(**kwargs)
+    if name == "opencv":
+        return OpenCVBackend(**kwargs)
+    raise ValueError(f"Backend de embeddings desconocido: {name} (opciones: {', '.join(BACKENDS)})")
+
+
+def quantize_int8(src=ONNX_MODEL_PATH, dst=ONNX_INT8_MODEL_PATH):
+    """Cuantización dinámica INT8 de los pesos (las activaciones se cuantizan en tiempo de ejecución)."""
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+    quantize_dynamic(src, dst, weight_type=QuantType.QInt8)
+    return dst
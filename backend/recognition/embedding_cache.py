@@ -0,0 +1,131 @@
+# backend/recognition/embedding_cache.py
+
+import os
+import time
+import threading
+from collections import OrderedDict
+import numpy as np
+import cv2
+
+# Entradas por stream: cada tracker (cámara/pestaña) tiene su propia caché
+CACHE_SIZE = int(os.getenv("CHECKFACE_EMB_CACHE_SIZE", "256"))
+CACHE_TTL = float(os.getenv("CHECKFACE_EMB_CACHE_TTL", "30"))
+# Bits distintos tolerados entre hashes para considerar el recorte "sin cambios"
+CACHE_MAX_HAMMING = int(os.getenv("CHECKFACE_EMB_CACHE_HAMMING", "4"))
+# Tamaño (px) de la grilla con la que se cuantiza la posición/tamaño de la caja
+BOX_GRID = 16
+
+
+def dhash(crop: np.ndarray) -> int:
+    """Hash perceptual (difference hash) de 64 bits del recorte."""
+    gray = cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY) if crop.ndim == 3 else crop
+    small = cv2.resize(gray, (9, 8), interpolation=cv2.INTER_AREA)
+    bits = small[:, 1:] > small[:, :-1]
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def box_cell(box, grid=BOX_GRID):
+    """Geometría de la caja cuantizada: pequeños temblores del detector caen en la misma celda."""
+    return tuple(int(v) // grid for v in box)
+
+
+class EmbeddingCache:
+    """
+    Caché LRU de embeddings con TTL, indexada por (modelo, scope + celda de la
+    caja, dHash del recorte). Un recorte se considera el mismo si cae en la
+    misma celda y su hash difiere en a lo sumo max_hamming bits, así un alumno
+    sentado quieto no vuelve a pagar la pasada de ArcFace en cada frame.
+
+    El hash solo no identifica a una persona: la caché es de un stream
+    (FaceTracker.embedding_cache) y el scope es el track, así otra cámara u
+    otro alumno que se sienta en el mismo lugar (track nuevo) nunca reutiliza
+    un embedding ajeno.
+    """
+
+    def __init__(self, max_size=CACHE_SIZE, ttl=CACHE_TTL, max_hamming=CACHE_MAX_HAMMING):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.max_hamming = max_hamming
+        self._entries = OrderedDict()  # (modelo, celda, hash) -> (embedding, instante)
+        self._by_cell = {}             # (modelo, celda) -> set(hash)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(crop, box, model_name="ArcFace", scope=None):
+        return (model_name, (scope,) + box_cell(box), dhash(crop))
+
+    def get(self, key):
+        model_name, cell, h = key
+        now = time.monotonic()
+        with self._lock:
+            found = key if key in self._entries else None
+            if found is None and self.max_hamming > 0:
+                for other in self._by_cell.get((model_name, cell), ()):
+                    if bin(other ^ h).count("1") <= self.max_hamming:
+                        found = (model_name, cell, other)
+                        break
+
+            if found is not None:
+                emb, stamp = self._entries[found]
+                if now - stamp <= self.ttl:
+                    self._entries.move_to_end(found)
+                    self.hits += 1
+                    return emb
+                self._remove(found)
+
+            self.misses += 1
+            return None
+
+    def put(self, key, emb):
+        model_name, cell, h = key
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+            self._entries[key] = (emb, time.monotonic())
+            self._by_cell.setdefault((model_name, cell), set()).add(h)
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key):
+        model_name, cell, h = key
+        self._entries.pop(key, None)
+        hashes = self._by_cell.get((model_name, cell))
+        if hashes is not None:
+            hashes.discard(h)
+            if not hashes:
+                del self._by_cell[(model_name, cell)]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_cell.clear()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
+
+
+def combined_stats(caches):
+    """Suma las estadísticas de las cachés de varios streams."""
+    stats = [c.stats() for c in caches]
+    hits = sum(s["hits"] for s in stats)
+    misses = sum(s["misses"] for s in stats)
+    return {
+        "streams": len(stats),
+        "size": sum(s["size"] for s in stats),
+        "max_size_per_stream": CACHE_SIZE,
+        "ttl": CACHE_TTL,
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+    }
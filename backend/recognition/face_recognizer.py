@@ -1,86 +1,412 @@
 import os
 import json
+import time
 import numpy as np
-from deepface import DeepFace
-import tempfile
 import cv2
-from recognition.helpers import l2_normalize, cosine_distance
+from recognition.gallery import Gallery
+from recognition import centroid_store
+from recognition.ann_index import IVFIndex, gallery_fingerprint
+from recognition.embedding_cache import EmbeddingCache
+from recognition.embedding_backends import create_backend, BACKEND
+from recognition import quality
+from recognition.quality import QUALITY_ENABLED
 
-# Ruta al índice de centroides generado en train_faces.py
+# Centroides generados en train_faces.py (almacén binario en recognition/centroid_store.py;
+# centroids.json queda como formato anterior de solo lectura)
 EMBEDDINGS_DIR = os.path.join(os.path.dirname(__file__), "embeddings")
 CENTROIDS_PATH = os.path.join(EMBEDDINGS_DIR, "centroids.json")
 
+# Índice aproximado (IVF) persistido junto a los centroides
+ANN_INDEX_PATH = os.path.join(EMBEDDINGS_DIR, "centroids.ivf.npz")
+
+# Solo se usa ANN a partir de este tamaño de galería; nprobe regula recall/latencia
+ANN_MIN_SIZE = int(os.getenv("CHECKFACE_ANN_MIN_SIZE", "20000"))
+ANN_NPROBE = int(os.getenv("CHECKFACE_ANN_NPROBE", "8"))
+
+# Distancia coseno máxima para aceptar una identidad (ajustable según tus pruebas)
+MATCH_THRESHOLD = 0.45
+
 # -----------------------------
 # Cargar centroides
 # -----------------------------
-def load_centroids(path=CENTROIDS_PATH):
+def load_centroids(path=CENTROIDS_PATH, store_dir=centroid_store.STORE_DIR) -> Gallery:
+    """
+    Retorna una Gallery: matriz float32 contigua (n, 512) con los centroides
+    normalizados y un array paralelo de etiquetas (CI).
+
+    Usa el almacén binario (np.memmap, compartido entre workers) si existe en
+    store_dir; si no, el centroids.json anterior. store_dir=None fuerza el JSON.
+    """
+    if store_dir is not None and centroid_store.store_exists(store_dir):
+        labels, matrix, scales, meta = centroid_store.open_store(store_dir)
+        gallery = Gallery(labels, matrix, version=meta["generation"], scales=scales)
+        print(f"✅ Centroides cargados: {len(gallery)} identidades (generación {meta['generation']})")
+
+    elif os.path.exists(path):
+        with open(path, "r") as f:
+            data = json.load(f)
+        if not data:
+            return Gallery.empty()
+
+        labels = list(data.keys())
+        matrix = np.array([data[person]["centroid"] for person in labels], dtype=np.float32)
+        matrix /= np.linalg.norm(matrix, axis=1, keepdims=True) + 1e-10
+        gallery = Gallery(labels, matrix).quantize(centroid_store.GALLERY_DTYPE)
+        print(f"✅ Centroides cargados: {len(gallery)} identidades")
+
+    else:
+        print("⚠️ No existen centroides. Ejecutá primero train_faces.py")
+        return Gallery.empty()
+
+    if len(gallery) >= ANN_MIN_SIZE:
+        gallery.index = load_or_build_index(gallery)
+    return gallery
+
+
+def as_gallery(centroids) -> Gallery:
+    """Acepta una Gallery o el dict {persona: np.array} de versiones anteriores."""
+    if isinstance(centroids, Gallery):
+        return centroids
+    return Gallery.from_dict(centroids or {})
+
+
+def load_or_build_index(gallery: Gallery, path=ANN_INDEX_PATH, nprobe=ANN_NPROBE) -> IVFIndex:
+    """
+    Reutiliza el índice IVF persistido si corresponde a esta galería; si no, lo
+    reconstruye. La construcción va bajo un flock (<path>.lock): con varios
+    workers publicando la misma generación, uno corre el k-means y los demás
+    esperan y cargan el índice que dejó.
+    """
+    fingerprint = gallery_fingerprint(gallery.row_labels, gallery.matrix)
+
+    index = _load_index(path, fingerprint, nprobe)
+    if index is not None:
+        return index
+
+    with centroid_store.file_lock(path + ".lock"):
+        # Otro worker pudo construirlo mientras se esperaba el lock
+        index = _load_index(path, fingerprint, nprobe)
+        if index is not None:
+            return index
+        index = IVFIndex.build(gallery.dequantized(), nprobe=nprobe, fingerprint=fingerprint)
+        index.save(path)
+    print(f"✅ Índice ANN construido: {index.n_lists} listas, nprobe={nprobe}")
+    return index
+
+
+def _load_index(path, fingerprint, nprobe):
+    """El índice persistido si existe y es de esta galería; si no, None."""
     if not os.path.exists(path):
-        print("⚠️ No existe centroids.json. Ejecutá primero train_faces.py")
-        return {}
+        return None
+    try:
+        index = IVFIndex.load(path, nprobe=nprobe)
+    except Exception as e:
+        print(f"⚠️ Índice ANN inválido, se reconstruye: {e}")
+        return None
+    if index.fingerprint != fingerprint:
+        return None
+    print(f"✅ Índice ANN cargado: {index.n_lists} listas, nprobe={nprobe}")
+    return index
+
+
+# -----------------------------
+# Embeddings en lote (sin disco)
+# -----------------------------
+_backends = {}
+
+
+def get_embedding_model(model_name="ArcFace", backend=BACKEND):
+    """
+    Backend de embeddings (ver recognition/embedding_backends.py), construido
+    una vez por proceso. Expone input_shape (alto, ancho) y embed(batch).
+    """
+    key = (backend, model_name)
+    if key not in _backends:
+        _backends[key] = create_backend(backend, model_name)
+    return _backends[key]
+
+
+def preprocess_crops(face_crops, target_size) -> np.ndarray:
+    """
+    face_crops: lista de imágenes BGR (uint8) de rostros recortados.
+    target_size: (alto, ancho) de entrada del modelo.
+    Retorna un batch float32 (n, alto, ancho, 3) en [0, 1].
+
+    Se replica lo que hace DeepFace.represent (0.0.95) con
+    detector_backend="skip" sobre los recortes guardados por train_faces.py,
+    que es de donde salen los centroides:
+      - canales: load_image lee BGR y represent invierte los canales dos
+        veces (al cargar y antes del resize), así que el modelo recibe BGR;
+      - resize: preprocessing.resize_image escala sin deformar (factor
+        mínimo, truncado a int) y centra la imagen rellenando con negro;
+      - normalización "base": solo la escala a [0, 1].
+    Verificado contra DeepFace.represent sobre recortes guardados (cuadrados
+    de 160 px y cajas sin cuadrar): distancia coseno ~1e-7.
+    """
+    h, w = target_size
+    batch = np.zeros((len(face_crops), h, w, 3), dtype=np.float32)
+    for i, crop in enumerate(face_crops):
+        if crop.ndim == 2:
+            crop = cv2.cvtColor(crop, cv2.COLOR_GRAY2BGR)
+        ch, cw = crop.shape[:2]
+        factor = min(h / ch, w / cw)
+        rw, rh = int(cw * factor), int(ch * factor)
+        if (rh, rw) != (ch, cw):
+            crop = cv2.resize(crop, (rw, rh))
+        top, left = (h - rh) // 2, (w - rw) // 2
+        batch[i, top:top+rh, left:left+rw] = crop
+    batch /= 255.0
+    return batch
+
+
+def embed_crops(face_crops, model_name="ArcFace") -> np.ndarray:
+    """
+    Calcula los embeddings de todos los recortes con una sola pasada del modelo.
+    Retorna np.array (n, dim) float32 con cada fila normalizada L2.
+    """
+    if len(face_crops) == 0:
+        return np.empty((0, 0), dtype=np.float32)
+
+    backend = get_embedding_model(model_name)
+    batch = preprocess_crops(face_crops, backend.input_shape)
+
+    embs = backend.embed(batch)
+    embs /= np.linalg.norm(embs, axis=1, keepdims=True) + 1e-10
+    return embs
 
-    with open(path, "r") as f:
-        data = json.load(f)
 
-    # Convertir cada centroide a np.array normalizado
-    centroids = {person: l2_normalize(np.array(info["centroid"], dtype=np.float32))
-                 for person, info in data.items()}
+def embed_crops_cached(face_crops, boxes, model_name="ArcFace", cache=None, embed_fn=None,
+                       scopes=None) -> np.ndarray:
+    """
+    Como embed_crops, pero reutiliza el embedding de los recortes que no
+    cambiaron (misma caja cuantizada y dHash casi igual). Solo los fallos de
+    caché pasan por el modelo, en un único batch.
+    boxes: (x, y, w, h) de cada recorte, en el mismo orden.
+    cache: EmbeddingCache de un solo stream; sin caché se embebe todo.
+    scopes: a quién pertenece cada recorte (el track id); solo se reutiliza
+    dentro del mismo scope.
+    """
+    embed_fn = embed_fn or embed_crops
+    if cache is None:
+        return embed_fn(face_crops, model_name=model_name)
+    scopes = scopes if scopes is not None else [None] * len(face_crops)
+    keys = [cache.key(crop, box, model_name, scope) for crop, box, scope in zip(face_crops, boxes, scopes)]
+    cached = [cache.get(k) for k in keys]
+
+    misses = [i for i, emb in enumerate(cached) if emb is None]
+    if misses:
+        fresh = embed_fn([face_crops[i] for i in misses], model_name=model_name)
+        for i, emb in zip(misses, fresh):
+            cache.put(keys[i], emb)
+            cached[i] = emb
+
+    if not cached:
+        return np.empty((0, 0), dtype=np.float32)
+    return np.stack(cached)
+
+
+# -----------------------------
+# Buscar los centroides más cercanos
+# -----------------------------
+def match_embeddings(embs: np.ndarray, centroids, top_k=3):
+    """
+    embs: (n, dim) embeddings normalizados de todos los rostros del frame.
+    centroids: Gallery (o dict) contra la que se compara.
+    Retorna una lista de dicts con identity, min_dist, similarity, margin y
+    top_k [(persona, dist), ...], usando un solo producto matricial.
+    """
+    gallery = as_gallery(centroids)
+    idx, dists = gallery.search(embs, k=max(2, top_k))
 
-    print(f"✅ Centroides cargados: {list(centroids.keys())}")
-    return centroids
+    matches = []
+    for row_idx, row_dists in zip(idx, dists):
+        # El índice ANN marca con -1 los huecos cuando hay pocos candidatos
+        valid = row_idx >= 0
+        row_idx, row_dists = row_idx[valid], row_dists[valid]
+        if len(row_idx) == 0:
+            matches.append({"identity": "Desconocido", "min_dist": float("inf"),
+                            "similarity": 0, "margin": 0.0, "top_k": []})
+            continue
+
+        min_dist = float(row_dists[0])
+        identity = str(gallery.labels[row_idx[0]])
+        # Margen entre el mejor y el segundo mejor (1.0 si hay una sola identidad)
+        margin = float(row_dists[1] - row_dists[0]) if len(row_dists) > 1 else 1.0
+
+        # Similaridad: inversa de la distancia coseno (0 a 100 aprox)
+        similarity = max(0, 100 - min_dist * 100)
+
+        # Umbral → si min_dist es muy alto, marcar como desconocido
+        if min_dist > MATCH_THRESHOLD:
+            identity = "Desconocido"
+            similarity = 0
+
+        matches.append({
+            "identity": identity,
+            "min_dist": min_dist,
+            "similarity": round(similarity, 2),
+            "margin": margin,
+            "top_k": [(str(gallery.labels[i]), float(d))
+                      for i, d in zip(row_idx[:top_k], row_dists[:top_k])],
+        })
+    return matches
+
+
+def match_embedding(q: np.ndarray, centroids):
+    """
+    q: embedding normalizado.
+    Retorna: (identity, min_dist, similarity)
+    """
+    m = match_embeddings(q[None, :], centroids, top_k=1)[0]
+    return m["identity"], m["min_dist"], m["similarity"]
 
 
 # -----------------------------
 # Reconocer un rostro
 # -----------------------------
-def recognize_face(face_crop, centroids: dict, model_name="ArcFace"):
+def recognize_face(face_crop, centroids, model_name="ArcFace"):
     """
     face_crop: imagen BGR (ej. 160x160) de un rostro ya recortado.
-    centroids: dict {persona: np.array(512,)} cargado con load_centroids()
+    centroids: Gallery cargada con load_centroids() (o dict {persona: np.array(512,)})
     Retorna: (identity, min_dist, similarity)
     """
-    # Guardar temporalmente para que DeepFace lea la imagen
-    with tempfile.NamedTemporaryFile(suffix=".jpg", delete=False) as tmp:
-        cv2.imwrite(tmp.name, face_crop)
-        rep = DeepFace.represent(
-            img_path=tmp.name,
-            model_name=model_name,
-            enforce_detection=False,
-            detector_backend="skip"
-        )[0]
-    os.remove(tmp.name)
-
-    q = l2_normalize(np.array(rep["embedding"], dtype=np.float32))
-
-    # Buscar el centroide más cercano
-    min_dist = float("inf")
-    identity = "Desconocido"
-    for name, c in centroids.items():
-        d = cosine_distance(q, c)
-        if d < min_dist:
-            min_dist = d
-            identity = name
-
-    # Similaridad: inversa de la distancia coseno (0 a 100 aprox)
-    similarity = max(0, 100 - min_dist * 100)
-
-    # Umbral → si min_dist es muy alto, marcar como desconocido
-    if min_dist > 0.45:  # ajustable según tus pruebas
-        identity = "Desconocido"
-        similarity = 0
-
-    return identity, float(min_dist), round(similarity, 2)
+    q = embed_crops([face_crop], model_name=model_name)[0]
+    return match_embedding(q, centroids)
 
 # -----------------------------
 # Reconocer múltiples rostros
 # -----------------------------
-def recognize_faces_from_crops(cropped_faces, centroids: dict):
+def recognize_faces_from_crops(cropped_faces, centroids, model_name="ArcFace", top_k=3,
+                               boxes=None, cache=None, embed_fn=None, quality_gate=QUALITY_ENABLED,
+                               scopes=None):
+    """
+    cropped_faces: lista de imágenes BGR de rostros recortados.
+    Todos los rostros del frame se procesan en memoria y en un solo batch.
+    boxes + cache: (x, y, w, h) de cada recorte y la EmbeddingCache del
+    stream; solo se recalculan los rostros que cambiaron. scopes (track id de
+    cada recorte) limita la reutilización al mismo track.
+    embed_fn: reemplazo de embed_crops (p. ej. InferenceServer.embed, que
+    agrupa los recortes de varias requests concurrentes).
+    quality_gate: los recortes que no pasan recognition/quality.py no se
+    embeben y vuelven como "Desconocido" con "quality": "rejected".
+    """
+    results = [None] * len(cropped_faces)
+    keep = list(range(len(cropped_faces)))
+
+    if quality_gate and cropped_faces:
+        report = quality.assess(cropped_faces)
+        keep = [i for i in keep if report["ok"][i]]
+        for i, reasons in enumerate(report["reasons"]):
+            if reasons:
+                results[i] = rejected_result(reasons)
+
+    crops = [cropped_faces[i] for i in keep]
+    if boxes is not None and cache is not None:
+        embs = embed_crops_cached(crops, [boxes[i] for i in keep], model_name=model_name, cache=cache,
+                                  embed_fn=embed_fn, scopes=[scopes[i] for i in keep] if scopes else None)
+    elif crops:
+        embs = (embed_fn or embed_crops)(crops, model_name=model_name)
+    else:
+        embs = np.empty((0, 0), dtype=np.float32)
+
+    matches = match_embeddings(embs, centroids, top_k=top_k) if crops else []
+    for i, m in zip(keep, matches):
+        results[i] = result_from_match(m)
+    return results
+
+
+def result_from_match(m) -> dict:
+    """Resultado por rostro (formato de /api/recognize) a partir de un match de match_embeddings."""
+    return {
+        "name": m["identity"],
+        "min_dist": round(m["min_dist"], 3),
+        "similarity": m["similarity"],
+        "match": m["identity"] != "Desconocido",
+        "margin": round(m["margin"], 3),
+        "top_k": [{"name": name, "min_dist": round(d, 3)} for name, d in m["top_k"]],
+        "quality": "ok",
+    }
+
+
+def rejected_result(reasons) -> dict:
+    """Resultado de un rostro descartado antes del embedding (calidad o sin conexión en el borde)."""
+    return {
+        "name": "Desconocido",
+        "min_dist": None,
+        "similarity": 0,
+        "match": False,
+        "margin": 0.0,
+        "top_k": [],
+        "quality": "rejected",
+        "quality_reasons": reasons,
+    }
+
+# -----------------------------
+# Reconocer con tracking (una vez por track, no por frame)
+# -----------------------------
+def recognize_tracked(frame, boxes, tracker, centroids, now=None, model_name="ArcFace", top_k=3,
+                      cache=None, embed_fn=None, recognize_fn=None):
+    """
+    frame: imagen BGR completa; boxes: detecciones (x, y, w, h) del frame.
+    tracker: detection.tracker.FaceTracker del stream (cámara o pestaña).
+    Solo se corre ArcFace sobre los tracks nuevos, los que aún no tienen una
+    identidad estable o los que vencieron su intervalo de re-verificación;
+    el resto reutiliza la identidad votada del track.
+    cache: caché de embeddings; por defecto la del tracker (una por stream).
+    recognize_fn(crops, boxes, track_ids): reemplazo de
+    recognize_faces_from_crops para los tracks pendientes (p. ej. el agente
+    de borde, que embebe localmente y resuelve la identidad en el servidor).
+    Retorna un resultado por caja válida (mismo formato que
+    recognize_faces_from_crops, más track_id, recognized y votes).
+    """
+    now = time.monotonic() if now is None else now
+
+    kept = []
+    for (x, y, w, h) in boxes:
+        x, y = max(0, int(x)), max(0, int(y))
+        if frame[y:y+h, x:x+w].size:
+            kept.append((x, y, int(w), int(h)))
+
+    if cache is None:
+        if tracker.embedding_cache is None:
+            tracker.embedding_cache = EmbeddingCache()
+        cache = tracker.embedding_cache
+
+    tracks = tracker.update(kept, now)
+    pending = [i for i, t in enumerate(tracks) if t.needs_recognition(now, tracker.reverify_interval)]
+    rejected = {}
+
+    if pending:
+        crops = [frame[y:y+h, x:x+w] for (x, y, w, h) in (kept[i] for i in pending)]
+        pending_boxes = [kept[i] for i in pending]
+        if recognize_fn is not None:
+            fresh = recognize_fn(crops, pending_boxes, [tracks[i].id for i in pending])
+        else:
+            fresh = recognize_faces_from_crops(crops, centroids, model_name=model_name, top_k=top_k,
+                                               boxes=pending_boxes, cache=cache, embed_fn=embed_fn,
+                                               scopes=[tracks[i].id for i in pending])
+        for i, res in zip(pending, fresh):
+            if res["quality"] == "rejected":
+                # Sin voto: el track se vuelve a intentar con el próximo frame
+                rejected[i] = res
+                continue
+            tracks[i].vote(res["name"], res["similarity"], now)
+            tracks[i].last_result = res
+            tracker.recognitions += 1
+
     results = []
-    for crop in cropped_faces:
-        identity, min_dist, similarity = recognize_face(crop, centroids)
-        results.append({
+    for i, track in enumerate(tracks):
+        identity, confidence, similarity = track.identity
+        res = dict(rejected[i] if i in rejected and not track.votes else track.last_result)
+        res.update({
             "name": identity,
-            "min_dist": round(min_dist, 3),
-            "similarity": similarity,
-            "match": identity != "Desconocido"
+            "similarity": round(similarity, 2),
+            "match": identity != "Desconocido",
+            "track_id": track.id,
+            "recognized": i in pending and i not in rejected,
+            "votes": track.recognitions,
+            "track_confidence": round(confidence, 3),
+            "box": list(kept[i]),
         })
-    return results
\ No newline at end of file
+        results.append(res)
+    return results
@@ -0,0 +1,172 @@
+# backend/recognition/gallery.py
+
+import numpy as np
+from recognition.quantization import quantize, mode_of
+
+# Filas por bloque al comparar contra una galería cuantizada (acota la copia temporal a float32)
+_CHUNK_ROWS = 16384
+
+
+class Gallery:
+    """
+    Galería de identidades como matriz contigua (filas, dim) con un
+    array paralelo de etiquetas. Todas las consultas de un frame se resuelven
+    con un único producto matricial.
+
+    Una identidad puede tener varios prototipos (filas consecutivas con la
+    misma etiqueta, p. ej. con y sin lentes): su similitud es la máxima entre
+    sus prototipos. `labels` tiene una entrada por identidad y `row_labels`
+    una por fila de la matriz.
+
+    La matriz puede estar cuantizada (float16, o int8 con una escala por fila
+    en `scales`; ver recognition/quantization.py).
+    """
+
+    def __init__(self, labels, matrix, index=None, version=0, scales=None):
+        # Sin copia si vienen del almacén binario (np.memmap de solo lectura)
+        self.row_labels = np.asarray(labels, dtype=str)
+        matrix = np.asarray(matrix)
+        if matrix.dtype not in (np.float16, np.int8):
+            matrix = matrix.astype(np.float32, copy=False)
+        self.matrix = np.ascontiguousarray(matrix)
+        if self.matrix.ndim != 2 or self.matrix.shape[0] != len(self.row_labels):
+            raise ValueError("Matriz de galería y etiquetas con formas incompatibles")
+        if self.matrix.dtype == np.int8 and scales is None:
+            raise ValueError("Una galería int8 necesita escalas por fila")
+        self.scales = None if scales is None else np.asarray(scales, dtype=np.float32)
+
+        # Inicio de cada bloque de prototipos (None → un prototipo por identidad)
+        n = len(self.row_labels)
+        starts = np.flatnonzero(np.r_[True, self.row_labels[1:] != self.row_labels[:-1]]) if n else np.empty(0, int)
+        if len(starts) == n:
+            self.starts = None
+            self.labels = self.row_labels
+        else:
+            self.starts = starts
+            self.labels = self.row_labels[starts]
+            # Identidad (índice en labels) de cada fila
+            self.owners = np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, n]))
+
+        # Índice aproximado opcional (ver recognition/ann_index.py)
+        self.index = index
+        # Versión del snapshot (la incrementa GalleryStore en cada recarga)
+        self.version = version
+
+    @classmethod
+    def from_dict(cls, centroids: dict):
+        """Construye la galería desde {persona: np.array(dim,) o (k, dim)} normalizados."""
+        if not centroids:
+            return cls.empty()
+        labels, rows = [], []
+        for person, vecs in centroids.items():
+            vecs = np.atleast_2d(np.asarray(vecs, dtype=np.float32))
+            labels += [person] * len(vecs)
+            rows.append(vecs)
+        return cls(labels, np.concatenate(rows))
+
+    @classmethod
+    def empty(cls, dim=0, version=0):
+        return cls([], np.empty((0, dim), dtype=np.float32), version=version)
+
+    def __len__(self):
+        return len(self.labels)
+
+    @property
+    def mode(self):
+        return mode_of(self.matrix)
+
+    @property
+    def nbytes(self):
+        return self.matrix.nbytes + (self.scales.nbytes if self.scales is not None else 0)
+
+    def quantize(self, mode):
+        """Copia de la galería almacenada en otro modo (float32, float16 o int8)."""
+        if mode == self.mode:
+            return self
+        matrix, scales = quantize(self.dequantized(), mode)
+        return Gallery(self.row_labels, matrix, version=self.version, scales=scales)
+
+    def dequantized(self) -> np.ndarray:
+        if self.mode == "float32":
+            return self.matrix
+        out = self.matrix.astype(np.float32)
+        if self.scales is not None:
+            out *= self.scales[:, None]
+        return out
+
+    @property
+    def max_prototypes(self):
+        if self.starts is None:
+            return 1
+        return int(np.diff(np.r_[self.starts, len(self.row_labels)]).max())
+
+    def subset(self, labels):
+        """Sub-galería (exacta, sin índice ANN) con solo las etiquetas indicadas."""
+        wanted = np.array(sorted({str(l) for l in labels}), dtype=str)
+        if len(self) == 0 or len(wanted) == 0:
+            return Gallery.empty(self.matrix.shape[1], version=self.version)
+        rows = np.flatnonzero(np.isin(self.row_labels, wanted))
+        scales = self.scales[rows] if self.scales is not None else None
+        return Gallery(self.row_labels[rows], self.matrix[rows], version=self.version, scales=scales)
+
+    def similarities(self, queries: np.ndarray) -> np.ndarray:
+        """Similitud coseno (q, filas). Las galerías cuantizadas se recorren por bloques."""
+        if self.mode == "float32":
+            return queries @ self.matrix.T
+
+        sims = np.empty((queries.shape[0], self.matrix.shape[0]), dtype=np.float32)
+        for start in range(0, self.matrix.shape[0], _CHUNK_ROWS):
+            block = self.matrix[start:start + _CHUNK_ROWS].astype(np.float32)
+            sims[:, start:start + _CHUNK_ROWS] = queries @ block.T
+        if self.scales is not None:
+            sims *= self.scales
+        return sims
+
+    def search(self, queries: np.ndarray, k=1, exact=False):
+        """
+        queries: (q, dim) embeddings normalizados.
+        Retorna (indices, distancias), ambos (q, k') con k' = min(k, identidades),
+        con índices sobre `labels`, ordenados de menor a mayor distancia coseno.
+        Si hay un índice ANN se usa salvo exact=True; sus huecos vienen como -1.
+        """
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        n = len(self)
+        k = min(k, n)
+        if k == 0 or queries.shape[0] == 0:
+            return (np.empty((queries.shape[0], 0), dtype=np.int64),
+                    np.empty((queries.shape[0], 0), dtype=np.float32))
+
+        if self.index is not None and not exact:
+            if self.starts is None:
+                return self.index.search(self.matrix, queries, k, scales=self.scales)
+            rows, row_dists = self.index.search(self.matrix, queries, k * self.max_prototypes,
+                                                scales=self.scales)
+            return self._best_per_identity(rows, row_dists, k)
+
+        sims = self.similarities(queries)
+        if self.starts is not None:
+            # Máxima similitud entre los prototipos de cada identidad
+            sims = np.maximum.reduceat(sims, self.starts, axis=1)
+        dists = 1.0 - sims
+
+        if k < n:
+            idx = np.argpartition(dists, k - 1, axis=1)[:, :k]
+        else:
+            idx = np.broadcast_to(np.arange(n), (queries.shape[0], n))
+        part = np.take_along_axis(dists, idx, axis=1)
+        order = np.argsort(part, axis=1)
+        return np.take_along_axis(idx, order, axis=1), np.take_along_axis(part, order, axis=1)
+
+    def _best_per_identity(self, rows, row_dists, k):
+        """Convierte candidatos por fila (ordenados) en top-k por identidad."""
+        out_idx = np.full((rows.shape[0], k), -1, dtype=np.int64)
+        out_dist = np.full((rows.shape[0], k), np.inf, dtype=np.float32)
+        for qi in range(rows.shape[0]):
+            valid = rows[qi] >= 0
+            owners = self.owners[rows[qi][valid]]
+            # Las filas vienen ordenadas por distancia: la primera aparición es la mejor
+            _, first = np.unique(owners, return_index=True)
+            first = np.sort(first)[:k]
+            out_idx[qi, :len(first)] = owners[first]
+            out_dist[qi, :len(first)] = row_dists[qi][valid][first]
+        return out_idx, out_dist
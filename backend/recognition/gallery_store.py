@@ -0,0 +1,167 @@
+# backend/recognition/gallery_store.py
+
+import os
+import json
+import threading
+import numpy as np
+from recognition.gallery import Gallery
+from recognition import centroid_store
+from recognition.face_recognizer import CENTROIDS_PATH, ANN_MIN_SIZE, load_or_build_index
+
+
+class GalleryStore:
+    """
+    Galería versionada que se recarga sola cuando cambian los centroides.
+
+    Con el almacén binario cada recarga solo re-mapea la generación nueva
+    (np.memmap, sin copiar) y la versión es la generación, igual en todos los
+    workers. Con el centroids.json anterior se aplica solo el delta de
+    identidades agregadas, modificadas o borradas. En ambos casos el snapshot
+    nuevo se publica con una única asignación de referencia: las requests en
+    curso siguen usando el snapshot que tomaron y nunca ven uno a medio cargar.
+    """
+
+    def __init__(self, path=CENTROIDS_PATH, store_dir=centroid_store.STORE_DIR, poll_interval=2.0):
+        self.path = path
+        self.store_dir = store_dir
+        self.poll_interval = poll_interval
+        self._gallery = Gallery.empty()
+        self._raw = {}        # persona -> lista del centroide tal como está en el JSON
+        self._stamp = None    # (ruta, mtime_ns, tamaño) del archivo ya cargado
+        self._generation = None  # generación del almacén binario ya mapeada
+        self._reload_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.reload()
+
+    @property
+    def gallery(self) -> Gallery:
+        return self._gallery
+
+    @property
+    def version(self) -> int:
+        return self._gallery.version
+
+    def _use_store(self):
+        return self.store_dir is not None and centroid_store.store_exists(self.store_dir)
+
+    def _file_stamp(self):
+        path = centroid_store.meta_path(self.store_dir) if self._use_store() else self.path
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return (path, st.st_mtime_ns, st.st_size)
+
+    def _publish(self, gallery: Gallery):
+        if len(gallery) >= ANN_MIN_SIZE:
+            gallery.index = load_or_build_index(gallery)
+        self._gallery = gallery  # swap atómico del snapshot
+
+    def reload(self, force=False) -> bool:
+        """Recarga si el archivo cambió. Retorna True si se publicó una versión nueva."""
+        with self._reload_lock:
+            stamp = self._file_stamp()
+            if stamp is None or (stamp == self._stamp and not force):
+                return False
+            if self._use_store():
+                return self._reload_store(stamp)
+            return self._reload_json(stamp)
+
+    # -----------------------------
+    # Almacén binario: re-mapear la generación vigente
+    # -----------------------------
+    def _reload_store(self, stamp) -> bool:
+        try:
+            labels, matrix, scales, meta = centroid_store.open_store(self.store_dir)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"⚠️ No se pudo recargar el almacén de centroides: {e}")
+            return False
+
+        self._stamp = stamp
+        if meta["generation"] == self._generation:
+            return False
+
+        old = self._gallery
+        gallery = Gallery(labels, matrix, version=max(meta["generation"], old.version + 1), scales=scales)
+        self._raw = {}
+        self._generation = meta["generation"]
+        self._publish(gallery)
+        print(f"🔄 Galería v{gallery.version}: {len(gallery)} identidades (almacén binario)")
+        return True
+
+    # -----------------------------
+    # centroids.json: recarga con delta
+    # -----------------------------
+    def _reload_json(self, stamp) -> bool:
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            # Archivo en escritura o corrupto: se reintenta en el próximo ciclo
+            print(f"⚠️ No se pudo recargar {self.path}: {e}")
+            return False
+
+        new_raw = {person: info["centroid"] for person, info in data.items()}
+        # El delta solo aplica entre versiones del mismo JSON (un centroide por persona)
+        old = self._gallery if self._raw else Gallery.empty(version=self._gallery.version)
+        old_pos = {label: i for i, label in enumerate(old.labels)}
+
+        removed = set(old_pos) - set(new_raw)
+        changed = [p for p in new_raw if p in old_pos and new_raw[p] != self._raw.get(p)]
+        added = [p for p in new_raw if p not in old_pos]
+
+        self._stamp = stamp
+        if not (removed or changed or added):
+            return False
+
+        labels = [l for l in old.labels if l not in removed]
+        # Filas en float32: la galería publicada puede estar cuantizada
+        parts = [old.dequantized()[[old_pos[l] for l in labels]]] if labels else []
+        if added:
+            parts.append(np.array([new_raw[p] for p in added], dtype=np.float32))
+        labels += added
+        matrix = np.concatenate(parts) if parts else np.empty((0, 0), dtype=np.float32)
+
+        if changed:
+            new_pos = {label: i for i, label in enumerate(labels)}
+            rows = [new_pos[p] for p in changed]
+            matrix[rows] = np.array([new_raw[p] for p in changed], dtype=np.float32)
+
+        # Solo se normalizan las filas nuevas o modificadas
+        touched = [len(labels) - len(added) + i for i in range(len(added))]
+        if changed:
+            touched += rows
+        if touched:
+            matrix[touched] /= np.linalg.norm(matrix[touched], axis=1, keepdims=True) + 1e-10
+
+        # Mismo formato que load_centroids (CHECKFACE_GALLERY_DTYPE)
+        gallery = Gallery(labels, matrix, version=old.version + 1).quantize(centroid_store.GALLERY_DTYPE)
+        self._raw = new_raw
+        self._publish(gallery)
+
+        print(f"🔄 Galería v{gallery.version}: {len(gallery)} identidades "
+              f"(+{len(added)} ~{len(changed)} -{len(removed)})")
+        return True
+
+    # -----------------------------
+    # Vigilancia en segundo plano
+    # -----------------------------
+    def _watch(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.reload()
+            except Exception as e:
+                print(f"❌ Error al recargar la galería: {e}")
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._watch, name="gallery-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
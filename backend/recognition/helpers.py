@@ -42,4 +42,45 @@ def calcular_distancia_promedio(embeddings_list):
     for i in range(len(embs)):
         for j in range(i + 1, len(embs)):
             dist.append(cosine_distance(embs[i], embs[j]))
-    return float(np.mean(dist)) if dist else 0.0
\ No newline at end of file
+    return float(np.mean(dist)) if dist else 0.0
+
+def prototipos_kmeans(embs: np.ndarray, k=3, n_iter=20, min_por_cluster=3) -> np.ndarray:
+    """
+    Hasta k prototipos por identidad (k-means esférico vectorizado).
+    Cada cluster debe juntar al menos min_por_cluster embeddings; con pocas
+    fotos se cae a un único centroide robusto (robust_mean).
+    Retorna np.array (k', dim) normalizado, k' <= k.
+    """
+    if embs.ndim != 2 or embs.shape[0] == 0:
+        raise ValueError("Embeddings vacíos o con forma inválida")
+
+    k = min(k, embs.shape[0] // min_por_cluster)
+    if k <= 1:
+        return robust_mean(embs)[None, :]
+
+    x = embs / (np.linalg.norm(embs, axis=1, keepdims=True) + 1e-10)
+
+    # Inicialización determinista por puntos más lejanos
+    centers = [x[np.argmax(x @ l2_normalize(x.mean(axis=0)))]]
+    for _ in range(1, k):
+        sims = np.max(x @ np.array(centers).T, axis=1)
+        centers.append(x[np.argmin(sims)])
+    centers = np.array(centers)
+
+    for _ in range(n_iter):
+        assign = np.argmax(x @ centers.T, axis=1)
+        onehot = np.eye(k, dtype=x.dtype)[assign]           # (n, k)
+        counts = onehot.sum(axis=0)
+        new = onehot.T @ x                                   # suma por cluster
+        new /= np.linalg.norm(new, axis=1, keepdims=True) + 1e-10
+        new[counts == 0] = centers[counts == 0]
+        if np.allclose(new, centers):
+            break
+        centers = new
+
+    # Descartar clusters demasiado chicos (fotos sueltas / outliers)
+    counts = np.bincount(np.argmax(x @ centers.T, axis=1), minlength=k)
+    keep = counts >= min_por_cluster
+    if not keep.any():
+        return robust_mean(embs)[None, :]
+    return centers[keep].astype(np.float32)
@@ -0,0 +1,81 @@
+# backend/recognition/quality.py
+#
+# Filtro de calidad antes de ArcFace: los rostros diminutos, movidos, muy
+# oscuros/quemados o de perfil terminan como "Desconocido" de todas formas,
+# así que se descartan antes de pagar el embedding.
+
+import os
+import numpy as np
+import cv2
+
+# CHECKFACE_QUALITY=0 desactiva el filtro (reconocimiento y enrolamiento en train_faces.py)
+QUALITY_ENABLED = os.getenv("CHECKFACE_QUALITY", "1") != "0"
+# Lado menor mínimo de la caja, en px de la imagen original
+MIN_SIZE = int(os.getenv("CHECKFACE_QUALITY_MIN_SIZE", "40"))
+# Varianza mínima del Laplaciano (nitidez), medida sobre el rostro llevado a 64x64 en grises
+MIN_SHARPNESS = float(os.getenv("CHECKFACE_QUALITY_MIN_SHARPNESS", "30"))
+# Brillo medio (0-255) aceptado
+MIN_BRIGHTNESS = float(os.getenv("CHECKFACE_QUALITY_MIN_BRIGHTNESS", "40"))
+MAX_BRIGHTNESS = float(os.getenv("CHECKFACE_QUALITY_MAX_BRIGHTNESS", "220"))
+# Giro máximo (desplazamiento de la nariz respecto del centro de los ojos / distancia entre ojos)
+MAX_YAW = float(os.getenv("CHECKFACE_QUALITY_MAX_YAW", "0.35"))
+
+_SIDE = 64
+
+
+def _gray_stack(face_crops) -> np.ndarray:
+    """Recortes en grises llevados a 64x64, apilados en (n, 64, 64) float32."""
+    out = np.empty((len(face_crops), _SIDE, _SIDE), dtype=np.float32)
+    for i, crop in enumerate(face_crops):
+        gray = cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY) if crop.ndim == 3 else crop
+        out[i] = cv2.resize(gray, (_SIDE, _SIDE), interpolation=cv2.INTER_AREA)
+    return out
+
+
+def yaw_scores(landmarks) -> np.ndarray:
+    """
+    landmarks: (n, 5, 2) con ojo izq., ojo der., nariz, comisuras (formato
+    de YOLOv8-face / RetinaFace). Retorna |yaw| aproximado por rostro.
+    """
+    lm = np.asarray(landmarks, dtype=np.float32)
+    eyes_mid = (lm[:, 0] + lm[:, 1]) / 2
+    eye_dist = np.linalg.norm(lm[:, 1] - lm[:, 0], axis=1)
+    return np.abs(lm[:, 2, 0] - eyes_mid[:, 0]) / np.maximum(eye_dist, 1e-6)
+
+
+def assess(face_crops, sizes=None, landmarks=None) -> dict:
+    """
+    Puntajes de calidad de todos los recortes del frame a la vez.
+    sizes: lado menor de cada caja en la imagen original (por defecto, del recorte).
+    landmarks: (n, 5, 2) opcional; si no hay, no se evalúa la pose.
+    Retorna {"ok": (n,) bool, "size", "sharpness", "brightness", "yaw", "reasons": [[...], ...]}.
+    """
+    n = len(face_crops)
+    if n == 0:
+        return {"ok": np.zeros(0, bool), "reasons": []}
+
+    size = np.asarray(sizes if sizes is not None else [min(c.shape[:2]) for c in face_crops], dtype=np.float32)
+    gray = _gray_stack(face_crops)
+    brightness = gray.mean(axis=(1, 2))
+    # Laplaciano de 4 vecinos sobre todo el batch con slicing (sin bucle por rostro)
+    lap = (gray[:, :-2, 1:-1] + gray[:, 2:, 1:-1] + gray[:, 1:-1, :-2] + gray[:, 1:-1, 2:]
+           - 4 * gray[:, 1:-1, 1:-1])
+    sharpness = lap.var(axis=(1, 2))
+    yaw = yaw_scores(landmarks) if landmarks is not None else np.zeros(n, np.float32)
+
+    checks = {
+        "small": size < MIN_SIZE,
+        "blurry": sharpness < MIN_SHARPNESS,
+        "dark": brightness < MIN_BRIGHTNESS,
+        "overexposed": brightness > MAX_BRIGHTNESS,
+        "profile": yaw > MAX_YAW,
+    }
+    reasons = [[name for name, bad in checks.items() if bad[i]] for i in range(n)]
+    return {
+        "ok": np.array([not r for r in reasons]),
+        "size": size,
+        "sharpness": sharpness,
+        "brightness": brightness,
+        "yaw": yaw,
+        "reasons": reasons,
+    }
@@ -0,0 +1,36 @@
+# backend/recognition/quantization.py
+#
+# Modos de almacenamiento de la galería:
+#   float32  4 bytes por componente (referencia)
+#   float16  2 bytes por componente
+#   int8     1 byte por componente + una escala float32 por vector (v ≈ escala · q)
+
+import numpy as np
+
+MODES = ("float32", "float16", "int8")
+
+
+def quantize(matrix: np.ndarray, mode="float32"):
+    """Retorna (matriz cuantizada, escalas por fila o None)."""
+    matrix = np.asarray(matrix, dtype=np.float32)
+    if mode == "float32":
+        return np.ascontiguousarray(matrix), None
+    if mode == "float16":
+        return matrix.astype(np.float16), None
+    if mode == "int8":
+        scales = np.abs(matrix).max(axis=1) / 127.0 if matrix.size else np.empty(0, np.float32)
+        scales = np.where(scales > 0, scales, 1.0).astype(np.float32)
+        q = np.clip(np.rint(matrix / scales[:, None]), -127, 127).astype(np.int8)
+        return q, scales
+    raise ValueError(f"Modo de cuantización desconocido: {mode}")
+
+
+def dequantize(matrix: np.ndarray, scales=None) -> np.ndarray:
+    out = np.asarray(matrix, dtype=np.float32)
+    if scales is not None:
+        out = out * np.asarray(scales, dtype=np.float32)[:, None]
+    return out
+
+
+def mode_of(matrix: np.ndarray) -> str:
+    return {np.dtype(np.float16): "float16", np.dtype(np.int8): "int8"}.get(matrix.dtype, "float32")
@@ -0,0 +1,311 @@
+# backend/recognition_sessions.py
+#
+# Sesiones de reconocimiento de una clase. El estado de cada sesión (votos
+# por CI, qué se escribió, si está cerrada) vive en PostgreSQL (migración
+# 0003_recognition_sessions.sql), así que cualquier worker de gunicorn puede
+# atender el alta, los frames y el cierre de la misma sesión. Lo único local
+# a cada proceso es el FaceTracker de la sesión, que es solo una
+# optimización: si los frames pasan por dos workers, cada uno lleva su
+# tracker y los votos igual se suman en la base.
+
+import os
+import time
+import uuid
+import threading
+from datetime import date as _date
+from detection.tracker import FaceTracker
+from database.db import db_connection, db_cursor
+
+# Capturas en las que tiene que aparecer un CI para registrar su asistencia
+# (el navegador usaba >= 3 en conteoNombres)
+MIN_VOTES = int(os.getenv("CHECKFACE_SESSION_MIN_VOTES", "3"))
+# Similitud media mínima (0-100) de esas capturas
+MIN_SIMILARITY = float(os.getenv("CHECKFACE_SESSION_MIN_SIMILARITY", "0"))
+# Segundos sin frames antes de cerrar una sesión abandonada
+SESSION_TTL = float(os.getenv("CHECKFACE_SESSION_TTL", "600"))
+
+
+def _default_writer(course_id, date, cis, conn=None):
+    from database.attendance import upsert_attendance_by_ci
+    return upsert_attendance_by_ci(course_id, date, cis, conn=conn)
+
+
+# -----------------------------
+# SQL
+# -----------------------------
+_COLUMNS = "id, course_id, date, min_votes, min_similarity, closed"
+
+# Cuenta el frame y bloquea la fila: los frames de una misma sesión que llegan
+# a workers distintos se serializan hasta el commit
+_TOUCH = """
+UPDATE recognition_sessions
+SET frames = frames + 1, last_activity = now()
+WHERE id = %s AND NOT closed
+RETURNING id
+"""
+
+# Un voto por CI del frame (los CIs ya vienen sin repetir)
+_VOTE = """
+INSERT INTO recognition_session_votes AS v (session_id, ci, votes, similarity)
+SELECT %(id)s, f.ci, 1, f.similarity
+FROM unnest(%(cis)s::int[], %(sims)s::float8[]) AS f (ci, similarity)
+ON CONFLICT (session_id, ci) DO UPDATE
+SET votes = v.votes + 1,
+    similarity = v.similarity + EXCLUDED.similarity
+"""
+
+_CROSSED = """
+UPDATE recognition_session_votes
+SET status = 'pending'
+WHERE session_id = %(id)s
+  AND ci = ANY(%(cis)s::int[])
+  AND status = 'voting'
+  AND votes >= %(min_votes)s
+  AND similarity / votes >= %(min_similarity)s
+"""
+
+_PENDING = """
+SELECT ci FROM recognition_session_votes
+WHERE session_id = %s AND status = 'pending'
+ORDER BY ci
+"""
+
+# Los del lote que el writer no devolvió no están inscriptos al curso
+_MARK = """
+UPDATE recognition_session_votes v
+SET status = CASE WHEN w.ci IS NULL THEN 'rejected' ELSE 'committed' END,
+    full_name = w.full_name,
+    inserted = w.inserted
+FROM unnest(%(batch)s::int[]) AS b (ci)
+LEFT JOIN unnest(%(cis)s::int[], %(names)s::text[], %(inserted)s::bool[]) AS w (ci, full_name, inserted)
+       ON w.ci = b.ci
+WHERE v.session_id = %(id)s AND v.ci = b.ci
+"""
+
+
+def _summary(cur, session_id):
+    cur.execute("""
+        SELECT id, course_id, date, min_votes, frames, writes, closed, last_error
+        FROM recognition_sessions WHERE id = %s
+    """, (session_id,))
+    row = cur.fetchone()
+    if row is None:
+        return None
+    cur.execute("""
+        SELECT ci, votes, similarity, status, full_name, inserted
+        FROM recognition_session_votes
+        WHERE session_id = %s
+        ORDER BY votes DESC, ci
+    """, (session_id,))
+    votes = cur.fetchall()
+
+    return {
+        "session_id": row[0],
+        "course_id": str(row[1]),
+        "date": row[2].isoformat(),
+        "min_votes": row[3],
+        "frames": row[4],
+        "writes": row[5],
+        "closed": row[6],
+        "participants": [{
+            "ci": str(ci),
+            "votes": n,
+            "confidence": round(sim / n, 2) if n else 0.0,
+            "committed": status == "committed",
+        } for ci, n, sim, status, _, _ in votes],
+        "registrados": [{"ci": str(ci), "full_name": name, "inserted": ins}
+                        for ci, _, _, status, name, ins in sorted(votes) if status == "committed"],
+        "fuera_curso": [str(ci) for ci, _, _, status, _, _ in sorted(votes) if status == "rejected"],
+        "pending": [str(ci) for ci, _, _, status, _, _ in sorted(votes) if status == "pending"],
+        "last_error": row[7],
+    }
+
+
+class RecognitionSession:
+    """
+    Sesión de reconocimiento de una clase: acumula los votos por CI de todos
+    los frames y, apenas un CI alcanza el umbral, lo escribe en attendances.
+    Los CIs que cruzan el umbral en el mismo frame van juntos en un único
+    upsert, en la misma transacción que los votos del frame.
+
+    El objeto es un handle sobre la fila de recognition_sessions: dos workers
+    con handles de la misma sesión leen y modifican el mismo estado.
+    """
+
+    def __init__(self, session_id, course_id, date, min_votes=MIN_VOTES, min_similarity=MIN_SIMILARITY,
+                 closed=False, tracker=None, writer=None):
+        self.id = session_id
+        self.course_id = str(course_id)
+        self.date = date.isoformat() if isinstance(date, _date) else str(date)
+        self.min_votes = min_votes
+        self.min_similarity = min_similarity
+        self.closed = closed
+        # Tracker de este proceso: cada rostro se reconoce al aparecer
+        self.tracker = tracker or FaceTracker()
+        self.writer = writer or _default_writer
+
+    # -----------------------------
+    # Votos
+    # -----------------------------
+    def add_results(self, results):
+        """
+        Suma los reconocimientos válidos (match con CI numérico) de un frame y
+        escribe los que hayan alcanzado el umbral. Retorna los recién registrados.
+        """
+        # Un voto por CI y por frame, aunque aparezca en más de una caja
+        seen = {}
+        for r in results:
+            name = str(r.get("name", ""))
+            if r.get("match") and name.isdigit():
+                ci = int(name)
+                seen[ci] = max(seen.get(ci, 0.0), float(r.get("similarity") or 0.0))
+
+        with db_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(_TOUCH, (self.id,))
+                if cur.fetchone() is None:
+                    # La cerró otro worker (o expiró): no se cuentan más votos
+                    self.closed = True
+                    return []
+
+                if seen:
+                    params = {
+                        "id": self.id,
+                        "cis": list(seen),
+                        "sims": list(seen.values()),
+                        "min_votes": self.min_votes,
+                        "min_similarity": self.min_similarity,
+                    }
+                    cur.execute(_VOTE, params)
+                    cur.execute(_CROSSED, params)
+                return self._flush(conn, cur)
+
+    def _flush(self, conn, cur):
+        """Un upsert con todos los pendientes; si falla, quedan para el próximo frame."""
+        cur.execute(_PENDING, (self.id,))
+        batch = [row[0] for row in cur.fetchall()]
+        if not batch:
+            return []
+
+        # Si el upsert falla se descarta solo él: los votos del frame quedan
+        cur.execute("SAVEPOINT session_flush")
+        try:
+            written = self.writer(self.course_id, self.date, batch, conn=conn)
+        except Exception as e:
+            cur.execute("ROLLBACK TO SAVEPOINT session_flush")
+            cur.execute("UPDATE recognition_sessions SET last_error = %s WHERE id = %s", (str(e), self.id))
+            print("❌ Error al registrar asistencias de la sesión:", e)
+            return []
+
+        cur.execute(_MARK, {
+            "id": self.id,
+            "batch": batch,
+            "cis": [int(row["ci"]) for row in written],
+            "names": [row["full_name"] for row in written],
+            "inserted": [row["inserted"] for row in written],
+        })
+        cur.execute(
+            "UPDATE recognition_sessions SET writes = writes + 1, last_error = NULL WHERE id = %s",
+            (self.id,)
+        )
+        return written
+
+    # -----------------------------
+    # Estado
+    # -----------------------------
+    def close(self):
+        """Escribe lo pendiente, marca la sesión como cerrada y retorna el resumen final."""
+        with db_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT closed FROM recognition_sessions WHERE id = %s FOR UPDATE", (self.id,))
+                row = cur.fetchone()
+                if row is None:
+                    return None
+                if not row[0]:
+                    self._flush(conn, cur)
+                    cur.execute("UPDATE recognition_sessions SET closed = TRUE WHERE id = %s", (self.id,))
+                self.closed = True
+                return _summary(cur, self.id)
+
+    def summary(self):
+        with db_cursor() as cur:
+            return _summary(cur, self.id)
+
+
+class SessionManager:
+    """
+    Alta y búsqueda de sesiones en la base, más el FaceTracker de cada sesión
+    en este proceso. Las sesiones sin frames por más de `ttl` se cierran solas
+    (al buscarlas o al abrir otra sesión, desde cualquier worker).
+    """
+
+    def __init__(self, ttl=SESSION_TTL, **session_kwargs):
+        self.ttl = ttl
+        self.session_kwargs = session_kwargs
+        self._trackers = {}   # session_id -> (FaceTracker, último uso en este proceso)
+        self._lock = threading.Lock()
+
+    def start(self, course_id, date=None, **kwargs) -> RecognitionSession:
+        self._expire()
+        opts = {**self.session_kwargs, **kwargs}
+        min_votes = opts.get("min_votes", MIN_VOTES)
+        min_similarity = opts.get("min_similarity", MIN_SIMILARITY)
+
+        with db_cursor() as cur:
+            cur.execute(f"""
+                INSERT INTO recognition_sessions (id, course_id, date, min_votes, min_similarity)
+                VALUES (%s, %s, %s, %s, %s)
+                RETURNING {_COLUMNS}
+            """, (uuid.uuid4().hex, int(course_id), date or _date.today().isoformat(), min_votes, min_similarity))
+            row = cur.fetchone()
+        return self._handle(*row)
+
+    def get(self, session_id):
+        with db_cursor() as cur:
+            cur.execute(f"""
+                SELECT {_COLUMNS}, last_activity < now() - make_interval(secs => %s)
+                FROM recognition_sessions WHERE id = %s
+            """, (self.ttl, session_id))
+            row = cur.fetchone()
+        if row is None:
+            return None
+
+        session = self._handle(*row[:-1])
+        if row[-1] and not session.closed:
+            session.close()
+        return session
+
+    def close(self, session_id):
+        session = self.get(session_id)
+        if session is None:
+            return None
+        with self._lock:
+            self._trackers.pop(session_id, None)
+        return session.close()
+
+    def _handle(self, session_id, course_id, date, min_votes, min_similarity, closed):
+        return RecognitionSession(session_id, course_id, date, min_votes, min_similarity, closed,
+                                  tracker=self._tracker(session_id), writer=self.session_kwargs.get("writer"))
+
+    def _tracker(self, session_id):
+        now = time.monotonic()
+        with self._lock:
+            # Trackers de sesiones que ya no mandan frames a este proceso
+            for sid in [sid for sid, (_, used) in self._trackers.items() if now - used > self.ttl]:
+                del self._trackers[sid]
+            tracker = self._trackers[session_id][0] if session_id in self._trackers else FaceTracker()
+            self._trackers[session_id] = (tracker, now)
+        return tracker
+
+    def _expire(self):
+        """Cierra las sesiones abiertas sin frames por más de ttl (escribiendo sus pendientes)."""
+        with db_cursor() as cur:
+            cur.execute(f"""
+                SELECT {_COLUMNS} FROM recognition_sessions
+                WHERE NOT closed AND last_activity < now() - make_interval(secs => %s)
+            """, (self.ttl,))
+            rows = cur.fetchall()
+        for row in rows:
+            with self._lock:
+                self._trackers.pop(row[0], None)
+            RecognitionSession(*row, writer=self.session_kwargs.get("writer")).close()
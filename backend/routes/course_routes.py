@@ -1,6 +1,7 @@
 import datetime
 from flask import Blueprint, request, jsonify
-from database.db import get_connection
+from database.db import db_cursor
+from recognition.course_galleries import invalidate_course_gallery
 
 course_routes = Blueprint("course_routes", __name__)
 
@@ -16,19 +17,13 @@ def create_course():
         return jsonify({"success": False, "message": "Todos los campos son requeridos"}), 400
 
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-
-        cursor.execute("""
-            INSERT INTO courses (name, career, semester)
-            VALUES (%s, %s, %s)
-            RETURNING id
-        """, (name, career, semester))
-        course_id = cursor.fetchone()[0]
-
-        conn.commit()
-        cursor.close()
-        conn.close()
+        with db_cursor() as cursor:
+            cursor.execute("""
+                INSERT INTO courses (name, career, semester)
+                VALUES (%s, %s, %s)
+                RETURNING id
+            """, (name, career, semester))
+            course_id = cursor.fetchone()[0]
 
         return jsonify({"success": True, "id": course_id, "message": "Curso creado"}), 201
 
@@ -41,19 +36,14 @@ def create_course():
 @course_routes.route("/api/courses", methods=["GET"])
 def get_courses():
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-
-        cursor.execute("SELECT id, name, career, semester FROM courses ORDER BY id ASC")
-        rows = cursor.fetchall()
+        with db_cursor() as cursor:
+            cursor.execute("SELECT id, name, career, semester FROM courses ORDER BY id ASC")
+            rows = cursor.fetchall()
 
-        courses = [
-            {"id": row[0], "name": row[1], "career": row[2], "semester": row[3]}
-            for row in rows
-        ]
-
-        cursor.close()
-        conn.close()
+            courses = [
+                {"id": row[0], "name": row[1], "career": row[2], "semester": row[3]}
+                for row in rows
+            ]
 
         return jsonify(courses), 200
 
@@ -66,14 +56,9 @@ def get_courses():
 @course_routes.route("/api/courses/<int:course_id>", methods=["GET"])
 def get_course(course_id):
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-
-        cursor.execute("SELECT id, name, career, semester FROM courses WHERE id = %s", (course_id,))
-        row = cursor.fetchone()
-
-        cursor.close()
-        conn.close()
+        with db_cursor() as cursor:
+            cursor.execute("SELECT id, name, career, semester FROM courses WHERE id = %s", (course_id,))
+            row = cursor.fetchone()
 
         if row:
             return jsonify({
@@ -99,19 +84,13 @@ def update_course(course_id):
         return jsonify({"success": False, "message": "Todos los campos son requeridos"}), 400
 
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-
-        cursor.execute("""
-            UPDATE courses
-            SET name = %s, career = %s, semester = %s
-            WHERE id = %s RETURNING id
-        """, (name, career, semester, course_id))
-        updated = cursor.fetchone()
-
-        conn.commit()
-        cursor.close()
-        conn.close()
+        with db_cursor() as cursor:
+            cursor.execute("""
+                UPDATE courses
+                SET name = %s, career = %s, semester = %s
+                WHERE id = %s RETURNING id
+            """, (name, career, semester, course_id))
+            updated = cursor.fetchone()
 
         if updated:
             return jsonify({"success": True, "message": "Curso actualizado"}), 200
@@ -127,17 +106,12 @@ def update_course(course_id):
 @course_routes.route("/api/courses/<int:course_id>", methods=["DELETE"])
 def delete_course(course_id):
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-
-        cursor.execute("DELETE FROM courses WHERE id = %s RETURNING id", (course_id,))
-        deleted = cursor.fetchone()
-
-        conn.commit()
-        cursor.close()
-        conn.close()
+        with db_cursor() as cursor:
+            cursor.execute("DELETE FROM courses WHERE id = %s RETURNING id", (course_id,))
+            deleted = cursor.fetchone()
 
         if deleted:
+            invalidate_course_gallery(course_id)
             return jsonify({"success": True, "message": "Curso eliminado"}), 200
         else:
             return jsonify({"success": False, "message": "Curso no encontrado"}), 404
@@ -164,22 +138,18 @@ def get_current_course():
         }
         current_day_db = dias_map[current_day]
 
-        conn = get_connection()
-        cur = conn.cursor()
-
-        # 🔹 Buscar curso cuyo horario cubra este rango
-        cur.execute("""
-            SELECT cs.id, cs.course_id, c.name, c.career, c.semester, cs.day, cs.schedule, cs.classroom
-            FROM course_schedules cs
-            JOIN courses c ON cs.course_id = c.id
-            WHERE cs.day = %s
-              AND %s::time BETWEEN split_part(cs.schedule, ' - ', 1)::time
-                              AND split_part(cs.schedule, ' - ', 2)::time
-        """, (current_day_db, current_time))
-
-        row = cur.fetchone()
-        cur.close()
-        conn.close()
+        with db_cursor() as cur:
+            # 🔹 Buscar curso cuyo horario cubra este rango
+            cur.execute("""
+                SELECT cs.id, cs.course_id, c.name, c.career, c.semester, cs.day, cs.schedule, cs.classroom
+                FROM course_schedules cs
+                JOIN courses c ON cs.course_id = c.id
+                WHERE cs.day = %s
+                  AND %s::time BETWEEN split_part(cs.schedule, ' - ', 1)::time
+                                  AND split_part(cs.schedule, ' - ', 2)::time
+            """, (current_day_db, current_time))
+
+            row = cur.fetchone()
 
         if not row:
             return jsonify({"message": "⚠️ No hay curso activo en este momento"}), 404
@@ -1,5 +1,5 @@
 from flask import Blueprint, request, jsonify
-from database.db import get_connection
+from database.db import db_cursor
 
 course_schedule_routes = Blueprint("course_schedule_routes", __name__)
 
@@ -16,19 +16,13 @@ def create_course_schedule():
         return jsonify({"success": False, "message": "Todos los campos son requeridos"}), 400
 
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-
-        cursor.execute("""
-            INSERT INTO course_schedules (course_id, day, schedule, classroom)
-            VALUES (%s, %s, %s, %s)
-            RETURNING id
-        """, (course_id, day, schedule, classroom))
-        schedule_id = cursor.fetchone()[0]
-
-        conn.commit()
-        cursor.close()
-        conn.close()
+        with db_cursor() as cursor:
+            cursor.execute("""
+                INSERT INTO course_schedules (course_id, day, schedule, classroom)
+                VALUES (%s, %s, %s, %s)
+                RETURNING id
+            """, (course_id, day, schedule, classroom))
+            schedule_id = cursor.fetchone()[0]
 
         return jsonify({"success": True, "id": schedule_id, "message": "Horario creado correctamente"}), 201
 
@@ -44,53 +38,49 @@ def list_course_schedules():
     course_id = request.args.get("course_id", type=int)
 
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-
-        if course_id:
-            cursor.execute(
-                """
-                SELECT id, course_id, day, schedule, classroom
-                FROM course_schedules
-                WHERE course_id = %s
-                ORDER BY
-                  CASE day
-                    WHEN 'Monday' THEN 1
-                    WHEN 'Tuesday' THEN 2
-                    WHEN 'Wednesday' THEN 3
-                    WHEN 'Thursday' THEN 4
-                    WHEN 'Friday' THEN 5
-                    WHEN 'Saturday' THEN 6
-                    WHEN 'Sunday' THEN 7
-                    ELSE 8
-                  END,
-                  schedule
-                """,
-                (course_id,),
-            )
-        else:
-            cursor.execute(
-                """
-                SELECT id, course_id, day, schedule, classroom
-                FROM course_schedules
-                ORDER BY course_id,
-                  CASE day
-                    WHEN 'Monday' THEN 1
-                    WHEN 'Tuesday' THEN 2
-                    WHEN 'Wednesday' THEN 3
-                    WHEN 'Thursday' THEN 4
-                    WHEN 'Friday' THEN 5
-                    WHEN 'Saturday' THEN 6
-                    WHEN 'Sunday' THEN 7
-                    ELSE 8
-                  END,
-                  schedule
-                """
-            )
-
-        rows = cursor.fetchall()
-        cursor.close()
-        conn.close()
+        with db_cursor() as cursor:
+            if course_id:
+                cursor.execute(
+                    """
+                    SELECT id, course_id, day, schedule, classroom
+                    FROM course_schedules
+                    WHERE course_id = %s
+                    ORDER BY
+                      CASE day
+                        WHEN 'Monday' THEN 1
+                        WHEN 'Tuesday' THEN 2
+                        WHEN 'Wednesday' THEN 3
+                        WHEN 'Thursday' THEN 4
+                        WHEN 'Friday' THEN 5
+                        WHEN 'Saturday' THEN 6
+                        WHEN 'Sunday' THEN 7
+                        ELSE 8
+                      END,
+                      schedule
+                    """,
+                    (course_id,),
+                )
+            else:
+                cursor.execute(
+                    """
+                    SELECT id, course_id, day, schedule, classroom
+                    FROM course_schedules
+                    ORDER BY course_id,
+                      CASE day
+                        WHEN 'Monday' THEN 1
+                        WHEN 'Tuesday' THEN 2
+                        WHEN 'Wednesday' THEN 3
+                        WHEN 'Thursday' THEN 4
+                        WHEN 'Friday' THEN 5
+                        WHEN 'Saturday' THEN 6
+                        WHEN 'Sunday' THEN 7
+                        ELSE 8
+                      END,
+                      schedule
+                    """
+                )
+
+            rows = cursor.fetchall()
 
         data = [
             {
@@ -122,21 +112,16 @@ def update_course_schedule(schedule_id):
         return jsonify({"success": False, "message": "Todos los campos son requeridos"}), 400
 
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-
-        cursor.execute(
-            """
-            UPDATE course_schedules
-            SET course_id = %s, day = %s, schedule = %s, classroom = %s
-            WHERE id = %s
-            """,
-            (course_id, day, schedule, classroom, schedule_id),
-        )
-        updated = cursor.rowcount
-        conn.commit()
-        cursor.close()
-        conn.close()
+        with db_cursor() as cursor:
+            cursor.execute(
+                """
+                UPDATE course_schedules
+                SET course_id = %s, day = %s, schedule = %s, classroom = %s
+                WHERE id = %s
+                """,
+                (course_id, day, schedule, classroom, schedule_id),
+            )
+            updated = cursor.rowcount
 
         if updated == 0:
             return jsonify({"success": False, "message": "Horario no encontrado"}), 404
@@ -152,13 +137,9 @@ def update_course_schedule(schedule_id):
 @course_schedule_routes.route("/api/course-schedules/<int:schedule_id>", methods=["DELETE"])
 def delete_course_schedule(schedule_id):
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM course_schedules WHERE id = %s", (schedule_id,))
-        deleted = cursor.rowcount
-        conn.commit()
-        cursor.close()
-        conn.close()
+        with db_cursor() as cursor:
+            cursor.execute("DELETE FROM course_schedules WHERE id = %s", (schedule_id,))
+            deleted = cursor.rowcount
 
         if deleted == 0:
             return jsonify({"success": False, "message": "Horario no encontrado"}), 404
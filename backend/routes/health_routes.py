@@ -0,0 +1,20 @@
+from flask import Blueprint, jsonify
+from model_registry import registry
+from routes.recognition_routes import gallery_store
+from database.db import pool
+
+health_routes = Blueprint("health_routes", __name__)
+
+@health_routes.route("/api/health", methods=["GET"])
+def health():
+    """Liveness: el proceso responde (aunque los modelos no estén listos)."""
+    return jsonify({"status": "ok"}), 200
+
+@health_routes.route("/api/health/ready", methods=["GET"])
+def ready():
+    """Readiness: 200 solo cuando YOLO y ArcFace están cargados y precalentados."""
+    status = registry.status()
+    gallery = gallery_store.gallery
+    status["gallery"] = {"version": gallery.version, "identities": len(gallery)}
+    status["db_pool"] = pool.stats()
+    return jsonify(status), 200 if status["ready"] else 503
@@ -0,0 +1,51 @@
+# backend/routes/match_routes.py
+from flask import Blueprint, request, jsonify
+from recognition.face_recognizer import match_embeddings, result_from_match
+from recognition.course_galleries import get_course_gallery
+from routes.recognition_routes import gallery_store
+from routes.session_routes import sessions
+import edge_protocol
+
+# Embeddings ya calculados por el agente de borde (main.py --edge): acá solo
+# se busca en la galería y se lleva la asistencia, sin YOLO ni ArcFace
+match_routes = Blueprint("match_routes", __name__)
+
+
+@match_routes.route("/api/match", methods=["POST"])
+def match():
+    session = None
+    session_id = (request.args.get("session_id") or "").strip()
+    if session_id:
+        session = sessions.get(session_id)
+        if session is None or session.closed:
+            return jsonify({"error": "Sesión no encontrada"}), 404
+
+    try:
+        payload = edge_protocol.unpack(request.get_data())
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        centroids = gallery_store.gallery
+        course_id = session.course_id if session else (str(payload["course_id"]) if payload["course_id"] else "")
+        gallery = get_course_gallery(centroids, course_id) if course_id else centroids
+
+        embs = payload["embs"]
+        if len(embs) and len(gallery) and embs.shape[1] != gallery.matrix.shape[1]:
+            return jsonify({"error": f"Dimensión de embedding inválida: {embs.shape[1]}"}), 400
+
+        results = []
+        matches = match_embeddings(embs, gallery) if len(embs) else []
+        for m, meta in zip(matches, payload["meta"]):
+            r = result_from_match(m)
+            r["track_id"] = int(meta["track_id"])
+            r["box"] = [int(v) for v in meta["box"]]
+            r["gallery_version"] = centroids.version
+            results.append(r)
+
+        committed = session.add_results(results) if session else []
+        return jsonify({"results": results, "committed": committed}), 200, {"X-Gallery-Version": str(centroids.version)}
+
+    except Exception as e:
+        print("❌ Error en /api/match:", e)
+        return jsonify({"error": str(e)}), 500
@@ -1,9 +1,10 @@
 # backend/routes/participans_routes.py
 from flask import Blueprint, request, jsonify
-from database.db import get_connection
+from database.db import db_cursor
 import os
 from werkzeug.utils import secure_filename
 from train_faces import entrenar
+from recognition.course_galleries import invalidate_course_gallery
 from datetime import datetime, timedelta
 
 
@@ -31,40 +32,36 @@ def create_participant():
         return jsonify({"error": "Todos los campos y al menos una imagen son requeridos"}), 400
 
     try:
-        conn = get_connection()
-        cur = conn.cursor()
-
-        # Verificar si CI ya existe en participants
-        cur.execute("SELECT id FROM participants WHERE ci = %s", (ci,))
-        if cur.fetchone():
-            cur.close(); conn.close()
-            return jsonify({"error": "CI ya registrado"}), 409
-
-        # Verificar existencia de usuario y curso
-        cur.execute("SELECT id FROM users WHERE id = %s", (user_id,))
-        if not cur.fetchone():
-            return jsonify({"error": "Usuario no encontrado"}), 404
-
-        cur.execute("SELECT id FROM courses WHERE id = %s", (course_id,))
-        if not cur.fetchone():
-            return jsonify({"error": "Curso no encontrado"}), 404
-
-        # Insertar participante
-        cur.execute("""
-            INSERT INTO participants (full_name, ci, occupation, user_id)
-            VALUES (%s, %s, %s, %s)
-            RETURNING id
-        """, (full_name, ci, occupation, user_id))
-        participant_id = cur.fetchone()[0]
-
-        # Asignar curso
-        cur.execute("""
-            INSERT INTO participant_courses (participant_id, course_id)
-            VALUES (%s, %s)
-        """, (participant_id, course_id))
-
-        conn.commit()
-        cur.close(); conn.close()
+        with db_cursor() as cur:
+            # Verificar si CI ya existe en participants
+            cur.execute("SELECT id FROM participants WHERE ci = %s", (ci,))
+            if cur.fetchone():
+                return jsonify({"error": "CI ya registrado"}), 409
+
+            # Verificar existencia de usuario y curso
+            cur.execute("SELECT id FROM users WHERE id = %s", (user_id,))
+            if not cur.fetchone():
+                return jsonify({"error": "Usuario no encontrado"}), 404
+
+            cur.execute("SELECT id FROM courses WHERE id = %s", (course_id,))
+            if not cur.fetchone():
+                return jsonify({"error": "Curso no encontrado"}), 404
+
+            # Insertar participante
+            cur.execute("""
+                INSERT INTO participants (full_name, ci, occupation, user_id)
+                VALUES (%s, %s, %s, %s)
+                RETURNING id
+            """, (full_name, ci, occupation, user_id))
+            participant_id = cur.fetchone()[0]
+
+            # Asignar curso
+            cur.execute("""
+                INSERT INTO participant_courses (participant_id, course_id)
+                VALUES (%s, %s)
+            """, (participant_id, course_id))
+
+        invalidate_course_gallery(course_id)
 
         # Guardar imágenes
         ci_safe = secure_filename(ci)
@@ -95,17 +92,13 @@ def create_participant():
 @participants_routes.route("/api/participants", methods=["GET"])
 def get_all_participants():
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-
-        cursor.execute("""
-            SELECT p.id, u.username, p.ci
-            FROM participants p
-            JOIN users u ON p.user_id = u.id
-        """)
-        rows = cursor.fetchall()
-        cursor.close()
-        conn.close()
+        with db_cursor() as cursor:
+            cursor.execute("""
+                SELECT p.id, u.username, p.ci
+                FROM participants p
+                JOIN users u ON p.user_id = u.id
+            """)
+            rows = cursor.fetchall()
 
         participants = []
         for row in rows:
@@ -131,26 +124,22 @@ def assign_course(participant_id):
         return jsonify({"error": "Se requiere course_id"}), 400
 
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-
-        # Verificar si ya tiene asignado ese curso
-        cursor.execute("""
-            SELECT 1 FROM participant_courses 
-            WHERE participant_id = %s AND course_id = %s
-        """, (participant_id, course_id))
-        if cursor.fetchone():
-            return jsonify({"error": "El curso ya está asignado"}), 409
-
-        # Asignar curso
-        cursor.execute("""
-            INSERT INTO participant_courses (participant_id, course_id)
-            VALUES (%s, %s)
-        """, (participant_id, course_id))
-
-        conn.commit()
-        cursor.close()
-        conn.close()
+        with db_cursor() as cursor:
+            # Verificar si ya tiene asignado ese curso
+            cursor.execute("""
+                SELECT 1 FROM participant_courses 
+                WHERE participant_id = %s AND course_id = %s
+            """, (participant_id, course_id))
+            if cursor.fetchone():
+                return jsonify({"error": "El curso ya está asignado"}), 409
+
+            # Asignar curso
+            cursor.execute("""
+                INSERT INTO participant_courses (participant_id, course_id)
+                VALUES (%s, %s)
+            """, (participant_id, course_id))
+
+        invalidate_course_gallery(course_id)
 
         return jsonify({"success": True, "message": "Curso asignado correctamente"}), 200
 
@@ -202,36 +191,33 @@ def participants_table():
         date_from = parse_ymd(qs_from) or default_from
         date_to   = parse_ymd(qs_to)   or default_to
 
-        conn = get_connection()
-        cur = conn.cursor()
-
-        # --------- consulta ----------
-        # Tomamos asistencias y unimos a participantes y cursos
-        sql = """
-            SELECT
-                a.id            AS attendance_id,
-                p.full_name     AS full_name,
-                p.ci            AS ci,
-                c.id            AS course_id,
-                c.name          AS course_name,
-                a.date          AS date,
-                a.observations  AS observations
-            FROM attendances a
-            JOIN participants p ON p.id = a.participant_id
-            LEFT JOIN courses c ON c.id = a.course_id
-            WHERE
-                (DATE(a.date) BETWEEN %s AND %s)
-                AND (%s = '' OR p.full_name ILIKE %s OR CAST(p.ci AS TEXT) ILIKE %s)
-                AND (%s IS NULL OR c.id = %s)
-            ORDER BY a.date DESC, p.full_name ASC
-        """
-
-        like = f"%{q}%"
-        params = [date_from, date_to, q, like, like, course_val, course_val]
-
-        cur.execute(sql, params)
-        rows = cur.fetchall()
-        cur.close(); conn.close()
+        with db_cursor() as cur:
+            # --------- consulta ----------
+            # Tomamos asistencias y unimos a participantes y cursos
+            sql = """
+                SELECT
+                    a.id            AS attendance_id,
+                    p.full_name     AS full_name,
+                    p.ci            AS ci,
+                    c.id            AS course_id,
+                    c.name          AS course_name,
+                    a.date          AS date,
+                    a.observations  AS observations
+                FROM attendances a
+                JOIN participants p ON p.id = a.participant_id
+                LEFT JOIN courses c ON c.id = a.course_id
+                WHERE
+                    (a.date >= %s::date AND a.date < %s::date + 1)
+                    AND (%s = '' OR p.full_name ILIKE %s OR CAST(p.ci AS TEXT) ILIKE %s)
+                    AND (%s IS NULL OR c.id = %s)
+                ORDER BY a.date DESC, p.full_name ASC
+            """
+
+            like = f"%{q}%"
+            params = [date_from, date_to, q, like, like, course_val, course_val]
+
+            cur.execute(sql, params)
+            rows = cur.fetchall()
 
         # --------- salida ----------
         out = []
@@ -295,76 +281,73 @@ def participants_attendance_summary():
         course_val = int(course_id) if course_id.isdigit() else None
         min_pct_val = float(min_pct) if min_pct.replace(".", "", 1).isdigit() else None
 
-        conn = get_connection()
-        cur = conn.cursor()
-
-        # Postgres: EXTRACT(DOW) -> 0=Dom .. 6=Sáb
-        sql = """
-        WITH date_range AS (
-          SELECT generate_series(%s::date, %s::date, interval '1 day')::date AS d
-        ),
-        sched AS (
-          SELECT
-            cs.course_id,
-            CASE
-              WHEN LOWER(cs.day) = 'sunday'    THEN 0
-              WHEN LOWER(cs.day) = 'monday'    THEN 1
-              WHEN LOWER(cs.day) = 'tuesday'   THEN 2
-              WHEN LOWER(cs.day) = 'wednesday' THEN 3
-              WHEN LOWER(cs.day) = 'thursday'  THEN 4
-              WHEN LOWER(cs.day) = 'friday'    THEN 5
-              WHEN LOWER(cs.day) = 'saturday'  THEN 6
-              ELSE NULL
-            END AS dow
-          FROM course_schedules cs
-        ),
-        sessions AS (  -- todas las clases programadas por curso en el rango
-          SELECT dr.d, s.course_id
-          FROM date_range dr
-          JOIN sched s ON EXTRACT(DOW FROM dr.d) = s.dow
-        ),
-        scheduled_counts AS (
-          SELECT course_id, COUNT(*)::int AS total_scheduled
-          FROM sessions
-          GROUP BY course_id
-        ),
-        attended_counts AS (
-          SELECT a.participant_id, a.course_id,
-                 COUNT(DISTINCT DATE(a.date))::int AS total_attended
-          FROM attendances a
-          WHERE DATE(a.date) BETWEEN %s AND %s
-          GROUP BY a.participant_id, a.course_id
-        )
-        SELECT
-          p.id          AS participant_id,
-          p.full_name   AS full_name,
-          p.ci          AS ci,
-          c.id          AS course_id,
-          c.name        AS course_name,
-          COALESCE(sc.total_scheduled, 0) AS total_scheduled,
-          COALESCE(ac.total_attended, 0)   AS total_attended,
-          CASE
-            WHEN COALESCE(sc.total_scheduled, 0) > 0
-              THEN ROUND(100.0 * COALESCE(ac.total_attended, 0) / sc.total_scheduled, 2)
-            ELSE 0
-          END::float AS pct
-        FROM participant_courses pc
-        JOIN participants p ON p.id = pc.participant_id
-        JOIN courses c      ON c.id = pc.course_id
-        LEFT JOIN scheduled_counts sc ON sc.course_id = pc.course_id
-        LEFT JOIN attended_counts  ac ON ac.participant_id = pc.participant_id
-                                     AND ac.course_id      = pc.course_id
-        WHERE
-          (%s = '' OR p.full_name ILIKE %s OR CAST(p.ci AS TEXT) ILIKE %s)
-          AND (%s IS NULL OR c.id = %s)
-        ORDER BY p.full_name ASC, c.name ASC
-        """
-
-        like = f"%{q}%"
-        params = [date_from, date_to, date_from, date_to, q, like, like, course_val, course_val]
-        cur.execute(sql, params)
-        rows = cur.fetchall()
-        cur.close(); conn.close()
+        with db_cursor() as cur:
+            # Postgres: EXTRACT(DOW) -> 0=Dom .. 6=Sáb
+            sql = """
+            WITH date_range AS (
+              SELECT generate_series(%s::date, %s::date, interval '1 day')::date AS d
+            ),
+            sched AS (
+              SELECT
+                cs.course_id,
+                CASE
+                  WHEN LOWER(cs.day) = 'sunday'    THEN 0
+                  WHEN LOWER(cs.day) = 'monday'    THEN 1
+                  WHEN LOWER(cs.day) = 'tuesday'   THEN 2
+                  WHEN LOWER(cs.day) = 'wednesday' THEN 3
+                  WHEN LOWER(cs.day) = 'thursday'  THEN 4
+                  WHEN LOWER(cs.day) = 'friday'    THEN 5
+                  WHEN LOWER(cs.day) = 'saturday'  THEN 6
+                  ELSE NULL
+                END AS dow
+              FROM course_schedules cs
+            ),
+            sessions AS (  -- todas las clases programadas por curso en el rango
+              SELECT dr.d, s.course_id
+              FROM date_range dr
+              JOIN sched s ON EXTRACT(DOW FROM dr.d) = s.dow
+            ),
+            scheduled_counts AS (
+              SELECT course_id, COUNT(*)::int AS total_scheduled
+              FROM sessions
+              GROUP BY course_id
+            ),
+            attended_counts AS (
+              SELECT a.participant_id, a.course_id,
+                     COUNT(DISTINCT a.date)::int AS total_attended
+              FROM attendances a
+              WHERE a.date >= %s::date AND a.date < %s::date + 1
+              GROUP BY a.participant_id, a.course_id
+            )
+            SELECT
+              p.id          AS participant_id,
+              p.full_name   AS full_name,
+              p.ci          AS ci,
+              c.id          AS course_id,
+              c.name        AS course_name,
+              COALESCE(sc.total_scheduled, 0) AS total_scheduled,
+              COALESCE(ac.total_attended, 0)   AS total_attended,
+              CASE
+                WHEN COALESCE(sc.total_scheduled, 0) > 0
+                  THEN ROUND(100.0 * COALESCE(ac.total_attended, 0) / sc.total_scheduled, 2)
+                ELSE 0
+              END::float AS pct
+            FROM participant_courses pc
+            JOIN participants p ON p.id = pc.participant_id
+            JOIN courses c      ON c.id = pc.course_id
+            LEFT JOIN scheduled_counts sc ON sc.course_id = pc.course_id
+            LEFT JOIN attended_counts  ac ON ac.participant_id = pc.participant_id
+                                         AND ac.course_id      = pc.course_id
+            WHERE
+              (%s = '' OR p.full_name ILIKE %s OR CAST(p.ci AS TEXT) ILIKE %s)
+              AND (%s IS NULL OR c.id = %s)
+            ORDER BY p.full_name ASC, c.name ASC
+            """
+
+            like = f"%{q}%"
+            params = [date_from, date_to, date_from, date_to, q, like, like, course_val, course_val]
+            cur.execute(sql, params)
+            rows = cur.fetchall()
 
         out = []
         for r in rows:
@@ -405,35 +388,32 @@ def participants_unique_list():
         course_id = (request.args.get("course_id") or "").strip()
         course_val = int(course_id) if course_id.isdigit() else None
 
-        conn = get_connection()
-        cur = conn.cursor()
-
-        # Nota: LEFT JOIN para no perder participantes sin cursos.
-        #   Agrupamos por participante y agregamos cursos (id + nombre).
-        #   Si llega course_id, filtramos por pertenencia a ese curso.
-        sql = """
-        SELECT
-          p.id,
-          p.full_name,
-          p.ci,
-          COALESCE(ARRAY_AGG(DISTINCT c.id) FILTER (WHERE c.id IS NOT NULL), '{}') AS course_ids,
-          COALESCE(STRING_AGG(DISTINCT c.name, ', ' ORDER BY c.name), '')          AS course_names
-        FROM participants p
-        LEFT JOIN participant_courses pc ON pc.participant_id = p.id
-        LEFT JOIN courses c             ON c.id = pc.course_id
-        WHERE
-          (%s = '' OR p.full_name ILIKE %s OR CAST(p.ci AS TEXT) ILIKE %s)
-          AND (%s IS NULL OR c.id = %s)
-        GROUP BY p.id, p.full_name, p.ci
-        ORDER BY p.id DESC;
-        """
-
-        like = f"%{q}%"
-        params = [q, like, like, course_val, course_val]
-
-        cur.execute(sql, params)
-        rows = cur.fetchall()
-        cur.close(); conn.close()
+        with db_cursor() as cur:
+            # Nota: LEFT JOIN para no perder participantes sin cursos.
+            #   Agrupamos por participante y agregamos cursos (id + nombre).
+            #   Si llega course_id, filtramos por pertenencia a ese curso.
+            sql = """
+            SELECT
+              p.id,
+              p.full_name,
+              p.ci,
+              COALESCE(ARRAY_AGG(DISTINCT c.id) FILTER (WHERE c.id IS NOT NULL), '{}') AS course_ids,
+              COALESCE(STRING_AGG(DISTINCT c.name, ', ' ORDER BY c.name), '')          AS course_names
+            FROM participants p
+            LEFT JOIN participant_courses pc ON pc.participant_id = p.id
+            LEFT JOIN courses c             ON c.id = pc.course_id
+            WHERE
+              (%s = '' OR p.full_name ILIKE %s OR CAST(p.ci AS TEXT) ILIKE %s)
+              AND (%s IS NULL OR c.id = %s)
+            GROUP BY p.id, p.full_name, p.ci
+            ORDER BY p.id DESC;
+            """
+
+            like = f"%{q}%"
+            params = [q, like, like, course_val, course_val]
+
+            cur.execute(sql, params)
+            rows = cur.fetchall()
 
         out = [{
             "id": r[0],
@@ -2,13 +2,72 @@ from flask import Blueprint, request, jsonify
 import cv2
 import numpy as np
 from detection.yoloface import detect_faces
-from recognition.face_recognizer import recognize_faces_from_crops, load_centroids
+from recognition.face_recognizer import recognize_faces_from_crops, recognize_tracked
+from recognition.embedding_cache import combined_stats
+from detection.tracker import TrackerPool
+from recognition.course_galleries import get_course_gallery
+from recognition.gallery_store import GalleryStore
+from inference_server import InferenceServer, MICROBATCH_ENABLED
 
-# Cargar centroides al inicio
-centroids = load_centroids()
+# Galería versionada: se recarga en segundo plano cuando train_faces.py
+# actualiza centroids.json, sin reiniciar el proceso
+gallery_store = GalleryStore().start()
+
+# YOLO y ArcFace en batch compartido entre requests concurrentes (ver inference_server.py).
+# Opt-in con CHECKFACE_MICROBATCH=1; los hilos arrancan con la primera request de cada worker
+inference_server = InferenceServer() if MICROBATCH_ENABLED else None
+
+# Un tracker por stream (pestaña/cámara): cada rostro se reconoce al aparecer y luego solo se re-verifica
+trackers = TrackerPool()
 
 recognition_routes = Blueprint("recognition_routes", __name__)
 
+
+def recognize_image(img, course_id="", tracker=None):
+    """
+    Detección + reconocimiento de un frame ya decodificado (lo comparten
+    /api/recognize y el stream por WebSocket). Con tracker, ArcFace solo
+    corre para los tracks nuevos o a re-verificar.
+    Retorna (resultados, versión de la galería usada).
+    """
+    # Snapshot de la galería para todo el frame (no cambia aunque haya recarga)
+    centroids = gallery_store.gallery
+
+    # 1. Detectar rostros con YOLO
+    boxes = inference_server.detect(img) if inference_server else detect_faces(img)
+    if not boxes:
+        return [], centroids.version
+
+    gallery = get_course_gallery(centroids, course_id) if course_id else centroids
+    embed_fn = inference_server.embed if inference_server else None
+
+    # 2-3. Con tracker: ArcFace solo para tracks nuevos o a re-verificar
+    if tracker is not None:
+        with tracker.lock:
+            results = recognize_tracked(img, boxes, tracker, gallery, embed_fn=embed_fn)
+    else:
+        # 2. Recortar los rostros
+        cropped_faces = []
+        for (x, y, w, h) in boxes:
+            x, y = max(0, x), max(0, y)
+            face = img[y:y+h, x:x+w]
+
+            if face.size == 0:
+                continue
+
+            # El resize al tamaño del modelo se hace en el batch (preprocess_crops replica
+            # el preprocesamiento de DeepFace.represent que usa train_faces.py)
+            cropped_faces.append(face)
+
+        # 3. Reconocer todos los rostros en un solo batch
+        # Sin stream_id no hay caché de embeddings: no se sabe de qué cámara viene el frame
+        results = recognize_faces_from_crops(cropped_faces, gallery, embed_fn=embed_fn)
+
+    for r in results:
+        r["gallery_version"] = centroids.version
+    return results, centroids.version
+
+
 @recognition_routes.route("/api/recognize", methods=["POST"])
 def recognize():
     if 'image' not in request.files:
@@ -16,6 +75,14 @@ def recognize():
 
     image = request.files['image']
 
+    # Curso activo (opcional): solo se compara contra sus inscriptos
+    course_id = (request.form.get("course_id") or request.args.get("course_id") or "").strip()
+    if course_id and not course_id.isdigit():
+        return jsonify({"error": "course_id inválido"}), 400
+
+    # Stream del cliente (opcional): habilita el tracking entre frames sucesivos
+    stream_id = (request.form.get("stream_id") or request.args.get("stream_id") or "").strip()[:64]
+
     try:
         np_img = np.frombuffer(image.read(), np.uint8)
         img = cv2.imdecode(np_img, cv2.IMREAD_COLOR)
@@ -23,31 +90,27 @@ def recognize():
         if img is None:
             raise ValueError("Imagen inválida")
 
-        # 1. Detectar rostros con YOLO
-        boxes = detect_faces(img)
-        if not boxes:
-            return jsonify([]), 200
-
-        # 2. Recortar los rostros
-        cropped_faces = []
-        for (x, y, w, h) in boxes:
-            x, y = max(0, x), max(0, y)
-            face = img[y:y+h, x:x+w]
+        tracker = trackers.get((stream_id, course_id)) if stream_id else None
+        results, version = recognize_image(img, course_id, tracker)
+        return jsonify(results), 200, {"X-Gallery-Version": str(version)}
 
-            if face.size == 0:
-                continue
+    except Exception as e:
+        return jsonify({"error": f"Error al procesar la imagen: {str(e)}"}), 500
 
-            face = cv2.resize(face, (160, 160))
-            face = cv2.cvtColor(face, cv2.COLOR_BGR2RGB)
-            cropped_faces.append(face)
+def cache_stats():
+    return combined_stats([t.embedding_cache for t in trackers.active() if t.embedding_cache is not None])
 
-        if not cropped_faces:
-            return jsonify([]), 200
 
-        # 3. Reconocer cada rostro recortado
-        results = recognize_faces_from_crops(cropped_faces, centroids)
+@recognition_routes.route("/api/recognize/cache", methods=["GET"])
+def recognize_cache_stats():
+    """Aciertos/fallos de las cachés de embeddings de los streams HTTP (stream_id)."""
+    return jsonify(cache_stats()), 200
 
-        return jsonify(results), 200
 
-    except Exception as e:
-        return jsonify({"error": f"Error al procesar la imagen: {str(e)}"}), 500
\ No newline at end of file
+@recognition_routes.route("/api/recognize/metrics", methods=["GET"])
+def recognize_metrics():
+    """Profundidad de cola y tamaño de batch del micro-batching, más la caché de embeddings."""
+    metrics = inference_server.stats() if inference_server else {}
+    metrics["cache"] = cache_stats()
+    metrics["tracked_streams"] = len(trackers)
+    return jsonify(metrics), 200
@@ -1,5 +1,5 @@
 from flask import Blueprint, request, jsonify
-from database.db import get_connection
+from database.db import db_cursor
 
 role_routes = Blueprint("role_routes", __name__)
 
@@ -13,15 +13,9 @@ def create_role():
         return jsonify({"success": False, "message": "Descripción requerida"}), 400
 
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-
-        cursor.execute("INSERT INTO roles (description) VALUES (%s) RETURNING id", (description,))
-        role_id = cursor.fetchone()[0]
-
-        conn.commit()
-        cursor.close()
-        conn.close()
+        with db_cursor() as cursor:
+            cursor.execute("INSERT INTO roles (description) VALUES (%s) RETURNING id", (description,))
+            role_id = cursor.fetchone()[0]
 
         return jsonify({"success": True, "id": role_id, "message": "Rol creado"}), 201
 
@@ -34,16 +28,11 @@ def create_role():
 @role_routes.route("/api/roles", methods=["GET"])
 def get_roles():
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-
-        cursor.execute("SELECT id, description FROM roles ORDER BY id ASC")
-        rows = cursor.fetchall()
+        with db_cursor() as cursor:
+            cursor.execute("SELECT id, description FROM roles ORDER BY id ASC")
+            rows = cursor.fetchall()
 
-        roles = [{"id": row[0], "description": row[1]} for row in rows]
-
-        cursor.close()
-        conn.close()
+            roles = [{"id": row[0], "description": row[1]} for row in rows]
 
         return jsonify(roles), 200
 
@@ -56,14 +45,9 @@ def get_roles():
 @role_routes.route("/api/roles/<int:role_id>", methods=["GET"])
 def get_role(role_id):
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-
-        cursor.execute("SELECT id, description FROM roles WHERE id = %s", (role_id,))
-        row = cursor.fetchone()
-
-        cursor.close()
-        conn.close()
+        with db_cursor() as cursor:
+            cursor.execute("SELECT id, description FROM roles WHERE id = %s", (role_id,))
+            row = cursor.fetchone()
 
         if row:
             return jsonify({"id": row[0], "description": row[1]}), 200
@@ -85,15 +69,9 @@ def update_role(role_id):
         return jsonify({"success": False, "message": "Descripción requerida"}), 400
 
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-
-        cursor.execute("UPDATE roles SET description = %s WHERE id = %s RETURNING id", (description, role_id))
-        updated = cursor.fetchone()
-
-        conn.commit()
-        cursor.close()
-        conn.close()
+        with db_cursor() as cursor:
+            cursor.execute("UPDATE roles SET description = %s WHERE id = %s RETURNING id", (description, role_id))
+            updated = cursor.fetchone()
 
         if updated:
             return jsonify({"success": True, "message": "Rol actualizado"}), 200
@@ -109,15 +87,9 @@ def update_role(role_id):
 @role_routes.route("/api/roles/<int:role_id>", methods=["DELETE"])
 def delete_role(role_id):
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-
-        cursor.execute("DELETE FROM roles WHERE id = %s RETURNING id", (role_id,))
-        deleted = cursor.fetchone()
-
-        conn.commit()
-        cursor.close()
-        conn.close()
+        with db_cursor() as cursor:
+            cursor.execute("DELETE FROM roles WHERE id = %s RETURNING id", (role_id,))
+            deleted = cursor.fetchone()
 
         if deleted:
             return jsonify({"success": True, "message": "Rol eliminado"}), 200
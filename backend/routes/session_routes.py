@@ -0,0 +1,95 @@
+# backend/routes/session_routes.py
+from datetime import date
+from flask import Blueprint, request, jsonify
+import cv2
+import numpy as np
+from recognition_sessions import SessionManager
+from routes.recognition_routes import recognize_image
+
+# Sesiones de reconocimiento: el servidor cuenta los votos por CI y registra
+# la asistencia solo, sin que el cliente tenga que llevar el conteo. El estado
+# está en la base (tablas recognition_sessions*), así que el alta, los frames
+# y el cierre pueden caer en workers distintos de gunicorn
+sessions = SessionManager()
+
+session_routes = Blueprint("session_routes", __name__)
+
+
+@session_routes.route("/api/sessions", methods=["POST"])
+def start_session():
+    data = request.get_json(silent=True) or {}
+    course_id = str(data.get("course_id") or "").strip()
+    fecha = data.get("date")
+    min_votes = data.get("min_votes")
+
+    if not course_id.isdigit():
+        return jsonify({"success": False, "message": "course_id requerido"}), 400
+    if min_votes is not None and (not str(min_votes).isdigit() or int(min_votes) < 1):
+        return jsonify({"success": False, "message": "min_votes inválido"}), 400
+    if fecha is not None:
+        try:
+            date.fromisoformat(str(fecha))
+        except ValueError:
+            return jsonify({"success": False, "message": "date inválida (YYYY-MM-DD)"}), 400
+
+    kwargs = {"min_votes": int(min_votes)} if min_votes is not None else {}
+    try:
+        session = sessions.start(course_id, fecha, **kwargs)
+    except Exception as e:
+        print("❌ Error al crear la sesión:", e)
+        return jsonify({"success": False, "message": "Error al crear la sesión"}), 500
+    return jsonify({
+        "success": True,
+        "session_id": session.id,
+        "course_id": session.course_id,
+        "date": session.date,
+        "min_votes": session.min_votes,
+    }), 201
+
+
+@session_routes.route("/api/sessions/<session_id>/frames", methods=["POST"])
+def session_frame(session_id):
+    """Un frame de la sesión por HTTP (respaldo del stream /ws/recognize?session_id=...)."""
+    session = sessions.get(session_id)
+    if session is None or session.closed:
+        return jsonify({"error": "Sesión no encontrada"}), 404
+    if 'image' not in request.files:
+        return jsonify({"error": "No se proporcionó imagen"}), 400
+
+    try:
+        img = cv2.imdecode(np.frombuffer(request.files['image'].read(), np.uint8), cv2.IMREAD_COLOR)
+        if img is None:
+            raise ValueError("Imagen inválida")
+
+        results, version = recognize_image(img, session.course_id, session.tracker)
+        committed = session.add_results(results)
+        return jsonify({"results": results, "committed": committed}), 200, {"X-Gallery-Version": str(version)}
+
+    except Exception as e:
+        return jsonify({"error": f"Error al procesar la imagen: {str(e)}"}), 500
+
+
+@session_routes.route("/api/sessions/<session_id>", methods=["GET"])
+def get_session(session_id):
+    try:
+        session = sessions.get(session_id)
+        summary = session.summary() if session else None
+    except Exception as e:
+        print("❌ Error al leer la sesión:", e)
+        return jsonify({"error": str(e)}), 500
+    if summary is None:
+        return jsonify({"error": "Sesión no encontrada"}), 404
+    return jsonify(summary), 200
+
+
+@session_routes.route("/api/sessions/<session_id>", methods=["DELETE"])
+def close_session(session_id):
+    """Cierra la sesión: escribe lo pendiente y devuelve el resumen final."""
+    try:
+        summary = sessions.close(session_id)
+    except Exception as e:
+        print("❌ Error al cerrar la sesión:", e)
+        return jsonify({"error": str(e)}), 500
+    if summary is None:
+        return jsonify({"error": "Sesión no encontrada"}), 404
+    return jsonify(summary), 200
@@ -0,0 +1,120 @@
+import json
+import time
+from flask import Blueprint, request
+from flask_sock import Sock, ConnectionClosed
+import cv2
+import numpy as np
+from detection.tracker import FaceTracker
+from routes.recognition_routes import recognize_image
+from routes.session_routes import sessions
+
+# Stream de reconocimiento por WebSocket: el cliente manda frames JPEG
+# (mensajes binarios) sin esperar respuesta HTTP por cada uno; el servidor
+# procesa siempre el más reciente, descarta los viejos y empuja resultados.
+sock = Sock()
+stream_routes = Blueprint("stream_routes", __name__)
+
+# Espera máxima por un frame antes de mandar un ping de keep-alive (s)
+IDLE_TIMEOUT = 15
+
+
+def _latest_message(ws, timeout):
+    """
+    Bloquea hasta recibir un mensaje y luego vacía lo que ya esté en cola,
+    quedándose con el último frame. Retorna (frame o None, controles, descartados).
+    """
+    frame, controls, dropped = None, [], 0
+    msg = ws.receive(timeout=timeout)
+    while msg is not None:
+        if isinstance(msg, (bytes, bytearray)):
+            if frame is not None:
+                dropped += 1
+            frame = msg
+        else:
+            controls.append(msg)
+        msg = ws.receive(timeout=0)
+    return frame, controls, dropped
+
+
+@sock.route("/ws/recognize", bp=stream_routes)
+def recognize_stream(ws):
+    """
+    Protocolo:
+      cliente → binario: frame JPEG
+      cliente → texto:   {"type": "config", "course_id": 12}
+      servidor → texto:  {"type": "results", "frame": n, "results": [...],
+                          "gallery_version": v, "latency_ms": t, "dropped": d,
+                          "committed": [...]}
+      servidor → texto:  {"type": "error", "error": "..."}
+    course_id también puede ir en la query (?course_id=12). Con
+    ?session_id=... (ver /api/sessions) el curso y el tracker son los de la
+    sesión, y cada frame suma votos; "committed" trae los CIs cuya asistencia
+    se acaba de registrar.
+    """
+    session = None
+    session_id = (request.args.get("session_id") or "").strip()
+    if session_id:
+        session = sessions.get(session_id)
+        if session is None or session.closed:
+            ws.send(json.dumps({"type": "error", "error": "Sesión no encontrada"}))
+            return
+
+    course_id = session.course_id if session else (request.args.get("course_id") or "").strip()
+    if course_id and not course_id.isdigit():
+        ws.send(json.dumps({"type": "error", "error": "course_id inválido"}))
+        return
+
+    # El tracker vive lo que dura la conexión (o la sesión): no hace falta stream_id
+    tracker = session.tracker if session else FaceTracker()
+    frames, dropped = 0, 0
+
+    try:
+        while True:
+            data, controls, skipped = _latest_message(ws, IDLE_TIMEOUT)
+            dropped += skipped
+
+            for raw in controls:
+                try:
+                    msg = json.loads(raw)
+                except ValueError:
+                    continue
+                if session is None and msg.get("type") == "config" and str(msg.get("course_id", "")).isdigit():
+                    course_id = str(msg["course_id"])
+                    tracker = FaceTracker()
+
+            if data is None:
+                if not controls:
+                    ws.send(json.dumps({"type": "ping"}))
+                continue
+
+            t0 = time.perf_counter()
+            img = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+            if img is None:
+                ws.send(json.dumps({"type": "error", "error": "Imagen inválida"}))
+                continue
+
+            results, version = recognize_image(img, course_id, tracker)
+            committed = session.add_results(results) if session else []
+            if session is not None and session.closed:
+                # Se cerró desde otra request (DELETE o expiración), quizá en otro worker
+                ws.send(json.dumps({"type": "error", "error": "Sesión cerrada"}))
+                return
+            frames += 1
+            ws.send(json.dumps({
+                "type": "results",
+                "frame": frames,
+                "results": results,
+                "gallery_version": version,
+                "latency_ms": round((time.perf_counter() - t0) * 1000, 1),
+                "dropped": dropped,
+                "committed": committed,
+            }))
+
+    except ConnectionClosed:
+        pass
+    except Exception as e:
+        print("❌ Error en el stream de reconocimiento:", e)
+        try:
+            ws.send(json.dumps({"type": "error", "error": str(e)}))
+        except ConnectionClosed:
+            pass
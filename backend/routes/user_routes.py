@@ -2,7 +2,7 @@
 import os
 import shutil
 from flask import Blueprint, request, jsonify
-from database.db import get_connection
+from database.db import db_cursor
 from werkzeug.utils import secure_filename
 from train_faces import entrenar
 
@@ -12,37 +12,34 @@ user_routes = Blueprint("user_routes", __name__)
 @user_routes.route("/api/users", methods=["GET"])
 def get_all_users():
     try:
-        conn = get_connection()
-        cur = conn.cursor()
+        with db_cursor() as cur:
+            cur.execute("""
+                SELECT u.id, u.username, u.role_id, r.description AS role
+                FROM users u
+                LEFT JOIN roles r ON u.role_id = r.id
+                ORDER BY u.id ASC
+            """)
+
+            cur.execute("""
+                SELECT p.id, u.username, p.ci
+                FROM participants p
+                JOIN users u ON p.user_id = u.id
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM attendances a
+                    WHERE a.participant_id = p.id
+                )
+            """)
+            rows = cur.fetchall()
+
+            users = []
+            for row in rows:
+                users.append({
+                    "id": row[0],
+                    "username": row[1],
+                    "role_id": row[2],
+                    "role": row[3]
+                })
 
-        cur.execute("""
-            SELECT u.id, u.username, u.role_id, r.description AS role
-            FROM users u
-            LEFT JOIN roles r ON u.role_id = r.id
-            ORDER BY u.id ASC
-        """)
-
-        cur.execute("""
-            SELECT p.id, u.username, p.ci
-            FROM participants p
-            JOIN users u ON p.user_id = u.id
-            WHERE NOT EXISTS (
-                SELECT 1 FROM attendances a
-                WHERE a.participant_id = p.id
-            )
-        """)
-        rows = cur.fetchall()
-
-        users = []
-        for row in rows:
-            users.append({
-                "id": row[0],
-                "username": row[1],
-                "role_id": row[2],
-                "role": row[3]
-            })
-
-        cur.close(); conn.close()
         return jsonify(users), 200
 
     except Exception as e:
@@ -53,19 +50,15 @@ def get_all_users():
 @user_routes.route("/api/users/available", methods=["GET"])
 def get_available_users():
     try:
-        conn = get_connection()
-        cur = conn.cursor()
-
-        # Usuarios que no están asociados a ningún participante
-        cur.execute("""
-            SELECT id, username
-            FROM users
-            WHERE id NOT IN (SELECT user_id FROM participants)
-        """)
-        users = [{"id": row[0], "username": row[1]} for row in cur.fetchall()]
+        with db_cursor() as cur:
+            # Usuarios que no están asociados a ningún participante
+            cur.execute("""
+                SELECT id, username
+                FROM users
+                WHERE id NOT IN (SELECT user_id FROM participants)
+            """)
+            users = [{"id": row[0], "username": row[1]} for row in cur.fetchall()]
 
-        cur.close()
-        conn.close()
         return jsonify(users), 200
 
     except Exception as e:
@@ -76,18 +69,14 @@ def get_available_users():
 @user_routes.route("/api/users/<int:user_id>", methods=["GET"])
 def get_user_by_id(user_id):
     try:
-        conn = get_connection()
-        cur = conn.cursor()
-
-        cur.execute("""
-            SELECT u.id, u.username, u.role_id, r.description AS role
-            FROM users u
-            LEFT JOIN roles r ON u.role_id = r.id
-            WHERE u.id = %s
-        """, (user_id,))
-        row = cur.fetchone()
-
-        cur.close(); conn.close()
+        with db_cursor() as cur:
+            cur.execute("""
+                SELECT u.id, u.username, u.role_id, r.description AS role
+                FROM users u
+                LEFT JOIN roles r ON u.role_id = r.id
+                WHERE u.id = %s
+            """, (user_id,))
+            row = cur.fetchone()
 
         if row:
             user = {
@@ -2,7 +2,7 @@
 import os
 import shutil
 from flask import Blueprint, request, jsonify
-from database.db import get_connection
+from database.db import db_cursor
 from werkzeug.utils import secure_filename
 from train_faces import entrenar
 
@@ -33,11 +33,9 @@ def _count_photos_in_raw(name: str) -> int:
     return sum(f.lower().endswith(('.jpg', '.jpeg', '.png')) for f in os.listdir(d))
 
 def _get_student_name_by_id(student_id: int):
-    conn = get_connection()
-    cur  = conn.cursor()
-    cur.execute("SELECT name FROM students WHERE id = %s", (student_id,))
-    row = cur.fetchone()
-    cur.close(); conn.close()
+    with db_cursor() as cur:
+        cur.execute("SELECT name FROM students WHERE id = %s", (student_id,))
+        row = cur.fetchone()
     return row[0] if row else None
 
 
@@ -60,43 +58,35 @@ def register_student():
         return jsonify({"error": "Todos los campos y al menos una imagen son requeridos"}), 400
 
 
-    conn = get_connection()
-    cur = conn.cursor()
-    
-    # Verifica CI duplicado
-    cur.execute("SELECT id FROM users WHERE ci = %s", (ci,))
-    if cur.fetchone():
-        cur.close(); conn.close()
-        return jsonify({"error": "CI ya registrado"}), 409
-
     try:
-        # Verifica si el curso existe
-        cur.execute("SELECT id FROM courses WHERE id = %s", (course_id,))
-        if not cur.fetchone():
-            cur.close(); conn.close()
-            return jsonify({"error": "Curso no encontrado"}), 404
-
-        # Verifica si el rol existe
-        cur.execute("SELECT id FROM roles WHERE id = %s", (role_id,))
-        if not cur.fetchone():
-            cur.close(); conn.close()
-            return jsonify({"error": "Rol no encontrado"}), 404
-        
-        # Insertar usuario
-        cur.execute("""
-            INSERT INTO users (name, ci, email, password, role_id)
-            VALUES (%s, %s, %s, %s, %s) RETURNING id
-        """, (name, ci, email, password, role_id))
-        user_id = cur.fetchone()[0]
-
-        # Asignar curso
-        cur.execute("""
-            INSERT INTO user_courses (user_id, course_id)
-            VALUES (%s, %s)
-        """, (user_id, course_id))
-
-        conn.commit()
-        cur.close(); conn.close()
+        with db_cursor() as cur:
+            # Verifica CI duplicado
+            cur.execute("SELECT id FROM users WHERE ci = %s", (ci,))
+            if cur.fetchone():
+                return jsonify({"error": "CI ya registrado"}), 409
+
+            # Verifica si el curso existe
+            cur.execute("SELECT id FROM courses WHERE id = %s", (course_id,))
+            if not cur.fetchone():
+                return jsonify({"error": "Curso no encontrado"}), 404
+
+            # Verifica si el rol existe
+            cur.execute("SELECT id FROM roles WHERE id = %s", (role_id,))
+            if not cur.fetchone():
+                return jsonify({"error": "Rol no encontrado"}), 404
+
+            # Insertar usuario
+            cur.execute("""
+                INSERT INTO users (name, ci, email, password, role_id)
+                VALUES (%s, %s, %s, %s, %s) RETURNING id
+            """, (name, ci, email, password, role_id))
+            user_id = cur.fetchone()[0]
+
+            # Asignar curso
+            cur.execute("""
+                INSERT INTO user_courses (user_id, course_id)
+                VALUES (%s, %s)
+            """, (user_id, course_id))
 
         # Guardar imágenes en raw_faces/<ci>/
         ci_safe = secure_filename(ci)
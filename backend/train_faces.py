@@ -6,16 +6,20 @@ import cv2
 import json
 import numpy as np
 from deepface import DeepFace
-from detection.yoloface import detect_faces
+from detection.yoloface import detect_faces_batch, BATCH_SIZE
+from detection.image_io import read_for_detection, crop_face
+from recognition import centroid_store, quality
 from recognition.helpers import (
-    robust_mean,
+    prototipos_kmeans,
     calcular_distancia_promedio
 )
 
 RAW_DIR = "backend/recognition/raw_faces"
 PROCESSED_DIR = "backend/recognition/known_faces"
 EMBEDDINGS_DIR = "backend/recognition/embeddings"
-CENTROIDS_PATH = os.path.join(EMBEDDINGS_DIR, "centroids.json")
+
+# Máximo de prototipos por identidad (con/sin lentes, distinta iluminación...)
+MAX_PROTOTIPOS = int(os.getenv("CHECKFACE_MAX_PROTOTYPES", "3"))
 
 
 def recortar_y_guardar(ci):
@@ -29,41 +33,53 @@ def recortar_y_guardar(ci):
 
     os.makedirs(processed_path, exist_ok=True)
 
+    pendientes = []
     for file in os.listdir(raw_path):
         if not file.lower().endswith((".jpg", ".jpeg", ".png")):
             continue
-
-        image_path = os.path.join(raw_path, file)
-        save_path  = os.path.join(processed_path, file)
-
-        if os.path.exists(save_path):
-            continue
-
-        img = cv2.imread(image_path)
-        boxes = detect_faces(img)
-
-        if not boxes:
-            print(f"⚠️ No se detectó rostro en {file}, se salta.")
-            continue
-
-        x, y, w, h = boxes[0]
-        face_crop = img[y:y+h, x:x+w]
-        face_crop = cv2.resize(face_crop, (160, 160))
-        cv2.imwrite(save_path, face_crop)
-        print(f"✅ Recortado: {save_path}")
+        if not os.path.exists(os.path.join(processed_path, file)):
+            pendientes.append(file)
+
+    # Se detecta de a BATCH_SIZE fotos por llamada a YOLO
+    for i in range(0, len(pendientes), BATCH_SIZE):
+        lote = []
+        for file in pendientes[i:i + BATCH_SIZE]:
+            # Fotos de celular (12 MP): se decodifican reducidas, YOLO igual trabaja a 640 px
+            img, factor = read_for_detection(os.path.join(raw_path, file))
+            if img is None:
+                print(f"⚠️ No se pudo leer {file}, se salta.")
+                continue
+            lote.append((file, img, factor))
+
+        detecciones = detect_faces_batch([img for _, img, _ in lote])
+        for (file, img, factor), boxes in zip(lote, detecciones):
+            if not boxes:
+                print(f"⚠️ No se detectó rostro en {file}, se salta.")
+                continue
+
+            # El rostro más confiable de la foto (a resolución completa solo si hace falta)
+            box = max(boxes, key=lambda b: b[4])
+            face_crop = crop_face(os.path.join(raw_path, file), img, factor, box, out_size=160)
+            if face_crop is None:
+                print(f"⚠️ Recorte vacío en {file}, se salta.")
+                continue
+
+            # Mismo filtro de calidad que el reconocimiento: fotos malas no llegan a los centroides
+            # (CHECKFACE_QUALITY=0 lo apaga en ambos lados)
+            if quality.QUALITY_ENABLED:
+                reporte = quality.assess([face_crop], sizes=[min(box[2], box[3]) * factor])
+                if not reporte["ok"][0]:
+                    print(f"⚠️ Calidad insuficiente en {file} ({', '.join(reporte['reasons'][0])}), se salta.")
+                    continue
+            save_path = os.path.join(processed_path, file)
+            cv2.imwrite(save_path, face_crop)
+            print(f"✅ Recortado: {save_path}")
 
 
 def generar_embeddings(ci):
     print(f"🧬 Generando embeddings para {ci}...")
     os.makedirs(EMBEDDINGS_DIR, exist_ok=True)
 
-    # Cargar centroides anteriores si existen
-    if os.path.exists(CENTROIDS_PATH):
-        with open(CENTROIDS_PATH, "r") as f:
-            centroids_index = json.load(f)
-    else:
-        centroids_index = {}
-
     person_path = os.path.join(PROCESSED_DIR, ci)
     if not os.path.isdir(person_path):
         print(f"❌ No existe el directorio procesado de {ci}")
@@ -98,24 +114,56 @@ def generar_embeddings(ci):
     with open(emb_file_path, "w") as f:
         json.dump(new_embeddings, f, indent=2)
 
-    # Calcular centroid y distancia promedio
+    # Calcular prototipos y distancia promedio
     emb_np = np.array(new_embeddings, dtype=np.float32)
-    centroid = robust_mean(emb_np)
+    prototipos = prototipos_kmeans(emb_np, k=MAX_PROTOTIPOS)
     intra_avg = calcular_distancia_promedio(new_embeddings)
 
-    # Actualizar solo los datos necesarios en centroids.json
-    centroids_index[ci] = {
-        "centroid": centroid.tolist(),
+    # Actualizar solo esta identidad en el almacén binario de centroides
+    # (publica una generación nueva; los servidores la recargan solos)
+    generation = centroid_store.upsert_identity(ci, prototipos, {
         "count": len(new_embeddings),
         "intra_dist_avg": intra_avg
-    }
-
-    with open(CENTROIDS_PATH, "w") as f:
-        json.dump(centroids_index, f, indent=2)
+    }, store_dir=EMBEDDINGS_DIR)
 
     print(f"\n✅ Embeddings guardados en {emb_file_path}")
-    print(f"✅ Centroides actualizados en {CENTROIDS_PATH}")
-    print(f"📏 Distancia promedio interna para {ci}: {intra_avg:.4f}")
+    print(f"✅ Centroides actualizados en {EMBEDDINGS_DIR} (generación {generation})")
+    print(f"📏 Distancia promedio interna para {ci}: {intra_avg:.4f} ({len(prototipos)} prototipos)")
+
+
+def reconstruir_prototipos(k=MAX_PROTOTIPOS):
+    """
+    Recalcula los prototipos de las identidades que tienen embeddings/<ci>.json,
+    sin volver a correr el modelo. Solo se reemplazan esas identidades: las que
+    están únicamente en el almacén (p. ej. nombres del centroids.json anterior)
+    se conservan tal cual y se listan.
+    """
+    entries = {}
+    for file in sorted(os.listdir(EMBEDDINGS_DIR)):
+        ci, ext = os.path.splitext(file)
+        # centroids.json / centroids.meta.json son del almacén, no de una identidad
+        if ext != ".json" or file.startswith("centroids."):
+            continue
+        with open(os.path.join(EMBEDDINGS_DIR, file), "r") as f:
+            embeddings = json.load(f)
+        if not isinstance(embeddings, list) or not embeddings:
+            print(f"⚠️ {file} no tiene embeddings, se salta.")
+            continue
+        prototipos = prototipos_kmeans(np.array(embeddings, dtype=np.float32), k=k)
+        entries[ci] = (prototipos, {
+            "count": len(embeddings),
+            "intra_dist_avg": calcular_distancia_promedio(embeddings)
+        })
+
+    if not entries:
+        print(f"⚠️ No hay embeddings guardados en {EMBEDDINGS_DIR}, no se modifica el almacén")
+        return
+
+    generation, conservadas = centroid_store.upsert_identities(entries, store_dir=EMBEDDINGS_DIR)
+    total = sum(len(p) for p, _ in entries.values())
+    print(f"✅ {len(entries)} identidades reconstruidas, {total} prototipos (generación {generation})")
+    if conservadas:
+        print(f"ℹ️ Sin embeddings guardados, se conservan sin cambios ({len(conservadas)}): {', '.join(conservadas)}")
 
 def entrenar(ci):
     recortar_y_guardar(ci)
@@ -123,9 +171,14 @@ def entrenar(ci):
 
 
 if __name__ == "__main__":
+    if len(sys.argv) == 2 and sys.argv[1] == "--prototipos":
+        reconstruir_prototipos()
+        exit(0)
+
     if len(sys.argv) != 2:
         print("❌ Debe indicar el CI como argumento.")
         print("Ejemplo: python backend/train_faces.py 5144692")
+        print("Recalcular prototipos de todos: python backend/train_faces.py --prototipos")
         exit(1)
 
     ci = sys.argv[1]
@@ -5,6 +5,11 @@ import React, { useRef, useState, useEffect } from 'react';
 import axios from 'axios';
 
 let yaEnviado = false; // ⬅️ Se define una sola vez
+// Intervalo mínimo entre frames del stream (ms)
+const STREAM_MIN_INTERVAL_MS = 250;
+// Reconexiones del stream si se corta (espera inicial, se duplica en cada intento)
+const STREAM_REINTENTO_MS = 500;
+const STREAM_MAX_REINTENTOS = 3;
 
 export default function CameraCapture() {
   const videoRef = useRef(null);
@@ -14,16 +19,9 @@ export default function CameraCapture() {
   const [intervalId, setIntervalId] = useState(null);
   const [registroConfirmado, setRegistroConfirmado] = useState(false);
   const [nombresPendientes, setNombresPendientes] = useState([]);
-  const [conteoNombres, setConteoNombres] = useState({});
   const today = new Date().toISOString().split("T")[0];
   const [cursoSeleccionado, setCursoSeleccionado] = useState("");
   const [fueraDeCurso, setFueraDeCurso] = useState([]);
-  const conteoRef = useRef({});
-
-
-  useEffect(() => {
-    conteoRef.current = conteoNombres;
-  }, [conteoNombres]);
 
   // 1. Arranca la cámara al montar
   useEffect(() => {
@@ -59,16 +57,31 @@ export default function CameraCapture() {
     };
   }, []);
 
-  // 2. Captura un frame y envía al backend
-  const captureAndSend = async () => {
-    if (!videoRef.current) return;
+  // 2. Captura un frame del video como JPEG
+  const capturarFrame = async () => {
     const video = videoRef.current;
     const canvas = document.createElement('canvas');
     canvas.width = video.videoWidth;
     canvas.height = video.videoHeight;
     canvas.getContext('2d').drawImage(video, 0, 0);
+    return new Promise(res => canvas.toBlob(res, 'image/jpeg'));
+  };
+
+  // Muestra los resultados del frame y los CIs que el backend acaba de registrar
+  const procesarResultados = (data, committed = []) => {
+    const lista = Array.isArray(data) ? data : [];
+    setResult(lista);
 
-    const blob = await new Promise(res => canvas.toBlob(res, 'image/jpeg'));
+    if (committed.length > 0) {
+      console.log("✅ Asistencia registrada por el backend:", committed);
+    }
+    console.log("📷 Respuesta reconocimiento:", data);
+  };
+
+  // Polling HTTP (respaldo si el WebSocket no está disponible)
+  const captureAndSend = async (sessionId) => {
+    if (!videoRef.current) return;
+    const blob = await capturarFrame();
     const file = new File([blob], 'capture.jpg', { type: 'image/jpeg' });
 
     const formData = new FormData();
@@ -76,28 +89,10 @@ export default function CameraCapture() {
 
     try {
       const response = await axios.post(
-        'http://127.0.0.1:5000/api/recognize',
+        `http://127.0.0.1:5000/api/sessions/${sessionId}/frames`,
         formData
       );
-      setResult(Array.isArray(response.data) ? response.data : []);
-
-      const reconocidos = (Array.isArray(response.data) ? response.data : [])
-        .filter(m => m.match && m.name && !isNaN(Number(m.name)))
-        .map(m => Number(m.name));
-
-      console.log("✅ IDs reconocidos válidos (CI):", reconocidos);
-
-      if (reconocidos.length > 0) {
-        setConteoNombres((prevConteo) => {
-          const nuevoConteo = { ...prevConteo };
-          reconocidos.forEach((id) => {
-            nuevoConteo[id] = (nuevoConteo[id] || 0) + 1;
-            console.log(`📊 CI ${id} → ${nuevoConteo[id]} capturas`);
-          });
-          return nuevoConteo;
-        });
-      }
-      console.log("📷 Respuesta reconocimiento:", response.data);
+      procesarResultados(response.data.results, response.data.committed);
     } catch (error) {
       console.error('Error en reconocimiento:', error);
       setResult({ error: 'Error en el reconocimiento' });
@@ -105,13 +100,73 @@ export default function CameraCapture() {
 
   };
 
-  // 3. Inicia la captura periódica
-  // Reemplazar al iniciar el reconocimiento
+  // Stream por WebSocket: el próximo frame sale cuando llega la respuesta del anterior
+  // (el servidor marca el ritmo y descarta frames viejos si se atrasa).
+  // Si la conexión se corta en plena sesión se reconecta con espera creciente;
+  // si nunca abrió o se agotan los reintentos, se pasa al polling HTTP (onFallo)
+  const iniciarStream = (sessionId, onFallo) => {
+    let ws = null;
+    let timer = null;
+    let abrioAlgunaVez = false;
+    let terminado = false; // lo cerró startCapturing o el backend cerró la sesión
+    let reintentos = 0;
+
+    const enviarFrame = async () => {
+      if (!ws || ws.readyState !== WebSocket.OPEN || !videoRef.current) return;
+      const socket = ws;
+      const blob = await capturarFrame();
+      if (blob && socket.readyState === WebSocket.OPEN) socket.send(blob);
+    };
+
+    const conectar = () => {
+      const socket = new WebSocket(`ws://127.0.0.1:5000/ws/recognize?session_id=${sessionId}`);
+      ws = socket;
+
+      socket.onopen = () => {
+        abrioAlgunaVez = true;
+        reintentos = 0;
+        enviarFrame();
+      };
+      socket.onmessage = (event) => {
+        const msg = JSON.parse(event.data);
+        if (msg.type === 'results') {
+          procesarResultados(msg.results, msg.committed);
+          timer = setTimeout(enviarFrame, STREAM_MIN_INTERVAL_MS);
+        } else if (msg.type === 'error') {
+          console.error('Error en el stream:', msg.error);
+          // Sesión cerrada o inexistente: el servidor corta y no tiene sentido reconectar
+          if (msg.error?.startsWith('Sesión')) terminado = true;
+          else timer = setTimeout(enviarFrame, STREAM_MIN_INTERVAL_MS);
+        }
+      };
+      socket.onclose = () => {
+        clearTimeout(timer);
+        if (terminado || socket !== ws) return;
+        if (!abrioAlgunaVez || reintentos >= STREAM_MAX_REINTENTOS) {
+          terminado = true;
+          onFallo();
+          return;
+        }
+        const espera = STREAM_REINTENTO_MS * 2 ** reintentos;
+        reintentos += 1;
+        console.warn(`⚠️ Stream cortado, reintento ${reintentos} en ${espera} ms`);
+        timer = setTimeout(conectar, espera);
+      };
+    };
+
+    conectar();
+    return () => {
+      terminado = true;
+      clearTimeout(timer);
+      ws.close();
+    };
+  };
+
+  // 3. Inicia la sesión de reconocimiento
   const startCapturing = async () => {
     yaEnviado = false;
     if (intervalId) clearInterval(intervalId);
     setNombresPendientes([]);
-    setConteoNombres({});
     setRegistroConfirmado(false);
     setResult(null);
     setFueraDeCurso([]);
@@ -131,106 +186,52 @@ export default function CameraCapture() {
 
       setCursoSeleccionado(cursoActivo);
 
+      // El backend acumula los votos por CI y registra la asistencia al llegar al umbral
+      const sesion = await axios.post("http://127.0.0.1:5000/api/sessions", {
+        course_id: cursoActivo.course_id,
+        date: today,
+      });
+      const sessionId = sesion.data.session_id;
+
       setCapturing(true);
-      const id = setInterval(captureAndSend, 2000);
-      setIntervalId(id);
+      let id = null;
+      const cerrarStream = iniciarStream(sessionId, () => {
+        console.warn("⚠️ WebSocket no disponible, se usa polling HTTP");
+        id = setInterval(() => captureAndSend(sessionId), 2000);
+        setIntervalId(id);
+      });
 
       setTimeout(async () => {
+        cerrarStream();
         clearInterval(id);
 
-        console.log("conteoNombres (ref):", conteoRef.current);
-
-        const idsFiltrados = Object.entries(conteoRef.current)
-          .filter(([ci, count]) => Number.isFinite(Number(ci)) && count >= 3)
-          .map(([ci]) => String(ci));
-
-        console.log("📸 IDs reconocidos por >=3 capturas:", idsFiltrados);
-
-        if (!yaEnviado && idsFiltrados.length > 0) {
-          yaEnviado = true;
-
-          try {
-            const registradosRes = await axios.get(
-              "http://127.0.0.1:5000/api/asistencia/registrados",
-              {
-                params: {
-                  course_id: cursoActivo.course_id,
-                  date: today,
-                },
-              }
-            );
-
-            const yaRegistrados = registradosRes.data.registrados || [];
-            console.log("🗂 Lista ya en DB:", yaRegistrados);
-
-            yaRegistrados.forEach(r => {
-              console.log("👉 DB CI:", r.ci, " | typeof:", typeof r.ci);
-            });
-            idsFiltrados.forEach(ci => {
-              console.log("👉 Reconocido CI:", ci, " | typeof:", typeof ci);
-            });
-
-            console.log("🔎 Comparando:", idsFiltrados, yaRegistrados.map(r => r.ci));
-            const nuevosIds = idsFiltrados.filter(
-              ci => !yaRegistrados.some(r => String(r.ci) === String(ci))
-            );
-            console.log("🆕 CIs realmente nuevos:", nuevosIds);
-
-
-            const nuevosDetalles = nuevosIds.map(ci => {
-              const match = Array.isArray(result)
-                ? result.find(r => String(r.name) === String(ci))
-                : null;
-              return match
-                ? { ci, full_name: match.full_name || "Desconocido" }
-                : { ci, full_name: "Desconocido" };
-            });
-
-            if (nuevosDetalles.length === 0) {
-              console.log("⚠️ Todos ya estaban registrados. No se envía nada.");
-              setRegistroConfirmado(false);
-              setNombresPendientes([]);
-              setCapturing(false);
-              return;
-            }
-
-            const postRes = await axios.post(
-              "http://127.0.0.1:5000/api/asistencia",
-              {
-                cis: nuevosIds,
-                course_id: cursoActivo.course_id,
-                date: today,
-              }
-            );
-
-            console.log("✅ Asistencia enviada:", postRes.data);
-
-
-            const { fuera_curso } = postRes.data;
-            setFueraDeCurso(fuera_curso || []);
-
-            const detallesFinales = nuevosDetalles.filter(
-              p => !fuera_curso.includes(p.ci)
-            );
-
-            if (detallesFinales.length > 0) {
-              setRegistroConfirmado(true);
-              setNombresPendientes(detallesFinales);
-            } else {
-              setRegistroConfirmado(false);
-              setNombresPendientes([]);
-            }
-
-
-          } catch (err) {
-            console.error("❌ Error al verificar/enviar asistencia:", err);
+        try {
+          // Cierra la sesión: el backend escribe lo pendiente y devuelve el resumen
+          const { data: resumen } = await axios.delete(
+            `http://127.0.0.1:5000/api/sessions/${sessionId}`
+          );
+          console.log("📋 Resumen de la sesión:", resumen);
+          yaEnviado = resumen.participants.some(p => p.committed) || resumen.fuera_curso.length > 0;
+
+          setFueraDeCurso(resumen.fuera_curso || []);
+
+          // Solo se listan los que no estaban registrados antes de esta sesión
+          const nuevos = (resumen.registrados || []).filter(r => r.inserted);
+          if (nuevos.length > 0) {
+            setRegistroConfirmado(true);
+            setNombresPendientes(nuevos);
+          } else {
+            setRegistroConfirmado(false);
+            setNombresPendientes([]);
           }
+        } catch (err) {
+          console.error("❌ Error al cerrar la sesión de reconocimiento:", err);
         }
 
         setCapturing(false);
       }, 15000);
     } catch (error) {
-      console.error("Error al obtener curso activo:", error);
+      console.error("Error al iniciar el reconocimiento:", error);
       alert("Error al verificar el curso activo.");
     }
   };